@@ -1,5 +1,10 @@
 # -*- coding: utf-8 -*-
 
-__all__ = ["time_and_channel"]
+__all__ = ["time_and_channel", "baseline_time_and_channel",
+           "bda", "StreamingAverager"]
 
-from africanus.averaging.time_and_channel_avg import time_and_channel
+from africanus.averaging.time_and_channel_avg import (
+                                    time_and_channel,
+                                    baseline_time_and_channel)
+from africanus.averaging.bda_avg import bda
+from africanus.averaging.streaming import StreamingAverager
@@ -0,0 +1,509 @@
+# -*- coding: utf-8 -*-
+
+
+from collections import namedtuple
+
+from numba import types
+import numpy as np
+
+from africanus.averaging.bda_mapping import bda_mapper
+from africanus.averaging.time_and_channel_avg import (
+                                    RowChanAverageOutput,
+                                    RowChannelAverageException,
+                                    ChannelAverageOutput,
+                                    chan_average,
+                                    chan_corrs,
+                                    chan_add_factory,
+                                    chan_output_factory,
+                                    is_chan_flagged_factory,
+                                    matching_flag_factory,
+                                    merge_flags,
+                                    row_average,
+                                    set_flagged_factory,
+                                    sigma_spectrum_add_factory,
+                                    sigma_spectrum_normaliser_factory,
+                                    vis_add_factory,
+                                    vis_normaliser_factory,
+                                    weight_spectrum_normaliser_factory,
+                                    weight_sum_output_factory,
+                                    _row_output_fields,
+                                    _chan_output_fields,
+                                    _rowchan_output_fields)
+from africanus.util.docs import DocstringTemplate
+from africanus.util.numba import is_numba_type_none, generated_jit, njit
+
+
+def flatten_output_factory(present):
+    """ Returns function removing the unit channel axis if present """
+    if present:
+        def impl(array):
+            return array.reshape((array.shape[0], array.shape[2]))
+    else:
+        def impl(array):
+            pass
+
+    return njit(nogil=True, cache=True, inline='always')(impl)
+
+
+def ragged_chan_output_factory(present):
+    """ Returns function producing ragged channel outputs if present """
+    if present:
+        def impl(nflat, array):
+            return np.empty(nflat, dtype=array.dtype)
+    else:
+        def impl(nflat, array):
+            pass
+
+    return njit(nogil=True, cache=True, inline='always')(impl)
+
+
+def ragged_chan_assign_factory(present):
+    """ Returns function assigning averaged channel data to a row """
+    if present:
+        def impl(output, offset, input):
+            output[offset:offset + input.shape[0]] = input
+    else:
+        def impl(output, offset, input):
+            pass
+
+    return njit(nogil=True, cache=True, inline='always')(impl)
+
+
+@generated_jit(nopython=True, nogil=True, cache=True)
+def ragged_chan_average(chan_meta, chan_freq=None, chan_width=None,
+                        effective_bw=None, resolution=None):
+    """
+    Averages channel data for each distinct channel mapping
+    and assigns it to the flat channel axis of each output row.
+    """
+    have_chan_freq = not is_numba_type_none(chan_freq)
+    have_chan_width = not is_numba_type_none(chan_width)
+    have_effective_bw = not is_numba_type_none(effective_bw)
+    have_resolution = not is_numba_type_none(resolution)
+
+    chan_freq_factory = ragged_chan_output_factory(have_chan_freq)
+    chan_width_factory = ragged_chan_output_factory(have_chan_width)
+    effective_bw_factory = ragged_chan_output_factory(have_effective_bw)
+    resolution_factory = ragged_chan_output_factory(have_resolution)
+
+    chan_freq_assign = ragged_chan_assign_factory(have_chan_freq)
+    chan_width_assign = ragged_chan_assign_factory(have_chan_width)
+    effective_bw_assign = ragged_chan_assign_factory(have_effective_bw)
+    resolution_assign = ragged_chan_assign_factory(have_resolution)
+
+    def impl(chan_meta, chan_freq=None, chan_width=None,
+             effective_bw=None, resolution=None):
+
+        offsets = chan_meta.offsets
+        nflat = offsets[-1]
+
+        chan_freq_avg = chan_freq_factory(nflat, chan_freq)
+        chan_width_avg = chan_width_factory(nflat, chan_width)
+        effective_bw_avg = effective_bw_factory(nflat, effective_bw)
+        resolution_avg = resolution_factory(nflat, resolution)
+
+        for m in range(chan_meta.chan_maps.shape[0]):
+            chan_data = chan_average((chan_meta.chan_maps[m],
+                                      chan_meta.out_chans[m]),
+                                     chan_freq=chan_freq,
+                                     chan_width=chan_width,
+                                     effective_bw=effective_bw,
+                                     resolution=resolution)
+
+            for r in range(chan_meta.row_chan_map.shape[0]):
+                if chan_meta.row_chan_map[r] != m:
+                    continue
+
+                chan_freq_assign(chan_freq_avg, offsets[r],
+                                 chan_data.chan_freq)
+                chan_width_assign(chan_width_avg, offsets[r],
+                                  chan_data.chan_width)
+                effective_bw_assign(effective_bw_avg, offsets[r],
+                                    chan_data.effective_bw)
+                resolution_assign(resolution_avg, offsets[r],
+                                  chan_data.resolution)
+
+        return ChannelAverageOutput(chan_freq_avg, chan_width_avg,
+                                    effective_bw_avg, resolution_avg)
+
+    return impl
+
+
+@generated_jit(nopython=True, nogil=True, cache=True)
+def ragged_row_chan_average(row_meta, chan_meta, flag_row=None, weight=None,
+                            vis=None, flag=None,
+                            weight_spectrum=None, sigma_spectrum=None):
+    """
+    Equivalent of :func:`row_chan_average` producing
+    ragged output of shape :code:`(flat_chan, corr)`,
+    where the channels of output row ``r`` are located at
+    ``chan_meta.offsets[r]:chan_meta.offsets[r + 1]``.
+    """
+    have_flag_row = not is_numba_type_none(flag_row)
+    have_vis = not is_numba_type_none(vis)
+    have_flag = not is_numba_type_none(flag)
+    have_weight = not is_numba_type_none(weight)
+    have_weight_spectrum = not is_numba_type_none(weight_spectrum)
+    have_sigma_spectrum = not is_numba_type_none(sigma_spectrum)
+
+    flags_match = matching_flag_factory(have_flag_row)
+    is_chan_flagged = is_chan_flagged_factory(have_flag)
+
+    vis_factory = chan_output_factory(have_vis)
+    weight_sum_factory = weight_sum_output_factory(have_vis)
+    flag_factory = chan_output_factory(have_flag)
+    weight_factory = chan_output_factory(have_weight_spectrum)
+    sigma_factory = chan_output_factory(have_sigma_spectrum)
+
+    vis_adder = vis_add_factory(have_vis,
+                                have_weight,
+                                have_weight_spectrum)
+    weight_adder = chan_add_factory(have_weight_spectrum)
+    sigma_adder = sigma_spectrum_add_factory(have_sigma_spectrum,
+                                             have_weight,
+                                             have_weight_spectrum)
+
+    vis_normaliser = vis_normaliser_factory(have_vis)
+    sigma_normaliser = sigma_spectrum_normaliser_factory(have_sigma_spectrum)
+    weight_normaliser = weight_spectrum_normaliser_factory(
+                            have_weight_spectrum)
+
+    set_flagged = set_flagged_factory(have_flag)
+
+    flatten_vis = flatten_output_factory(have_vis)
+    flatten_flag = flatten_output_factory(have_flag)
+    flatten_weight = flatten_output_factory(have_weight_spectrum)
+    flatten_sigma = flatten_output_factory(have_sigma_spectrum)
+
+    dummy_chan_freq = None
+    dummy_chan_width = None
+
+    def impl(row_meta, chan_meta, flag_row=None, weight=None,
+             vis=None, flag=None,
+             weight_spectrum=None, sigma_spectrum=None):
+
+        nchan, ncorrs = chan_corrs(vis, flag,
+                                   weight_spectrum, sigma_spectrum,
+                                   dummy_chan_freq, dummy_chan_width,
+                                   dummy_chan_width, dummy_chan_width)
+
+        chan_maps = chan_meta.chan_maps
+        row_chan_map = chan_meta.row_chan_map
+        offsets = chan_meta.offsets
+        nflat = offsets[-1]
+
+        # Accumulate into a unit channel axis so that the
+        # (row, chan, corr) adders and normalisers can be reused,
+        # with flat channels taking the place of rows
+        out_shape = (nflat, 1, ncorrs)
+
+        vis_avg = vis_factory(out_shape, vis)
+        vis_weight_sum = weight_sum_factory(out_shape, vis)
+        weight_spectrum_avg = weight_factory(out_shape, weight_spectrum)
+        sigma_spectrum_avg = sigma_factory(out_shape, sigma_spectrum)
+        sigma_spectrum_weight_sum = sigma_factory(out_shape, sigma_spectrum)
+
+        flagged_vis_avg = vis_factory(out_shape, vis)
+        flagged_vis_weight_sum = weight_sum_factory(out_shape, vis)
+        flagged_weight_spectrum_avg = weight_factory(out_shape,
+                                                     weight_spectrum)
+        flagged_sigma_spectrum_avg = sigma_factory(out_shape,
+                                                   sigma_spectrum)
+        flagged_sigma_spectrum_weight_sum = sigma_factory(out_shape,
+                                                          sigma_spectrum)
+
+        flag_avg = flag_factory(out_shape, flag)
+
+        counts = np.zeros(out_shape, dtype=np.uint32)
+        flag_counts = np.zeros(out_shape, dtype=np.uint32)
+
+        # Iterate over input rows, accumulating into output rows
+        for in_row, out_row in enumerate(row_meta.map):
+            if not flags_match(flag_row, in_row, row_meta.flag_row, out_row):
+                continue
+
+            m = row_chan_map[out_row]
+            offset = offsets[out_row]
+
+            for in_chan in range(nchan):
+                out_chan = offset + chan_maps[m, in_chan]
+
+                for corr in range(ncorrs):
+                    if is_chan_flagged(flag, in_row, in_chan, corr):
+                        # Increment flagged averages and counts
+                        flag_counts[out_chan, 0, corr] += 1
+
+                        vis_adder(flagged_vis_avg, flagged_vis_weight_sum, vis,
+                                  weight, weight_spectrum,
+                                  out_chan, 0, in_row, in_chan, corr)
+                        weight_adder(flagged_weight_spectrum_avg,
+                                     weight_spectrum,
+                                     out_chan, 0, in_row, in_chan, corr)
+                        sigma_adder(flagged_sigma_spectrum_avg,
+                                    flagged_sigma_spectrum_weight_sum,
+                                    sigma_spectrum,
+                                    weight,
+                                    weight_spectrum,
+                                    out_chan, 0, in_row, in_chan, corr)
+                    else:
+                        # Increment unflagged averages and counts
+                        counts[out_chan, 0, corr] += 1
+
+                        vis_adder(vis_avg, vis_weight_sum, vis,
+                                  weight, weight_spectrum,
+                                  out_chan, 0, in_row, in_chan, corr)
+                        weight_adder(weight_spectrum_avg, weight_spectrum,
+                                     out_chan, 0, in_row, in_chan, corr)
+                        sigma_adder(sigma_spectrum_avg,
+                                    sigma_spectrum_weight_sum,
+                                    sigma_spectrum,
+                                    weight,
+                                    weight_spectrum,
+                                    out_chan, 0, in_row, in_chan, corr)
+
+        for f in range(nflat):
+            for c in range(ncorrs):
+                if counts[f, 0, c] > 0:
+                    # We have some unflagged samples and
+                    # only these are used as averaged output
+                    vis_normaliser(vis_avg, vis_avg,
+                                   f, 0, c,
+                                   vis_weight_sum)
+                    sigma_normaliser(sigma_spectrum_avg,
+                                     sigma_spectrum_avg,
+                                     f, 0, c,
+                                     sigma_spectrum_weight_sum)
+                elif flag_counts[f, 0, c] > 0:
+                    # We only have flagged samples and
+                    # these are used as averaged output
+                    vis_normaliser(vis_avg, flagged_vis_avg,
+                                   f, 0, c,
+                                   flagged_vis_weight_sum)
+                    sigma_normaliser(sigma_spectrum_avg,
+                                     flagged_sigma_spectrum_avg,
+                                     f, 0, c,
+                                     flagged_sigma_spectrum_weight_sum)
+                    weight_normaliser(weight_spectrum_avg,
+                                      flagged_weight_spectrum_avg,
+                                      f, 0, c)
+
+                    # Flag the output bin
+                    set_flagged(flag_avg, f, 0, c)
+                else:
+                    raise RowChannelAverageException("Zero-filled bin")
+
+        return RowChanAverageOutput(flatten_vis(vis_avg),
+                                    flatten_flag(flag_avg),
+                                    flatten_weight(weight_spectrum_avg),
+                                    flatten_sigma(sigma_spectrum_avg))
+
+    return impl
+
+
+BDAAverageOutput = namedtuple("BDAAverageOutput",
+                              ["time", "interval", "flag_row"] +
+                              _row_output_fields +
+                              ["offsets"] +
+                              _chan_output_fields +
+                              _rowchan_output_fields)
+
+
+@generated_jit(nopython=True, nogil=True, cache=True)
+def bda(time, interval, antenna1, antenna2,
+        time_centroid=None, exposure=None, flag_row=None,
+        uvw=None, weight=None, sigma=None,
+        chan_freq=None, chan_width=None,
+        effective_bw=None, resolution=None,
+        vis=None, flag=None,
+        weight_spectrum=None, sigma_spectrum=None,
+        decorrelation=0.98, max_fov=45.0,
+        time_bin_secs=np.inf, max_chan_bin_size=np.inf):
+
+    if (is_numba_type_none(uvw) or is_numba_type_none(chan_freq) or
+            is_numba_type_none(chan_width)):
+        raise ValueError("uvw, chan_freq and chan_width are required for "
+                         "baseline-dependent averaging")
+
+    valid_types = (types.misc.Omitted, types.scalars.Float,
+                   types.scalars.Integer)
+
+    for name, arg in (("decorrelation", decorrelation),
+                      ("max_fov", max_fov),
+                      ("time_bin_secs", time_bin_secs),
+                      ("max_chan_bin_size", max_chan_bin_size)):
+        if not isinstance(arg, valid_types):
+            raise TypeError("%s must be a scalar float" % name)
+
+    def impl(time, interval, antenna1, antenna2,
+             time_centroid=None, exposure=None, flag_row=None,
+             uvw=None, weight=None, sigma=None,
+             chan_freq=None, chan_width=None,
+             effective_bw=None, resolution=None,
+             vis=None, flag=None,
+             weight_spectrum=None, sigma_spectrum=None,
+             decorrelation=0.98, max_fov=45.0,
+             time_bin_secs=np.inf, max_chan_bin_size=np.inf):
+
+        # Check channel and correlation dimensions agree
+        chan_corrs(vis, flag,
+                   weight_spectrum, sigma_spectrum,
+                   chan_freq, chan_width,
+                   effective_bw, resolution)
+
+        # Merge flag_row and flag arrays
+        flag_row = merge_flags(flag_row, flag)
+
+        # Generate baseline-dependent row and channel mapping metadata
+        row_meta, chan_meta, summary = bda_mapper(
+                                time, interval, antenna1, antenna2,
+                                uvw, chan_freq, chan_width,
+                                flag_row=flag_row,
+                                decorrelation=decorrelation,
+                                max_fov=max_fov,
+                                time_bin_secs=time_bin_secs,
+                                max_chan_bin_size=max_chan_bin_size)
+
+        row_data = row_average(row_meta, antenna1, antenna2,
+                               flag_row=flag_row,
+                               time_centroid=time_centroid,
+                               exposure=exposure, uvw=uvw,
+                               weight=weight, sigma=sigma)
+
+        chan_data = ragged_chan_average(chan_meta, chan_freq=chan_freq,
+                                        chan_width=chan_width,
+                                        effective_bw=effective_bw,
+                                        resolution=resolution)
+
+        row_chan_data = ragged_row_chan_average(
+                                row_meta, chan_meta,
+                                flag_row=flag_row, weight=weight,
+                                vis=vis, flag=flag,
+                                weight_spectrum=weight_spectrum,
+                                sigma_spectrum=sigma_spectrum)
+
+        avg = BDAAverageOutput(row_meta.time,
+                               row_meta.interval,
+                               row_meta.flag_row,
+                               row_data.antenna1,
+                               row_data.antenna2,
+                               row_data.time_centroid,
+                               row_data.exposure,
+                               row_data.uvw,
+                               row_data.weight,
+                               row_data.sigma,
+                               chan_meta.offsets,
+                               chan_data.chan_freq,
+                               chan_data.chan_width,
+                               chan_data.effective_bw,
+                               chan_data.resolution,
+                               row_chan_data.vis,
+                               row_chan_data.flag,
+                               row_chan_data.weight_spectrum,
+                               row_chan_data.sigma_spectrum)
+
+        return avg, summary
+
+    return impl
+
+
+BDA_DOCS = DocstringTemplate("""
+Baseline-dependent averaging (BDA) in time and channel,
+producing rows with a varying number of channels.
+
+The time bin width and channel bin size of each baseline are
+derived from the maximum uv-length of the baseline at the
+highest channel frequency, such that time and bandwidth smearing
+each attenuate the amplitude of a source at the edge of
+the field of view by no more than ``decorrelation``.
+Short baselines are therefore averaged over more time and
+more channels than long baselines.
+
+As averaged rows may contain different numbers of channels,
+channel-dependent outputs are ragged and laid out consecutively
+along a flat channel axis.
+The channels of output row ``r`` are located at
+``offsets[r]:offsets[r + 1]``, so that the visibilities of
+the row are ``vis[offsets[r]:offsets[r + 1]]``
+and their frequencies ``chan_freq[offsets[r]:offsets[r + 1]]``.
+
+Visibilities are weighted by ``weight_spectrum`` if present,
+otherwise by ``weight``, otherwise naturally.
+
+Parameters
+----------
+time : $(array_type)
+    Time values of shape :code:`(row,)`.
+interval : $(array_type)
+    Interval values of shape :code:`(row,)`.
+antenna1 : $(array_type)
+    First antenna indices of shape :code:`(row,)`
+antenna2 : $(array_type)
+    Second antenna indices of shape :code:`(row,)`
+time_centroid : $(array_type), optional
+    Time centroid values of shape :code:`(row,)`
+exposure : $(array_type), optional
+    Exposure values of shape :code:`(row,)`
+flag_row : $(array_type), optional
+    Flagged rows of shape :code:`(row,)`.
+uvw : $(array_type)
+    UVW coordinates in metres of shape :code:`(row, 3)`.
+weight : $(array_type), optional
+    Weight values of shape :code:`(row, corr)`.
+sigma : $(array_type), optional
+    Sigma values of shape :code:`(row, corr)`.
+chan_freq : $(array_type)
+    Channel frequencies of shape :code:`(chan,)`.
+chan_width : $(array_type)
+    Channel widths of shape :code:`(chan,)`.
+effective_bw : $(array_type), optional
+    Effective channel bandwidth of shape :code:`(chan,)`.
+resolution : $(array_type), optional
+    Effective channel resolution of shape :code:`(chan,)`.
+vis : $(array_type), optional
+    Visibility data of shape :code:`(row, chan, corr)`.
+flag : $(array_type), optional
+    Flag data of shape :code:`(row, chan, corr)`.
+weight_spectrum : $(array_type), optional
+    Weight spectrum of shape :code:`(row, chan, corr)`.
+sigma_spectrum : $(array_type), optional
+    Sigma spectrum of shape :code:`(row, chan, corr)`.
+decorrelation : float, optional
+    Acceptable fraction of the amplitude remaining after averaging.
+    Defaults to 0.98, which accepts a 2% loss in amplitude.
+max_fov : float, optional
+    Radius of the field of view in degrees. Defaults to 45.0.
+time_bin_secs : float, optional
+    Maximum summed interval in seconds to include within a bin.
+    Unbounded by default.
+max_chan_bin_size : float, optional
+    Maximum number of channels to average together.
+    Unbounded by default.
+
+Returns
+-------
+average : namedtuple
+    A namedtuple whose entries correspond to the input arrays.
+    Output arrays will be ``None`` if the inputs were ``None``.
+    Row-based outputs have shape :code:`(out_row, ...)`.
+    :code:`offsets` has shape :code:`(out_row + 1,)`.
+    Channel-based outputs have shape :code:`(flat_chan,)`
+    and (row, chan, corr)-based outputs
+    have shape :code:`(flat_chan, corr)`, where
+    :code:`flat_chan == offsets[-1]`.
+summary : namedtuple
+    A namedtuple summarising the averaging of each unique baseline.
+    Contains :code:`(bl,)` arrays of
+    :code:`antenna1`, :code:`antenna2`,
+    the :code:`uv_length` in wavelengths,
+    the :code:`time_bin_secs` and :code:`chan_bin_size`
+    applied to the baseline,
+    the number of :code:`input_rows` and :code:`output_rows`,
+    the number of :code:`input_vis` and :code:`output_vis`
+    (row, chan) samples,
+    and the :code:`compression` ratio of input to output samples.
+""")
+
+try:
+    bda.__doc__ = BDA_DOCS.substitute(array_type=":class:`numpy.ndarray`")
+except AttributeError:
+    pass
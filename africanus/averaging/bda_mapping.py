@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+
+from collections import namedtuple
+
+import numpy as np
+
+from africanus.averaging.support import unique_baselines
+from africanus.averaging.time_and_channel_mapping import (
+                                    baseline_row_mapper,
+                                    channel_mapper,
+                                    decorrelation_chan_bin_size)
+from africanus.util.numba import njit
+
+
+BDAChanMapOutput = namedtuple("BDAChanMapOutput",
+                              ["chan_maps", "out_chans",
+                               "row_chan_map", "offsets"])
+
+BDASummary = namedtuple("BDASummary",
+                        ["antenna1", "antenna2", "uv_length",
+                         "time_bin_secs", "chan_bin_size",
+                         "input_rows", "output_rows",
+                         "input_vis", "output_vis",
+                         "compression"])
+
+
+@njit(nogil=True, cache=True)
+def bda_mapper(time, interval, antenna1, antenna2, uvw,
+               chan_freq, chan_width, flag_row=None,
+               decorrelation=0.98, max_fov=45.0,
+               time_bin_secs=np.inf, max_chan_bin_size=np.inf):
+    """
+    Generates baseline-dependent row and channel mappings
+    from high resolution to low resolution data.
+
+    Rows are mapped by :func:`baseline_row_mapper`.
+    The channel bin size of each baseline is derived by
+    :func:`decorrelation_chan_bin_size` and channels are mapped
+    by :func:`channel_mapper`, so that each output row may
+    contain a different number of channels.
+    Output channels are laid out consecutively in a flat channel axis,
+    with the channels of output row ``r`` located at
+    ``offsets[r]:offsets[r + 1]``.
+
+    Parameters
+    ----------
+    time : :class:`numpy.ndarray`
+        Time values of shape :code:`(row,)`.
+    interval : :class:`numpy.ndarray`
+        Exposure times of shape :code:`(row,)`.
+    antenna1 : :class:`numpy.ndarray`
+        Antenna 1 values of shape :code:`(row,)`.
+    antenna2 : :class:`numpy.ndarray`
+        Antenna 2 values of shape :code:`(row,)`.
+    uvw : :class:`numpy.ndarray`
+        UVW coordinates in metres of shape :code:`(row, 3)`.
+    chan_freq : :class:`numpy.ndarray`
+        Channel frequencies of shape :code:`(chan,)`.
+    chan_width : :class:`numpy.ndarray`
+        Channel widths of shape :code:`(chan,)`.
+    flag_row : :class:`numpy.ndarray`, optional
+        Positive values indicate that a row is flagged, while
+        zero implies unflagged. Has shape :code:`(row,)`.
+    decorrelation : float, optional
+        Acceptable fraction of the amplitude remaining after averaging.
+        Defaults to 0.98.
+    max_fov : float, optional
+        Radius of the field of view in degrees. Defaults to 45.0.
+    time_bin_secs : float, optional
+        Maximum time bin width in seconds. Unbounded by default.
+    max_chan_bin_size : float, optional
+        Maximum number of channels in a bin. Unbounded by default.
+
+    Returns
+    -------
+    row_meta : namedtuple
+        Row mapping, with the same fields as :func:`row_mapper`.
+    chan_meta : namedtuple
+        Channel mapping with fields :code:`chan_maps`, of shape
+        :code:`(map, chan)`, containing the distinct channel mappings,
+        :code:`out_chans`, of shape :code:`(map,)`, containing the number
+        of output channels produced by each mapping,
+        :code:`row_chan_map`, of shape :code:`(out_row,)`, the mapping
+        applied to each output row and :code:`offsets`,
+        of shape :code:`(out_row + 1,)`, the offset of each output row's
+        channels in the flat channel axis.
+    summary : namedtuple
+        Summary of the averaging performed on each unique baseline.
+    """
+    nchan = chan_freq.shape[0]
+
+    row_meta, row_summary = baseline_row_mapper(
+                                time, interval, antenna1, antenna2,
+                                uvw, chan_freq, flag_row=flag_row,
+                                decorrelation=decorrelation,
+                                max_fov=max_fov,
+                                time_bin_secs=time_bin_secs)
+
+    _, _, bl_inv, _ = unique_baselines(antenna1, antenna2)
+    nbl = row_summary.uv_length.shape[0]
+    out_rows = row_meta.time.shape[0]
+
+    bl_chan_bin_size = decorrelation_chan_bin_size(row_summary.uv_length,
+                                                   decorrelation, max_fov,
+                                                   chan_freq, chan_width,
+                                                   max_chan_bin_size)
+
+    # Create a channel mapping for each distinct channel bin size
+    bin_sizes = np.unique(bl_chan_bin_size)
+    nmaps = bin_sizes.shape[0]
+    chan_maps = np.empty((nmaps, nchan), dtype=np.uint32)
+    out_chans = np.empty(nmaps, dtype=np.intp)
+    bl_chan_map = np.empty(nbl, dtype=np.intp)
+
+    for m in range(nmaps):
+        chan_map, out_chans[m] = channel_mapper(nchan, bin_sizes[m])
+        chan_maps[m, :] = chan_map
+
+    for bl in range(nbl):
+        bl_chan_map[bl] = np.searchsorted(bin_sizes, bl_chan_bin_size[bl])
+
+    # Assign channel mappings to output rows
+    row_chan_map = np.empty(out_rows, dtype=np.intp)
+
+    for r in range(time.shape[0]):
+        row_chan_map[row_meta.map[r]] = bl_chan_map[bl_inv[r]]
+
+    offsets = np.empty(out_rows + 1, dtype=np.intp)
+    offsets[0] = 0
+
+    for r in range(out_rows):
+        offsets[r + 1] = offsets[r] + out_chans[row_chan_map[r]]
+
+    # Summarise visibility compression per baseline
+    input_vis = row_summary.input_rows * nchan
+    output_vis = np.empty(nbl, dtype=np.intp)
+    compression = np.empty(nbl, dtype=np.float64)
+
+    for bl in range(nbl):
+        output_vis[bl] = (row_summary.output_rows[bl] *
+                          out_chans[bl_chan_map[bl]])
+        compression[bl] = input_vis[bl] / output_vis[bl]
+
+    chan_meta = BDAChanMapOutput(chan_maps, out_chans, row_chan_map, offsets)
+
+    summary = BDASummary(row_summary.antenna1, row_summary.antenna2,
+                         row_summary.uv_length, row_summary.time_bin_secs,
+                         bl_chan_bin_size,
+                         row_summary.input_rows, row_summary.output_rows,
+                         input_vis, output_vis, compression)
+
+    return row_meta, chan_meta, summary
@@ -5,6 +5,7 @@ from operator import getitem
 
 from africanus.averaging.time_and_channel_mapping import (
                 row_mapper as np_row_mapper,
+                row_count as np_row_count,
                 channel_mapper as np_channel_mapper)
 from africanus.averaging.time_and_channel_avg import (
                 row_average as np_row_average,
@@ -15,6 +16,7 @@ from africanus.averaging.time_and_channel_avg import (
                 AverageOutput, ChannelAverageOutput,
                 RowAverageOutput, RowChanAverageOutput)
 
+from africanus.util.docs import DocstringTemplate
 from africanus.util.requirements import requires_optional
 
 import numpy as np
@@ -30,20 +32,75 @@ else:
     dask_import_error = None
 
 
-def chan_metadata(row_chan_arrays, chan_arrays, chan_bin_size):
-    """ Create dask array with channel metadata for each chunk channel """
-    chan_chunks = None
-
+def _chan_chunks(row_chan_arrays, chan_arrays):
+    """ Returns the channel chunks of the first non-None array """
     for array in row_chan_arrays:
         if array is not None:
-            chan_chunks = array.chunks[1]
-            break
+            return array.chunks[1]
+
+    for array in chan_arrays:
+        if array is not None:
+            return array.chunks[0]
+
+    return None
+
+
+def chan_bin_aligned_chunks(chan_chunks, chan_bin_size):
+    """
+    Rounds each channel chunk boundary up to a multiple of
+    ``chan_bin_size``, so that channel bins straddling a chunk
+    boundary are assigned to the chunk containing their first channel.
+    Chunks smaller than a bin may be absorbed by a neighbouring chunk.
+
+    Parameters
+    ----------
+    chan_chunks : tuple of int
+        Channel chunks
+    chan_bin_size : int
+        Number of channels in a bin
+
+    Returns
+    -------
+    tuple of int
+        Channel chunks aligned with channel bins
+    """
+    bounds = np.cumsum((0,) + tuple(chan_chunks))
+    nchan = bounds[-1]
+    aligned = np.minimum(-(-bounds // chan_bin_size) * chan_bin_size, nchan)
+
+    return tuple(int(c) for c in np.diff(np.unique(aligned)))
+
+
+def align_chan_chunks(row_chan_arrays, chan_arrays, chan_bin_size):
+    """
+    Rechunks channel dimensions to :func:`chan_bin_aligned_chunks`,
+    so that averaging each channel chunk independently
+    produces the same bins as averaging all channels at once.
+
+    Only the channels of bins straddling chunk boundaries
+    move between neighbouring chunks.
+    """
+    chan_chunks = _chan_chunks(row_chan_arrays, chan_arrays)
 
     if chan_chunks is None:
-        for array in chan_arrays:
-            if array is not None:
-                chan_chunks = array.chunks[0]
-                break
+        return row_chan_arrays, chan_arrays
+
+    aligned = chan_bin_aligned_chunks(chan_chunks, chan_bin_size)
+
+    row_chan_arrays = tuple(a if a is None or a.chunks[1] == aligned
+                            else a.rechunk({1: aligned})
+                            for a in row_chan_arrays)
+
+    chan_arrays = tuple(a if a is None or a.chunks[0] == aligned
+                        else a.rechunk({0: aligned})
+                        for a in chan_arrays)
+
+    return row_chan_arrays, chan_arrays
+
+
+def chan_metadata(row_chan_arrays, chan_arrays, chan_bin_size):
+    """ Create dask array with channel metadata for each chunk channel """
+    chan_chunks = _chan_chunks(row_chan_arrays, chan_arrays)
 
     if chan_chunks is None:
         return None
@@ -59,8 +116,72 @@ def chan_metadata(row_chan_arrays, chan_arrays, chan_bin_size):
     return chan_mapper
 
 
+def _row_count_wrapper(time, interval, antenna1, antenna2, time_bin_secs):
+    return np.array([np_row_count(time, interval, antenna1, antenna2,
+                                  time_bin_secs=time_bin_secs)],
+                    dtype=np.intp)
+
+
+@requires_optional("dask.array", dask_import_error)
+def row_chunks(time, interval, antenna1, antenna2, time_bin_secs=1.0):
+    """
+    Counts the number of averaged rows produced by each row chunk.
+
+    Only the `time`, `interval`, `antenna1` and `antenna2`
+    columns are required to establish the number of output rows,
+    so this is substantially cheaper than averaging the data itself.
+    Computing the result and passing it to :func:`time_and_channel`
+    as ``row_chunks`` produces averaged arrays with
+    known row chunks:
+
+    .. code-block:: python
+
+        chunks = row_chunks(time, interval, ant1, ant2,
+                            time_bin_secs=4.0)
+        chunks = tuple(chunks.compute())
+
+        avg = time_and_channel(time, interval, ant1, ant2,
+                               vis=vis, time_bin_secs=4.0,
+                               row_chunks=chunks)
+
+    Parameters
+    ----------
+    time : :class:`dask.array.Array`
+        Time values of shape :code:`(row,)`.
+    interval : :class:`dask.array.Array`
+        Interval values of shape :code:`(row,)`.
+    antenna1 : :class:`dask.array.Array`
+        First antenna indices of shape :code:`(row,)`
+    antenna2 : :class:`dask.array.Array`
+        Second antenna indices of shape :code:`(row,)`
+    time_bin_secs : float, optional
+        Maximum summed interval in seconds to include within a bin.
+        Defaults to 1.0.
+
+    Returns
+    -------
+    :class:`dask.array.Array`
+        Number of output rows in each row chunk.
+        Has shape :code:`(row_chunks,)`.
+    """
+    return da.blockwise(_row_count_wrapper, ("row",),
+                        time, ("row",),
+                        interval, ("row",),
+                        antenna1, ("row",),
+                        antenna2, ("row",),
+                        adjust_chunks={"row": 1},
+                        time_bin_secs=time_bin_secs,
+                        meta=np.empty((0,), dtype=np.intp),
+                        dtype=np.intp)
+
+
+def _row_chunk_adjuster(row_chunks):
+    """ Output row chunks are unknown unless supplied """
+    return (lambda x: np.nan) if row_chunks is None else row_chunks
+
+
 def row_mapper(time, interval, antenna1, antenna2,
-               flag_row=None, time_bin_secs=1.0):
+               flag_row=None, time_bin_secs=1.0, row_chunks=None):
     """ Create a dask row mapping structure for each row chunk """
     return da.blockwise(np_row_mapper, ("row",),
                         time, ("row",),
@@ -68,7 +189,7 @@ def row_mapper(time, interval, antenna1, antenna2,
                         antenna1, ("row",),
                         antenna2, ("row",),
                         flag_row, None if flag_row is None else ("row",),
-                        adjust_chunks={"row": lambda x: np.nan},
+                        adjust_chunks={"row": _row_chunk_adjuster(row_chunks)},
                         time_bin_secs=time_bin_secs,
                         meta=np.empty((0,), dtype=np.object),
                         dtype=np.object)
@@ -104,7 +225,7 @@ def _row_average_wrapper(row_meta, ant1, ant2, flag_row,
 
 def row_average(row_meta, ant1, ant2, flag_row=None,
                 time_centroid=None, exposure=None, uvw=None,
-                weight=None, sigma=None):
+                weight=None, sigma=None, row_chunks=None):
     """ Average row-based dask arrays """
 
     rd = ("row",)
@@ -124,7 +245,7 @@ def row_average(row_meta, ant1, ant2, flag_row=None,
     avg = da.blockwise(_row_average_wrapper, rd,
                        *(v for pair in args for v in pair[1:]),
                        align_arrays=False,
-                       adjust_chunks={"row": lambda x: np.nan},
+                       adjust_chunks={"row": _row_chunk_adjuster(row_chunks)},
                        meta=np.empty((0,)*len(rd), dtype=np.object),
                        dtype=np.object)
 
@@ -159,16 +280,16 @@ _row_chan_avg_dims = ("row", "chan", "corr")
 def row_chan_average(row_meta, chan_meta, flag_row=None, weight=None,
                      vis=None, flag=None,
                      weight_spectrum=None, sigma_spectrum=None,
-                     chan_bin_size=1):
+                     chan_bin_size=1, row_chunks=None):
     """ Average (row,chan,corr)-based dask arrays """
 
     if chan_meta is None:
         return RowChanAverageOutput(None, None, None, None)
 
-    # We don't know how many rows are in each row chunk,
+    # We may not know how many rows are in each row chunk,
     # but we can simply divide each channel chunk size by the bin size
     adjust_chunks = {
-        "row": lambda r: np.nan,
+        "row": _row_chunk_adjuster(row_chunks),
         "chan": lambda c: (c + chan_bin_size - 1) // chan_bin_size
     }
 
@@ -275,22 +396,39 @@ def time_and_channel(time, interval, antenna1, antenna2,
                      effective_bw=None, resolution=None,
                      vis=None, flag=None,
                      weight_spectrum=None, sigma_spectrum=None,
-                     time_bin_secs=1.0, chan_bin_size=1):
+                     time_bin_secs=1.0, chan_bin_size=1,
+                     row_chunks=None):
 
     row_chan_arrays = (vis, flag, weight_spectrum, sigma_spectrum)
     chan_arrays = (chan_freq, chan_width, effective_bw, resolution)
 
+    # Align channel chunks with channel bins
+    row_chan_arrays, chan_arrays = align_chan_chunks(row_chan_arrays,
+                                                     chan_arrays,
+                                                     chan_bin_size)
+    vis, flag, weight_spectrum, sigma_spectrum = row_chan_arrays
+    chan_freq, chan_width, effective_bw, resolution = chan_arrays
+
     # The flow of this function should match that of the numba
     # time_and_channel implementation
 
     # Merge flag_row and flag arrays
     flag_row = merge_flags(flag_row, flag)
 
+    if row_chunks is not None:
+        row_chunks = tuple(row_chunks)
+
+        if len(row_chunks) != len(time.chunks[0]):
+            raise ValueError("Number of row_chunks %d does not match "
+                             "the number of input row chunks %d" %
+                             (len(row_chunks), len(time.chunks[0])))
+
     # Generate row mapping metadata
     row_meta = row_mapper(time, interval,
                           antenna1, antenna2,
                           flag_row=flag_row,
-                          time_bin_secs=time_bin_secs)
+                          time_bin_secs=time_bin_secs,
+                          row_chunks=row_chunks)
 
     # Generate channel mapping metadata
     chan_meta = chan_metadata(row_chan_arrays, chan_arrays, chan_bin_size)
@@ -300,7 +438,8 @@ def time_and_channel(time, interval, antenna1, antenna2,
                            flag_row=flag_row,
                            time_centroid=time_centroid,
                            exposure=exposure, uvw=uvw,
-                           weight=weight, sigma=sigma)
+                           weight=weight, sigma=sigma,
+                           row_chunks=row_chunks)
 
     # Average channel data
     row_chan_data = row_chan_average(row_meta, chan_meta,
@@ -308,13 +447,15 @@ def time_and_channel(time, interval, antenna1, antenna2,
                                      vis=vis, flag=flag,
                                      weight_spectrum=weight_spectrum,
                                      sigma_spectrum=sigma_spectrum,
-                                     chan_bin_size=chan_bin_size)
+                                     chan_bin_size=chan_bin_size,
+                                     row_chunks=row_chunks)
 
     chan_data = chan_average(chan_meta,
                              chan_freq=chan_freq,
                              chan_width=chan_width,
                              effective_bw=effective_bw,
-                             resolution=resolution)
+                             resolution=resolution,
+                             chan_bin_size=chan_bin_size)
 
     # Merge output tuples
     return AverageOutput(_getitem_row(row_meta, 1, time, ("row",)),
@@ -338,8 +479,20 @@ def time_and_channel(time, interval, antenna1, antenna2,
                          row_chan_data.sigma_spectrum)
 
 
+_ROW_CHUNKS_DOCS = """row_chunks : tuple of int, optional
+    Number of output rows produced by each input row chunk,
+    as computed by :func:`row_chunks`.
+    If supplied, the row chunks of the output arrays are known.
+    Otherwise they are unknown, :code:`nan` values.
+"""
+
+DASK_AVERAGING_DOCS = DocstringTemplate(
+    AVERAGING_DOCS.template.replace("\nNotes\n-----\n",
+                                    _ROW_CHUNKS_DOCS + "\nNotes\n-----\n"))
+
+
 try:
-    time_and_channel.__doc__ = AVERAGING_DOCS.substitute(
+    time_and_channel.__doc__ = DASK_AVERAGING_DOCS.substitute(
                                     array_type=":class:`dask.array.Array`")
 except AttributeError:
     pass
@@ -0,0 +1,451 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Benchmarks :func:`row_mapper`, :func:`channel_mapper` and the
+numpy and dask :func:`time_and_channel` averaging functions on
+a synthetic observation with a MeerKAT-like layout.
+
+Each benchmark case runs in a separate process so that
+the peak memory reported for each case is independent of the others.
+Peak memory is reported as the increase in the peak resident set size
+of the process over a baseline taken just before the case runs,
+once its input data has been synthesised.
+On Linux the peak is reset when the baseline is taken,
+so that memory used to compile kernels and synthesise inputs
+is excluded. Elsewhere, such memory may mask the peak of the case.
+
+.. code-block:: bash
+
+    # Fast, small observation suitable for checking regressions
+    $ python benchmark_averaging.py --preset small
+    # 64 antennas, 8 hours of 8s dumps and 4096 channels
+    $ python benchmark_averaging.py --preset meerkat -b row_mapper dask
+    # Override preset values
+    $ python benchmark_averaging.py --preset meerkat -fd 0.0 0.5 \\
+        -rc 16 64 -cc 1024 4096 -b dask
+
+The numpy :func:`time_and_channel` benchmark only averages the first
+``--numpy-dumps`` dumps of the observation, as a full resolution
+MeerKAT observation does not fit in memory.
+The dask benchmark averages the full observation,
+generating input visibilities lazily
+and discarding averaged output chunks as they are produced.
+"""
+
+import argparse
+from collections import namedtuple
+import itertools
+import multiprocessing
+import resource
+import sys
+from timeit import default_timer as timer
+
+import numpy as np
+
+from africanus.averaging.time_and_channel_avg import time_and_channel
+from africanus.averaging.time_and_channel_mapping import (row_mapper,
+                                                          channel_mapper)
+
+try:
+    import dask
+    import dask.array as da
+except ImportError:
+    da = None
+
+
+PRESETS = {
+    "small": {
+        "antennas": 7,
+        "hours": 0.25,
+        "dump": 8.0,
+        "channels": 64,
+        "numpy_dumps": 32,
+        "row_chunks": [8, 32],
+        "chan_chunks": [16, 64],
+    },
+    "meerkat": {
+        "antennas": 64,
+        "hours": 8.0,
+        "dump": 8.0,
+        "channels": 4096,
+        "numpy_dumps": 4,
+        "row_chunks": [8, 32],
+        "chan_chunks": [1024, 4096],
+    },
+}
+
+BENCHMARKS = ["row_mapper", "channel_mapper", "numpy", "dask"]
+
+Case = namedtuple("Case", ["benchmark", "flag_density",
+                           "row_chunks", "chan_chunks"])
+Result = namedtuple("Result", ["case", "time", "peak_memory"])
+
+
+def create_parser():
+    p = argparse.ArgumentParser()
+    p.add_argument("-p", "--preset", choices=list(PRESETS.keys()),
+                   default="small")
+    p.add_argument("-b", "--benchmarks", nargs="+", choices=BENCHMARKS,
+                   default=BENCHMARKS)
+    p.add_argument("-na", "--antennas", type=int,
+                   help="Number of antennas")
+    p.add_argument("-nh", "--hours", type=float,
+                   help="Length of the observation in hours")
+    p.add_argument("-d", "--dump", type=float,
+                   help="Dump rate (integration time) in seconds")
+    p.add_argument("-nc", "--channels", type=int,
+                   help="Number of channels")
+    p.add_argument("-ncorr", "--correlations", type=int, default=4)
+    p.add_argument("-nd", "--numpy-dumps", type=int,
+                   help="Number of dumps averaged by the numpy benchmark")
+    p.add_argument("-rc", "--row-chunks", type=int, nargs="+",
+                   help="Dask row chunk sizes, in dumps")
+    p.add_argument("-cc", "--chan-chunks", type=int, nargs="+",
+                   help="Dask channel chunk sizes")
+    p.add_argument("-fd", "--flag-density", type=float, nargs="+",
+                   default=[0.0, 0.1, 0.5])
+    p.add_argument("-t", "--time-bin-secs", type=float, default=32.0)
+    p.add_argument("-c", "--chan-bin-size", type=int, default=16)
+    p.add_argument("-r", "--repeats", type=int, default=3)
+    return p
+
+
+def parse_args(argv=None):
+    args = create_parser().parse_args(argv)
+
+    # Fill in unspecified arguments from the preset
+    for k, v in PRESETS[args.preset].items():
+        if getattr(args, k) is None:
+            setattr(args, k, v)
+
+    return args
+
+
+def benchmark_cases(args):
+    for b in args.benchmarks:
+        if b == "channel_mapper":
+            yield Case(b, None, None, None)
+        elif b in ("row_mapper", "numpy"):
+            for fd in args.flag_density:
+                yield Case(b, fd, None, None)
+        elif b == "dask":
+            for fd, rc, cc in itertools.product(args.flag_density,
+                                                args.row_chunks,
+                                                args.chan_chunks):
+                yield Case(b, fd, rc, cc)
+        else:
+            raise ValueError("Invalid benchmark %s" % b)
+
+
+def synthesise_rows(args, ntime, flag_density):
+    """ Synthesise row data for ``ntime`` dumps """
+    rs = np.random.RandomState(42)
+
+    ant1, ant2 = (a.astype(np.int32) for a in
+                  np.triu_indices(args.antennas, 1))
+    nbl = ant1.shape[0]
+    nrow = nbl * ntime
+
+    time = np.repeat(np.arange(ntime, dtype=np.float64)*args.dump, nbl)
+    flag_row = (rs.random_sample(nrow) < flag_density).astype(np.uint8)
+
+    return {
+        "time_centroid": time,
+        "exposure": np.full_like(time, args.dump),
+        "antenna1": np.tile(ant1, ntime),
+        "antenna2": np.tile(ant2, ntime),
+        "flag_row": flag_row,
+        "uvw": rs.random_sample((nrow, 3))*1e4,
+        "weight": rs.random_sample((nrow, args.correlations)),
+    }
+
+
+def synthesise_chans(args):
+    chan_width = np.full(args.channels, .856e9 / args.channels)
+
+    return {
+        "chan_freq": .856e9 + np.arange(args.channels)*chan_width,
+        "chan_width": chan_width,
+    }
+
+
+def synthesise_vis(args, flag_row, flag_density):
+    """ Synthesise (row, chan, corr) numpy data """
+    rs = np.random.RandomState(42)
+    shape = (flag_row.shape[0], args.channels, args.correlations)
+
+    vis = np.empty(shape, dtype=np.complex64)
+    flag = np.empty(shape, dtype=np.uint8)
+    weight_spectrum = np.empty(shape, dtype=np.float32)
+
+    # Generate in blocks of rows so that float64 temporaries
+    # do not inflate the peak memory of the setup
+    for s in range(0, shape[0], 1024):
+        e = min(s + 1024, shape[0])
+        block_shape = (e - s,) + shape[1:]
+        vis.real[s:e] = rs.random_sample(block_shape)
+        vis.imag[s:e] = rs.random_sample(block_shape)
+        flag[s:e] = rs.random_sample(block_shape) < flag_density
+        weight_spectrum[s:e] = rs.random_sample(block_shape)
+
+    # Flagged rows must be consistent with flags
+    flag[flag_row != 0] = 1
+    flag_row[:] = flag.all(axis=(1, 2))
+
+    return {
+        "vis": vis,
+        "flag": flag,
+        "weight_spectrum": weight_spectrum,
+    }
+
+
+def _random_vis(x, block_info=None):
+    shape = block_info[None]["chunk-shape"]
+    rs = np.random.RandomState(hash(block_info[None]["chunk-location"])
+                               % 2**32)
+    vis = np.empty(shape, dtype=np.complex64)
+    vis.real = rs.random_sample(shape)
+    vis.imag = rs.random_sample(shape)
+    return vis
+
+
+def _random_flag(x, flag_density, block_info=None):
+    shape = block_info[None]["chunk-shape"]
+    rs = np.random.RandomState(hash(block_info[None]["chunk-location"])
+                               % 2**32)
+    return (rs.random_sample(shape) < flag_density).astype(np.uint8)
+
+
+def synthesise_dask(args, rows, chans, case):
+    """ Synthesise lazily generated dask arrays """
+    nbl = args.antennas*(args.antennas - 1) // 2
+    nrow = rows["time_centroid"].shape[0]
+    rc = case.row_chunks*nbl
+
+    # Flagged rows are derived from the lazily generated flags
+    dask_rows = {k: da.from_array(v, chunks=(rc,) + v.shape[1:])
+                 for k, v in rows.items() if k != "flag_row"}
+    dask_chans = {k: da.from_array(v, chunks=case.chan_chunks)
+                  for k, v in chans.items()}
+
+    chunks = (rc, case.chan_chunks, args.correlations)
+    shape = (nrow, args.channels, args.correlations)
+    template = da.empty(shape, chunks=chunks, dtype=np.uint8)
+
+    vis = template.map_blocks(_random_vis, dtype=np.complex64)
+    flag = template.map_blocks(_random_flag, case.flag_density,
+                               dtype=np.uint8)
+
+    dask_rows.update(dask_chans)
+    dask_rows["vis"] = vis
+    dask_rows["flag"] = flag
+
+    return dask_rows
+
+
+class NullStore(object):
+    """ Discards averaged output chunks """
+    def __setitem__(self, key, value):
+        pass
+
+
+def peak_rss():
+    """ Peak resident set size of this process in bytes """
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, while OSX reports bytes
+    return rss if sys.platform == "darwin" else rss*1024
+
+
+def reset_peak_rss():
+    """
+    Resets the peak resident set size of this process
+    to the current resident set size, if supported (Linux).
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except (IOError, OSError):
+        pass
+
+
+def numpy_average(args, data):
+    return time_and_channel(data["time_centroid"], data["exposure"],
+                            data["antenna1"], data["antenna2"],
+                            time_centroid=data["time_centroid"],
+                            exposure=data["exposure"],
+                            flag_row=data["flag_row"],
+                            uvw=data["uvw"], weight=data["weight"],
+                            chan_freq=data["chan_freq"],
+                            chan_width=data["chan_width"],
+                            vis=data["vis"], flag=data["flag"],
+                            weight_spectrum=data["weight_spectrum"],
+                            time_bin_secs=args.time_bin_secs,
+                            chan_bin_size=args.chan_bin_size)
+
+
+def dask_average(args, data):
+    from africanus.averaging.dask import (time_and_channel as dask_avg,
+                                          row_chunks)
+
+    with dask.config.set(scheduler="threads"):
+        # Establish output row chunks so that the output can be stored
+        out_row_chunks = row_chunks(data["time_centroid"], data["exposure"],
+                                    data["antenna1"], data["antenna2"],
+                                    time_bin_secs=args.time_bin_secs)
+
+        avg = dask_avg(data["time_centroid"], data["exposure"],
+                       data["antenna1"], data["antenna2"],
+                       time_centroid=data["time_centroid"],
+                       exposure=data["exposure"],
+                       uvw=data["uvw"], weight=data["weight"],
+                       chan_freq=data["chan_freq"],
+                       chan_width=data["chan_width"],
+                       vis=data["vis"], flag=data["flag"],
+                       time_bin_secs=args.time_bin_secs,
+                       chan_bin_size=args.chan_bin_size,
+                       row_chunks=tuple(out_row_chunks.compute()))
+
+        outputs = [a for a in avg if a is not None]
+        da.store(outputs, [NullStore() for _ in outputs], lock=False)
+
+
+def setup_case(args, case):
+    """
+    Returns a function to benchmark for ``case``,
+    along with a warmup function compiling the underlying kernels.
+    """
+    ntime = int(args.hours*3600 / args.dump)
+
+    if case.benchmark == "row_mapper":
+        def run(data):
+            return row_mapper(data["time_centroid"], data["exposure"],
+                              data["antenna1"], data["antenna2"],
+                              flag_row=data["flag_row"],
+                              time_bin_secs=args.time_bin_secs)
+
+        def create(ntime):
+            return synthesise_rows(args, ntime, case.flag_density)
+    elif case.benchmark == "channel_mapper":
+        def run(data):
+            return channel_mapper(args.channels, args.chan_bin_size)
+
+        def create(ntime):
+            return {}
+    elif case.benchmark == "numpy":
+        def run(data):
+            return numpy_average(args, data)
+
+        def create(ntime):
+            data = synthesise_rows(args, ntime, case.flag_density)
+            data.update(synthesise_chans(args))
+            data.update(synthesise_vis(args, data["flag_row"],
+                                       case.flag_density))
+            return data
+
+        ntime = min(ntime, args.numpy_dumps)
+    elif case.benchmark == "dask":
+        if da is None:
+            raise ImportError("dask is required for the dask benchmark")
+
+        def run(data):
+            return dask_average(args, data)
+
+        def create(ntime):
+            rows = synthesise_rows(args, ntime, case.flag_density)
+            return synthesise_dask(args, rows, synthesise_chans(args), case)
+    else:
+        raise ValueError("Invalid benchmark %s" % case.benchmark)
+
+    return create, run, ntime
+
+
+def run_case(args, case):
+    create, run, ntime = setup_case(args, case)
+
+    # Compile kernels on a small problem so that compilation
+    # memory does not contribute to the peak memory
+    run(create(min(ntime, 2)))
+
+    data = create(ntime)
+    reset_peak_rss()
+    base_rss = peak_rss()
+
+    timings = []
+
+    for _ in range(args.repeats):
+        start = timer()
+        run(data)
+        timings.append(timer() - start)
+
+    return Result(case, min(timings), peak_rss() - base_rss)
+
+
+def _run_case(queue, args, case):
+    try:
+        queue.put(run_case(args, case))
+    except Exception as e:
+        queue.put(e)
+
+
+def run_isolated(args, case):
+    """ Runs ``case`` in a separate process """
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_run_case, args=(queue, args, case))
+    proc.start()
+    result = queue.get()
+    proc.join()
+
+    if isinstance(result, Exception):
+        raise result
+
+    return result
+
+
+def format_result(result):
+    case = result.case
+    params = []
+
+    if case.flag_density is not None:
+        params.append("flag_density=%.2f" % case.flag_density)
+
+    if case.row_chunks is not None:
+        params.append("row_chunks=%d" % case.row_chunks)
+
+    if case.chan_chunks is not None:
+        params.append("chan_chunks=%d" % case.chan_chunks)
+
+    return "%-16s %-50s %10.4fs %10.1f MB" % (
+        case.benchmark, " ".join(params),
+        result.time, result.peak_memory / (1024.**2))
+
+
+def main(argv=None, isolate=True):
+    args = parse_args(argv)
+    nbl = args.antennas*(args.antennas - 1) // 2
+    ntime = int(args.hours*3600 / args.dump)
+
+    print("%d antennas, %d baselines, %d dumps, %d rows, "
+          "%d channels, %d correlations" %
+          (args.antennas, nbl, ntime, nbl*ntime,
+           args.channels, args.correlations))
+    print("%-16s %-50s %11s %13s" % ("Benchmark", "Parameters",
+                                     "Time", "Peak Memory"))
+
+    results = []
+
+    for case in benchmark_cases(args):
+        if isolate:
+            result = run_isolated(args, case)
+        else:
+            result = run_case(args, case)
+
+        print(format_result(result))
+        results.append(result)
+
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Compares the multi-pass averaging path (:func:`row_average`,
+:func:`row_chan_average` and :func:`chan_average`) with the
+single pass :func:`fused_average` kernel on synthetic data.
+
+.. code-block:: bash
+
+    $ python benchmark_fused_average.py -na 16 -nt 60 -nc 4096
+"""
+
+import argparse
+from timeit import default_timer as timer
+
+import numpy as np
+
+from africanus.averaging.time_and_channel_avg import (average_from_metadata,
+                                                      fused_average,
+                                                      merge_flags)
+from africanus.averaging.time_and_channel_mapping import (row_mapper,
+                                                          channel_mapper)
+
+
+def create_parser():
+    p = argparse.ArgumentParser()
+    p.add_argument("-na", "--antennas", type=int, default=16)
+    p.add_argument("-nt", "--times", type=int, default=60)
+    p.add_argument("-nc", "--channels", type=int, default=4096)
+    p.add_argument("-ncorr", "--correlations", type=int, default=4)
+    p.add_argument("-t", "--time-bin-secs", type=float, default=16.0)
+    p.add_argument("-c", "--chan-bin-size", type=int, default=16)
+    p.add_argument("-f", "--flag-density", type=float, default=0.05)
+    p.add_argument("-r", "--repeats", type=int, default=3)
+    return p
+
+
+def synthesise(args):
+    rs = np.random.RandomState(42)
+
+    ant1, ant2 = (a.astype(np.int32) for a in
+                  np.triu_indices(args.antennas, 1))
+    nbl = ant1.shape[0]
+    nrow = nbl * args.times
+    chan_corr = (nrow, args.channels, args.correlations)
+
+    time = np.repeat(np.arange(args.times, dtype=np.float64)*8.0, nbl)
+
+    flag = (rs.random_sample(chan_corr) < args.flag_density).astype(np.uint8)
+
+    return {
+        "time": time,
+        "interval": np.full_like(time, 8.0),
+        "antenna1": np.tile(ant1, args.times),
+        "antenna2": np.tile(ant2, args.times),
+        "time_centroid": time,
+        "exposure": np.full_like(time, 8.0),
+        "uvw": rs.random_sample((nrow, 3)),
+        "weight": rs.random_sample((nrow, args.correlations)),
+        "sigma": rs.random_sample((nrow, args.correlations)),
+        "chan_freq": np.linspace(.856e9, 2*.856e9, args.channels),
+        "chan_width": np.full(args.channels, .856e9 / args.channels),
+        "vis": (rs.random_sample(chan_corr) +
+                rs.random_sample(chan_corr)*1j).astype(np.complex64),
+        "flag": flag,
+        "weight_spectrum": rs.random_sample(chan_corr).astype(np.float32),
+        "sigma_spectrum": rs.random_sample(chan_corr).astype(np.float32),
+    }
+
+
+def average_args(data, args):
+    flag_row = merge_flags(None, data["flag"])
+    row_meta = row_mapper(data["time"], data["interval"],
+                          data["antenna1"], data["antenna2"],
+                          flag_row=flag_row,
+                          time_bin_secs=args.time_bin_secs)
+    chan_meta = channel_mapper(args.channels, args.chan_bin_size)
+
+    return (row_meta, chan_meta,
+            data["antenna1"], data["antenna2"],
+            data["time_centroid"], data["exposure"], flag_row,
+            data["uvw"], data["weight"], data["sigma"],
+            data["chan_freq"], data["chan_width"],
+            data["chan_width"], data["chan_width"],
+            data["vis"], data["flag"],
+            data["weight_spectrum"], data["sigma_spectrum"])
+
+
+def benchmark(fn, fn_args, repeats):
+    # Compile
+    fn(*fn_args)
+
+    timings = []
+
+    for _ in range(repeats):
+        start = timer()
+        fn(*fn_args)
+        timings.append(timer() - start)
+
+    return min(timings)
+
+
+def main():
+    args = create_parser().parse_args()
+    data = synthesise(args)
+    fn_args = average_args(data, args)
+
+    nbytes = sum(a.nbytes for a in data.values())
+    print("Averaging %d rows, %d channels and %d correlations (%.1f MB)" %
+          (data["time"].shape[0], args.channels,
+           args.correlations, nbytes / (1024.**2)))
+
+    multi_pass = benchmark(average_from_metadata, fn_args, args.repeats)
+    single_pass = benchmark(fused_average, fn_args, args.repeats)
+
+    print("Multi-pass  %.3fs" % multi_pass)
+    print("Single-pass %.3fs" % single_pass)
+    print("Speed-up    %.2fx" % (multi_pass / single_pass))
+
+
+if __name__ == "__main__":
+    main()
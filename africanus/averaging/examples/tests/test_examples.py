@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+
+def test_benchmark_averaging():
+    pytest.importorskip("dask.array")
+
+    import dask
+    from africanus.averaging.examples.benchmark_averaging import main
+
+    scheduler = dask.config.get("scheduler", None)
+    results = main(["--preset", "small", "-na", "4", "-nh", "0.05",
+                    "-nc", "16", "-rc", "4", "-cc", "8", "-fd", "0.0", "0.5",
+                    "-r", "1"], isolate=False)
+
+    benchmarks = [r.case.benchmark for r in results]
+    assert benchmarks == (["row_mapper"]*2 + ["channel_mapper"] +
+                          ["numpy"]*2 + ["dask"]*2)
+    assert all(r.time >= 0.0 for r in results)
+    assert all(r.peak_memory >= 0 for r in results)
+
+    # The dask scheduler is only set for the duration of the benchmark
+    assert dask.config.get("scheduler", None) == scheduler
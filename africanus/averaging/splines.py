@@ -8,89 +8,373 @@ from africanus.util.numba import njit
 
 A, B, C = range(3)
 Spline = namedtuple("Spline", "ma mb mc mx my")
+SplineIntervals = namedtuple("SplineIntervals", "index h")
 
 
 @njit(nogil=True, cache=True)
-def solve_trid_system(x, y, left_type=2, right_type=2,
-                      left_value=0.0, right_value=0.0):
+def factorise_trid_system(x, left_type=2, right_type=2):
     """
-    Solves a tridiagonal matrix
+    Constructs the tridiagonal matrix of the cubic spline
+    system for knots ``x`` and performs the forward sweep
+    of the Thomas algorithm.
+
+    As the matrix only depends on ``x``, the factorisation
+    can be shared by all splines fitted on the same knots.
 
     https://en.wikipedia.org/wiki/Tridiagonal_matrix_algorithm
+
+    Returns
+    -------
+    diag : :class:`numpy.ndarray`
+        Factorised matrix of shape :code:`(knot, 3)`. The ``A``
+        column holds the forward sweep multipliers, while the ``B``
+        and ``C`` columns hold the diagonal and upper diagonal.
     """
-    diag = np.zeros((x.shape[0], 3), dtype=x.dtype)
-    v = np.zeros_like(y)
     n = x.shape[0]
 
+    if n < 2:
+        raise ValueError("At least two knots are required")
+
+    diag = np.zeros((n, 3), dtype=x.dtype)
+
     # Construct tridiagonal matrix
     for i in range(1, n-1):
         diag[i, A] = (1.0 / 3.0) * (x[i] - x[i-1])
         diag[i, B] = (2.0 / 3.0) * (x[i+1] - x[i-1])
         diag[i, C] = (1.0 / 3.0) * (x[i+1] - x[i])
-        v[i] = ((y[i+1] - y[i])/(x[i+1] - x[i]) -
-                (y[i] - y[i-1])/(x[i] - x[i-1]))
 
     # Configure left end point
     if left_type == 2:
-        diag[0, A] = 0.0
         diag[0, B] = 2.0
-        diag[0, C] = left_value
+        diag[0, C] = 0.0
     elif left_type == 1:
-        diag[0, A] = 1.0 * (x[1] - x[0])
         diag[0, B] = 2.0 * (x[1] - x[0])
-        v[0] = 3.0 * (-left_value + (y[1] - y[0]) / (x[1] - x[0]))
+        diag[0, C] = 1.0 * (x[1] - x[0])
     else:
         raise ValueError("left_type not in (1, 2)")
 
     # Configure right endpoint
     if right_type == 2:
+        diag[n-1, A] = 0.0
         diag[n-1, B] = 2.0
-        diag[n-1, C] = 0.0
-        v[n-1] = right_value
-    elif left_type == 1:
+    elif right_type == 1:
+        diag[n-1, A] = 1.0 * (x[n-1] - x[n-2])
         diag[n-1, B] = 2.0 * (x[n-1] - x[n-2])
-        diag[n-1, C] = 1.0 * (x[n-1] - x[n-2])
-        v[n-1] = 3.0 * (right_value - (y[n-1] - y[n-2]) / (x[n-1] - x[n-2]))
     else:
         raise ValueError("right_type not in (1, 2)")
 
-    # Solve tridiagonal system in place
+    # Forward sweep, storing multipliers in place of the lower diagonal
     for i in range(1, n):
-        w = diag[i, A] - diag[i-1, B]
+        w = diag[i, A] / diag[i-1, B]
         diag[i, B] -= w*diag[i-1, C]
-        v[i] -= w*v[i-1]
+        diag[i, A] = w
+
+    return diag
 
-    # Compute solution
-    z = np.zeros_like(v)
-    z[n-1] = v[n-1] / diag[n-1, B]
 
-    for i in range(n - 1, -1, -1):
-        z[i] = (v[i] - diag[i, C]*z[i+1])/diag[i, B]
+@njit(nogil=True, cache=True)
+def solve_factorised_system(diag, x, y, left_type=2, right_type=2,
+                            left_value=0.0, right_value=0.0):
+    """
+    Solves the cubic spline system factorised by
+    :func:`factorise_trid_system` for each column of ``y``,
+    of shape :code:`(knot, spline)`.
+    """
+    n, nspline = y.shape
+    v = np.empty_like(y)
+
+    # Construct right hand side
+    for i in range(1, n-1):
+        for s in range(nspline):
+            v[i, s] = ((y[i+1, s] - y[i, s])/(x[i+1] - x[i]) -
+                       (y[i, s] - y[i-1, s])/(x[i] - x[i-1]))
 
-    return z
+    for s in range(nspline):
+        if left_type == 2:
+            v[0, s] = left_value
+        else:
+            v[0, s] = 3.0 * ((y[1, s] - y[0, s]) / (x[1] - x[0]) -
+                             left_value)
+
+        if right_type == 2:
+            v[n-1, s] = right_value
+        else:
+            v[n-1, s] = 3.0 * (right_value -
+                               (y[n-1, s] - y[n-2, s]) / (x[n-1] - x[n-2]))
+
+    # Apply forward sweep multipliers
+    for i in range(1, n):
+        w = diag[i, A]
+
+        for s in range(nspline):
+            v[i, s] -= w*v[i-1, s]
+
+    # Back substitute
+    for s in range(nspline):
+        v[n-1, s] /= diag[n-1, B]
+
+    for i in range(n - 2, -1, -1):
+        for s in range(nspline):
+            v[i, s] = (v[i, s] - diag[i, C]*v[i+1, s])/diag[i, B]
+
+    return v
 
 
 @njit(nogil=True, cache=True)
-def fit_cubic_spline(x, y, left_type=2, right_type=2,
-                     left_value=0.0, right_value=0.0):
-    b = solve_trid_system(x, y, left_type, right_type, left_value, right_value)
+def solve_trid_system(x, y, left_type=2, right_type=2,
+                      left_value=0.0, right_value=0.0):
+    """
+    Solves a tridiagonal matrix
+
+    https://en.wikipedia.org/wiki/Tridiagonal_matrix_algorithm
+    """
+    diag = factorise_trid_system(x, left_type, right_type)
+    y2d = np.ascontiguousarray(y).reshape((y.shape[0], 1))
+    z = solve_factorised_system(diag, x, y2d, left_type, right_type,
+                                left_value, right_value)
+
+    return z.reshape(y.shape[0])
+
+
+@njit(nogil=True, cache=True)
+def spline_coefficients(x, y, b):
+    """
+    Computes the cubic and linear coefficients of the splines
+    from the quadratic coefficients ``b`` of shape :code:`(knot, spline)`
+    """
+    n, nspline = y.shape
     a = np.empty_like(b)
     c = np.empty_like(b)
 
+    for i in range(n - 1):
+        dx = x[i+1] - x[i]
+
+        for s in range(nspline):
+            a[i, s] = (b[i+1, s] - b[i, s]) / (3*dx)
+            c[i, s] = ((y[i+1, s] - y[i, s]) / dx -
+                       (2.0*b[i, s] + b[i+1, s]) * dx / 3.0)
+
+    h = x[n-1] - x[n-2]
+
+    for s in range(nspline):
+        a[n-1, s] = 0
+        c[n-1, s] = 3.0*a[n-2, s]*h*h + 2.0*b[n-2, s]*h + c[n-2, s]
+
+    return a, c
+
+
+@njit(nogil=True, cache=True)
+def fit_cubic_spline(x, y, left_type=2, right_type=2,
+                     left_value=0.0, right_value=0.0):
+    y2d = np.ascontiguousarray(y).reshape((y.shape[0], 1))
+    splines = fit_cubic_splines(x, y2d,
+                                left_type, right_type,
+                                left_value, right_value)
+
     n = x.shape[0]
 
-    for i in range(n - 1):
-        a[i] = (b[i+1] - b[i]) / (3*(x[i+1] - x[i]))
-        c[i] = ((y[i+1] - y[i]) / (x[i+1] - x[i]) -
-                (2.0*b[i] + b[i+1]) * (x[i+1] - x[i]) / 3.0)
+    return Spline(splines.ma.reshape(n), splines.mb.reshape(n),
+                  splines.mc.reshape(n), x, y)
+
+
+@njit(nogil=True, cache=True)
+def fit_cubic_splines(x, y, left_type=2, right_type=2,
+                      left_value=0.0, right_value=0.0):
+    """
+    Fits a batch of cubic splines sharing the knots ``x``
+    in a single call.
 
-    h = x[n-2] - x[n-1]
-    a[n-1] = 0
-    c[n-1] = 3.0*a[n-2]*h*h + 2.0*b[n-2]*h + c[n-2]
+    The tridiagonal system is factorised once for
+    all splines and each stage of the solution
+    iterates over splines in the inner loop.
+
+    Parameters
+    ----------
+    x : :class:`numpy.ndarray`
+        Monotonically increasing knots of shape :code:`(knot,)`
+    y : :class:`numpy.ndarray`
+        Values of shape :code:`(knot, spline)`.
+    left_type : {1, 2}, optional
+        Type of the left boundary condition. 1 specifies the first
+        derivative and 2 the second derivative. Defaults to 2.
+    right_type : {1, 2}, optional
+        Type of the right boundary condition. Defaults to 2.
+    left_value : float, optional
+        Value of the left boundary derivative. Defaults to 0.0.
+    right_value : float, optional
+        Value of the right boundary derivative. Defaults to 0.0.
+
+    Returns
+    -------
+    spline : :class:`Spline`
+        Spline coefficients of shape :code:`(knot, spline)`.
+    """
+    y = np.ascontiguousarray(y)
+    diag = factorise_trid_system(x, left_type, right_type)
+    b = solve_factorised_system(diag, x, y, left_type, right_type,
+                                left_value, right_value)
+    a, c = spline_coefficients(x, y, b)
 
     return Spline(a, b, c, x, y)
 
 
+@njit(nogil=True, cache=True)
+def spline_intervals(mx, x):
+    """
+    Finds the knot interval containing each point in ``x``,
+    for reuse across multiple calls to :func:`evaluate_splines`.
+
+    Sorted points are located in a single linear sweep over
+    the knots, while unsorted points fall back to a binary search.
+
+    Parameters
+    ----------
+    mx : :class:`numpy.ndarray`
+        Spline knots of shape :code:`(knot,)`
+    x : :class:`numpy.ndarray`
+        Points of shape :code:`(point,)`
+
+    Returns
+    -------
+    intervals : :class:`SplineIntervals`
+        The knot ``index`` of each point, of shape :code:`(point,)`
+        and the offset ``h`` of each point from that knot.
+    """
+    n = mx.shape[0]
+    npoint = x.shape[0]
+    index = np.empty(npoint, dtype=np.intp)
+    h = np.empty(npoint, dtype=x.dtype)
+
+    is_sorted = True
+
+    for i in range(1, npoint):
+        if not x[i-1] <= x[i]:
+            is_sorted = False
+            break
+
+    if is_sorted:
+        j = 0
+
+        for i in range(npoint):
+            while j < n and mx[j] <= x[i]:
+                j += 1
+
+            index[i] = max(j - 1, 0)
+    else:
+        for i in range(npoint):
+            index[i] = max(np.searchsorted(mx, x[i], side='right') - 1, 0)
+
+    for i in range(npoint):
+        h[i] = x[i] - mx[index[i]]
+
+    return SplineIntervals(index, h)
+
+
+@njit(nogil=True, cache=True, inline='always')
+def _spline_value(ma, mb, mc, my, j, s, h, order):
+    n = ma.shape[0]
+
+    if h < 0.0 and j == 0:
+        # Extrapolate left with a quadratic
+        if order == 0:
+            return (mb[0, s]*h + mc[0, s])*h + my[0, s]
+        elif order == 1:
+            return 2.0*mb[0, s]*h + mc[0, s]
+        else:
+            return 2.0*mb[0, s]
+    elif j == n - 1:
+        # Extrapolate right with a quadratic
+        if order == 0:
+            return (mb[n-1, s]*h + mc[n-1, s])*h + my[n-1, s]
+        elif order == 1:
+            return 2.0*mb[n-1, s]*h + mc[n-1, s]
+        else:
+            return 2.0*mb[n-1, s]
+    else:
+        if order == 0:
+            return ((ma[j, s]*h + mb[j, s])*h + mc[j, s])*h + my[j, s]
+        elif order == 1:
+            return (3.0*ma[j, s]*h + 2.0*mb[j, s])*h + mc[j, s]
+        else:
+            return 6.0*ma[j, s]*h + 2.0*mb[j, s]
+
+
+@njit(nogil=True, cache=True)
+def evaluate_splines(spline, intervals, order=0):
+    """
+    Evaluates each spline in a batch at each point.
+
+    Parameters
+    ----------
+    spline : :class:`Spline`
+        Batch of splines produced by :func:`fit_cubic_splines`.
+    intervals : :class:`SplineIntervals`
+        Knot intervals of the points,
+        produced by :func:`spline_intervals`.
+    order : {0, 1, 2}, optional
+        Order of the derivative to evaluate. Defaults to 0.
+
+    Returns
+    -------
+    values : :class:`numpy.ndarray`
+        Values of shape :code:`(point, spline)`.
+    """
+    if order != 0 and order != 1 and order != 2:
+        raise ValueError("order not in (0, 1, 2)")
+
+    ma, mb, mc, mx, my = spline
+    index, h = intervals
+
+    nspline = ma.shape[1]
+    values = np.empty((index.shape[0], nspline), dtype=mb.dtype)
+
+    for i in range(index.shape[0]):
+        for s in range(nspline):
+            values[i, s] = _spline_value(ma, mb, mc, my,
+                                         index[i], s, h[i], order)
+
+    return values
+
+
+@njit(nogil=True, cache=True)
+def evaluate_splines_indexed(spline, intervals, spline_index, order=0):
+    """
+    Evaluates a single spline of the batch at each point.
+    For example, evaluating each row at the spline of its baseline.
+
+    Parameters
+    ----------
+    spline : :class:`Spline`
+        Batch of splines produced by :func:`fit_cubic_splines`.
+    intervals : :class:`SplineIntervals`
+        Knot intervals of the points,
+        produced by :func:`spline_intervals`.
+    spline_index : :class:`numpy.ndarray`
+        Index of the spline to evaluate at each point,
+        of shape :code:`(point,)`.
+    order : {0, 1, 2}, optional
+        Order of the derivative to evaluate. Defaults to 0.
+
+    Returns
+    -------
+    values : :class:`numpy.ndarray`
+        Values of shape :code:`(point,)`.
+    """
+    if order != 0 and order != 1 and order != 2:
+        raise ValueError("order not in (0, 1, 2)")
+
+    ma, mb, mc, mx, my = spline
+    index, h = intervals
+
+    values = np.empty(index.shape[0], dtype=mb.dtype)
+
+    for i in range(index.shape[0]):
+        values[i] = _spline_value(ma, mb, mc, my,
+                                  index[i], spline_index[i], h[i], order)
+
+    return values
+
+
 @njit(nogil=True, cache=True)
 def evaluate_spline(spline, x, order=0):
     ma, mb, mc, mx, my = spline
@@ -99,7 +383,7 @@ def evaluate_spline(spline, x, order=0):
     mb0 = mb[0] if not force_linear_extrapolation else 0.0
     mc0 = mc[0]
 
-    n = x.shape[0]
+    n = mx.shape[0]
     values = np.empty_like(x)
 
     if order == 0:
@@ -107,9 +391,9 @@ def evaluate_spline(spline, x, order=0):
             j = max(np.searchsorted(mx, p, side='right') - 1, 0)
             h = p - mx[j]
 
-            if p < x[0]:
+            if p < mx[0]:
                 values[i] = (mb0*h + mc0)*h + my[0]
-            elif p > x[n-1]:
+            elif p > mx[n-1]:
                 values[i] = (mb[n-1]*h + mc[n-1])*h + my[n-1]
             else:
                 values[i] = ((ma[j]*h + mb[j])*h + mc[j])*h + my[j]
@@ -119,9 +403,9 @@ def evaluate_spline(spline, x, order=0):
             j = max(np.searchsorted(mx, p, side='right') - 1, 0)
             h = p - mx[j]
 
-            if p < x[0]:
+            if p < mx[0]:
                 values[i] = 2.0*mb0*h + mc0
-            elif p > x[n-1]:
+            elif p > mx[n-1]:
                 values[i] = 2.0*mb[n-1]*h + mc[n-1]
             else:
                 values[i] = (3.0*ma[j]*h + 2.0*mb[j])*h + mc[j]
@@ -130,9 +414,9 @@ def evaluate_spline(spline, x, order=0):
             j = max(np.searchsorted(mx, p, side='right') - 1, 0)
             h = p - mx[j]
 
-            if p < x[0]:
-                values[i] = 2.0*mb0*h
-            elif p > x[n-1]:
+            if p < mx[0]:
+                values[i] = 2.0*mb0
+            elif p > mx[n-1]:
                 values[i] = 2.0*mb[n-1]
             else:
                 values[i] = 6.0*ma[j]*h + 2.0*mb[j]
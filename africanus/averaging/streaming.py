@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+
+
+import numpy as np
+
+from africanus.averaging.support import unique_baselines
+from africanus.averaging.time_and_channel_avg import time_and_channel
+from africanus.averaging.time_and_channel_mapping import row_mapper
+from africanus.util.numba import njit
+
+
+@njit(nogil=True, cache=True)
+def open_bin_rows(row_map, out_rows, time, antenna1, antenna2):
+    """
+    Identifies the rows contributing to the last bin of each baseline.
+    These bins may still receive samples from subsequent
+    chunks of data and are therefore still open.
+
+    Parameters
+    ----------
+    row_map : :class:`numpy.ndarray`
+        Map from input to output rows of shape :code:`(row,)`,
+        produced by :func:`row_mapper`.
+    out_rows : int
+        Number of output rows in the mapping
+    time : :class:`numpy.ndarray`
+        Time values of shape :code:`(row,)`.
+    antenna1 : :class:`numpy.ndarray`
+        Antenna 1 values of shape :code:`(row,)`.
+    antenna2 : :class:`numpy.ndarray`
+        Antenna 2 values of shape :code:`(row,)`.
+
+    Returns
+    -------
+    open_rows : :class:`numpy.ndarray`
+        Boolean array of shape :code:`(row,)`, True
+        if the row contributes to an open bin.
+    """
+    ubl, _, bl_inv, _ = unique_baselines(antenna1, antenna2)
+    last_row = np.full(ubl.shape[0], -1, dtype=np.intp)
+
+    # Find the latest row in each baseline
+    for r in range(time.shape[0]):
+        bl = bl_inv[r]
+        lr = last_row[bl]
+
+        if lr == -1 or time[r] > time[lr]:
+            last_row[bl] = r
+
+    # The bins containing these rows are open
+    open_bin = np.zeros(out_rows, dtype=np.bool_)
+
+    for bl in range(ubl.shape[0]):
+        open_bin[row_map[last_row[bl]]] = True
+
+    open_rows = np.empty(time.shape[0], dtype=np.bool_)
+
+    for r in range(time.shape[0]):
+        open_rows[r] = open_bin[row_map[r]]
+
+    return open_rows
+
+
+class StreamingAverager(object):
+    """
+    Averages consecutive chunks of row data in time and channel,
+    producing output that is independent of the row chunking.
+
+    :func:`~africanus.averaging.time_and_channel` averages
+    each chunk of data independently so that bins straddling
+    chunk boundaries are split. By contrast, this class
+    retains the rows of the last, possibly incomplete, bin of
+    each baseline and prepends them to the next chunk of data.
+    Only completed bins are emitted by :meth:`update`,
+    while the remaining open bins are emitted by :meth:`finalise`.
+
+    As time bins are established independently of flags,
+    the bins produced by streaming chunks through this class are
+    identical to those produced by averaging all the data at once.
+    At most one bin of rows per baseline is retained between
+    calls to :meth:`update`.
+
+    .. code-block:: python
+
+        averager = StreamingAverager(time_bin_secs=8.0, chan_bin_size=16)
+
+        for chunk in row_chunks:
+            avg = averager.update(chunk["TIME"], chunk["INTERVAL"],
+                                  chunk["ANTENNA1"], chunk["ANTENNA2"],
+                                  vis=chunk["DATA"], flag=chunk["FLAG"])
+            write(avg)
+
+        write(averager.finalise())
+
+    Parameters
+    ----------
+    time_bin_secs : float, optional
+        Maximum summed interval in seconds to include within a bin.
+        Defaults to 1.0.
+    chan_bin_size : int, optional
+        Number of channels to average together.
+        Defaults to 1.
+
+    Notes
+    -----
+    1. Chunks must be supplied in time order. The minimum time
+       of a chunk should be greater than the maximum time of
+       the previous chunk.
+    2. The same set of columns must be supplied to each
+       call to :meth:`update`.
+    3. The output of each call to :meth:`update` and :meth:`finalise`
+       is ordered in the same manner as
+       :func:`~africanus.averaging.time_and_channel`, but
+       rows are not ordered across calls.
+    """
+    def __init__(self, time_bin_secs=1.0, chan_bin_size=1):
+        self.time_bin_secs = time_bin_secs
+        self.chan_bin_size = chan_bin_size
+        self._carry = None
+        self._chan_data = None
+        self._max_time = None
+
+    @property
+    def carried_rows(self):
+        """ Number of input rows currently held in open bins """
+        if self._carry is None:
+            return 0
+
+        return self._carry["time"].shape[0]
+
+    def _merge(self, columns):
+        """ Prepend carried rows to the columns of the current chunk """
+        present = set(k for k, v in columns.items() if v is not None)
+
+        if self._carry is None:
+            return columns
+
+        carried = set(k for k, v in self._carry.items() if v is not None)
+
+        if present != carried:
+            raise ValueError("Columns %s differ from columns %s "
+                             "supplied to previous chunks" %
+                             (sorted(present), sorted(carried)))
+
+        return {k: None if v is None else
+                np.concatenate([self._carry[k], v], axis=0)
+                for k, v in columns.items()}
+
+    def _average(self, columns):
+        return time_and_channel(time_bin_secs=self.time_bin_secs,
+                                chan_bin_size=self.chan_bin_size,
+                                **columns, **self._chan_data)
+
+    def update(self, time, interval, antenna1, antenna2,
+               time_centroid=None, exposure=None, flag_row=None,
+               uvw=None, weight=None, sigma=None,
+               chan_freq=None, chan_width=None,
+               effective_bw=None, resolution=None,
+               vis=None, flag=None,
+               weight_spectrum=None, sigma_spectrum=None):
+        """
+        Adds a chunk of row data to the averager.
+
+        Parameters are the same as those of
+        :func:`~africanus.averaging.time_and_channel`.
+        Channel columns need only be supplied on the first call.
+
+        Returns
+        -------
+        namedtuple
+            A namedtuple of averages for the bins completed by this chunk.
+            Output arrays will be ``None`` if the inputs were ``None``.
+        """
+        if time.shape[0] > 0:
+            min_time = time.min()
+
+            if self._max_time is not None and min_time < self._max_time:
+                raise ValueError("Chunks must be supplied in time order. "
+                                 "Chunk minimum time %f is less than the "
+                                 "previous maximum time %f" %
+                                 (min_time, self._max_time))
+
+            self._max_time = time.max()
+
+        if self._chan_data is None:
+            self._chan_data = {"chan_freq": chan_freq,
+                               "chan_width": chan_width,
+                               "effective_bw": effective_bw,
+                               "resolution": resolution}
+
+        columns = self._merge({"time": time,
+                               "interval": interval,
+                               "antenna1": antenna1,
+                               "antenna2": antenna2,
+                               "time_centroid": time_centroid,
+                               "exposure": exposure,
+                               "flag_row": flag_row,
+                               "uvw": uvw,
+                               "weight": weight,
+                               "sigma": sigma,
+                               "vis": vis,
+                               "flag": flag,
+                               "weight_spectrum": weight_spectrum,
+                               "sigma_spectrum": sigma_spectrum})
+
+        # Time bins are established independently of flags
+        row_meta = row_mapper(columns["time"], columns["interval"],
+                              columns["antenna1"], columns["antenna2"],
+                              time_bin_secs=self.time_bin_secs)
+
+        open_rows = open_bin_rows(row_meta.map, row_meta.time.shape[0],
+                                  columns["time"],
+                                  columns["antenna1"],
+                                  columns["antenna2"])
+
+        self._carry = {k: None if v is None else v[open_rows]
+                       for k, v in columns.items()}
+
+        closed_rows = ~open_rows
+
+        return self._average({k: None if v is None else v[closed_rows]
+                              for k, v in columns.items()})
+
+    def finalise(self):
+        """
+        Averages and emits any open bins.
+
+        Returns
+        -------
+        namedtuple or None
+            A namedtuple of averages for the remaining open bins,
+            or ``None`` if no data was supplied to :meth:`update`.
+        """
+        if self._carry is None:
+            return None
+
+        avg = self._average(self._carry)
+
+        self._carry = None
+        self._chan_data = None
+        self._max_time = None
+
+        return avg
@@ -7,6 +7,17 @@ import numba
 from africanus.util.numba import generated_jit, njit
 
 
+@njit(nogil=True, cache=True)
+def _is_sorted(data):
+    """ Returns True if data is monotonically non-decreasing """
+    for i in range(1, data.shape[0]):
+        # Negated so that NaNs are treated as unsorted
+        if not data[i - 1] <= data[i]:
+            return False
+
+    return True
+
+
 @njit(nogil=True, cache=True)
 def _unique_internal(data):
     if len(data.shape) != 1:
@@ -21,7 +32,11 @@ def _unique_internal(data):
                 np.empty((0,), dtype=np.intp))
 
     # See numpy's unique1d
-    perm = np.argsort(data, kind='mergesort')
+    # A stable sort of sorted data is the identity permutation
+    if _is_sorted(data):
+        perm = np.arange(data.shape[0])
+    else:
+        perm = np.argsort(data, kind='mergesort')
 
     # Combine these arrays to save on allocations?
     aux = np.empty_like(data)
@@ -53,6 +68,130 @@ def _unique_internal(data):
     return aux[mask], perm[mask], inv_idx, np.diff(np.array(counts))
 
 
+_SORT_CHUNK_SIZE = 2**16
+_MAX_SORT_CHUNKS = 256
+
+
+@njit(nogil=True, cache=True)
+def _merge(data, src, dst, lo, mid, hi):
+    """
+    Stably merges the sorted permutations ``src[lo:mid]``
+    and ``src[mid:hi]`` of ``data`` into ``dst[lo:hi]``
+    """
+    i = lo
+    j = mid
+
+    for k in range(lo, hi):
+        # Prefer the left run on ties for stability
+        if i < mid and (j >= hi or data[src[i]] <= data[src[j]]):
+            dst[k] = src[i]
+            i += 1
+        else:
+            dst[k] = src[j]
+            j += 1
+
+
+@njit(nogil=True, cache=True, parallel=True)
+def _parallel_argsort(data, nchunks):
+    """
+    Stable argsort of ``data``, equivalent to
+    ``np.argsort(data, kind='mergesort')``.
+
+    ``data`` is split into ``nchunks`` chunks which are
+    sorted in parallel. Sorted runs are then merged pairwise,
+    in parallel, until a single run remains.
+    """
+    n = data.shape[0]
+    nchunks = max(min(nchunks, n), 1)
+    bounds = np.empty(nchunks + 1, dtype=np.intp)
+
+    for c in range(nchunks + 1):
+        bounds[c] = (c * n) // nchunks
+
+    src = np.empty(n, dtype=np.intp)
+    dst = np.empty(n, dtype=np.intp)
+
+    for c in numba.prange(nchunks):
+        start = bounds[c]
+        end = bounds[c + 1]
+        src[start:end] = start + np.argsort(data[start:end], kind='mergesort')
+
+    width = 1
+
+    while width < nchunks:
+        npairs = (nchunks + 2*width - 1) // (2*width)
+
+        for p in numba.prange(npairs):
+            lo = bounds[2*p*width]
+            mid = bounds[min((2*p + 1)*width, nchunks)]
+            hi = bounds[min((2*p + 2)*width, nchunks)]
+            _merge(data, src, dst, lo, mid, hi)
+
+        src, dst = dst, src
+        width *= 2
+
+    return src
+
+
+@njit(nogil=True, cache=True, parallel=True)
+def _parallel_unique_internal(data):
+    """ Multi-threaded equivalent of :func:`_unique_internal` """
+    if len(data.shape) != 1:
+        raise ValueError("_parallel_unique_internal currently "
+                         "only supports 1D arrays")
+
+    n = data.shape[0]
+
+    # Handle the empty array case
+    if n == 0:
+        return (data,
+                np.empty((0,), dtype=np.intp),
+                np.empty((0,), dtype=np.intp),
+                np.empty((0,), dtype=np.intp))
+
+    if _is_sorted(data):
+        perm = np.arange(n)
+    else:
+        # Chunks are sized independently of the number of threads,
+        # with sufficient chunks to balance load between threads
+        nchunks = min(max(n // _SORT_CHUNK_SIZE, 1), _MAX_SORT_CHUNKS)
+        perm = _parallel_argsort(data, nchunks)
+
+    aux = np.empty_like(data)
+    mask = np.empty(n, dtype=np.bool_)
+
+    for i in numba.prange(n):
+        aux[i] = data[perm[i]]
+
+    mask[0] = True
+
+    for i in numba.prange(1, n):
+        mask[i] = aux[i] != aux[i - 1]
+
+    # Starting index of each unique value in the sorted array
+    starts = np.nonzero(mask)[0]
+    nunique = starts.shape[0]
+
+    uniques = np.empty(nunique, dtype=data.dtype)
+    indices = np.empty(nunique, dtype=np.intp)
+    counts = np.empty(nunique, dtype=np.intp)
+    inv_idx = np.empty(n, dtype=np.intp)
+
+    for u in numba.prange(nunique):
+        start = starts[u]
+        end = starts[u + 1] if u + 1 < nunique else n
+
+        uniques[u] = aux[start]
+        indices[u] = perm[start]
+        counts[u] = end - start
+
+        for i in range(start, end):
+            inv_idx[perm[i]] = u
+
+    # (uniques, indices, inverse index, counts)
+    return uniques, indices, inv_idx, counts
+
+
 @generated_jit(nopython=True, nogil=True, cache=True)
 def unique_time(time):
     """ Return unique time, inverse index and counts """
@@ -66,26 +205,51 @@ def unique_time(time):
 
 
 @generated_jit(nopython=True, nogil=True, cache=True)
-def unique_baselines(ant1, ant2):
-    """ Return unique baselines, inverse index and counts """
+def parallel_unique_time(time):
+    """
+    Multi-threaded equivalent of :func:`unique_time`.
+    Return unique time, inverse index and counts
+    """
+    if time.dtype not in (numba.float32, numba.float64):
+        raise ValueError("time must be floating point but is %s" % time.dtype)
+
+    def impl(time):
+        return _parallel_unique_internal(time)
+
+    return impl
+
+
+def check_antenna_dtypes(ant1, ant2):
     if not ant1.dtype == numba.int32 or not ant2.dtype == numba.int32:
         # Need these to be int32 for the bl_32bit.view(np.int64) trick
         raise ValueError("ant1 and ant2 must be np.int32 "
                          "but received %s and %s" %
                          (ant1.dtype, ant2.dtype))
 
-    def impl(ant1, ant2):
-        # Trickery, stack the two int32 antenna pairs in an array
-        # and cast to int64
-        bl_32bit = np.empty((ant1.shape[0], 2), dtype=np.int32)
 
-        # Copy data
-        for r in range(ant1.shape[0]):
-            bl_32bit[r, 0] = ant1[r]
-            bl_32bit[r, 1] = ant2[r]
+@njit(nogil=True, cache=True)
+def _pack_baselines(ant1, ant2):
+    """ Packs int32 antenna pairs into int64 baseline keys """
+    # Trickery, stack the two int32 antenna pairs in an array
+    # and cast to int64
+    bl_32bit = np.empty((ant1.shape[0], 2), dtype=np.int32)
+
+    # Copy data
+    for r in range(ant1.shape[0]):
+        bl_32bit[r, 0] = ant1[r]
+        bl_32bit[r, 1] = ant2[r]
+
+    # Cast to int64 for the unique operation
+    return bl_32bit.view(np.int64).reshape(ant1.shape[0])
 
-        # Cast to int64 for the unique operation
-        bl = bl_32bit.view(np.int64).reshape(ant1.shape[0])
+
+@generated_jit(nopython=True, nogil=True, cache=True)
+def unique_baselines(ant1, ant2):
+    """ Return unique baselines, inverse index and counts """
+    check_antenna_dtypes(ant1, ant2)
+
+    def impl(ant1, ant2):
+        bl = _pack_baselines(ant1, ant2)
 
         ret, idx, inv, counts = _unique_internal(bl)
 
@@ -95,3 +259,24 @@ def unique_baselines(ant1, ant2):
         return ubl, idx, inv, counts
 
     return impl
+
+
+@generated_jit(nopython=True, nogil=True, cache=True)
+def parallel_unique_baselines(ant1, ant2):
+    """
+    Multi-threaded equivalent of :func:`unique_baselines`.
+    Return unique baselines, inverse index and counts
+    """
+    check_antenna_dtypes(ant1, ant2)
+
+    def impl(ant1, ant2):
+        bl = _pack_baselines(ant1, ant2)
+
+        ret, idx, inv, counts = _parallel_unique_internal(bl)
+
+        # Recast to int32 and reshape
+        ubl = ret.view(np.int32).reshape(ret.shape[0], 2)
+
+        return ubl, idx, inv, counts
+
+    return impl
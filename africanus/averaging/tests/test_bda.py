@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from numpy.testing import assert_array_equal, assert_array_almost_equal
+import pytest
+
+from africanus.averaging.bda_avg import bda
+from africanus.averaging.bda_mapping import bda_mapper
+from africanus.averaging.support import unique_baselines
+from africanus.averaging.time_and_channel_avg import baseline_time_and_channel
+
+
+@pytest.fixture
+def bda_data():
+    rs = np.random.RandomState(42)
+
+    na, ntime, nchan, ncorr = 7, 30, 64, 2
+    ant1, ant2 = (a.astype(np.int32) for a in np.triu_indices(na, 1))
+    nbl = ant1.shape[0]
+
+    time = np.repeat(np.arange(ntime, dtype=np.float64)*8.0, nbl)
+    ant1 = np.tile(ant1, ntime)
+    ant2 = np.tile(ant2, ntime)
+    antenna_position = rs.random_sample((na, 3))*1000.0
+
+    # MeerKAT 4k mode channel widths
+    chan_width = np.full(nchan, .856e9 / 4096)
+    shape = (time.shape[0], nchan, ncorr)
+
+    return {
+        "time": time,
+        "interval": np.full_like(time, 8.0),
+        "antenna1": ant1,
+        "antenna2": ant2,
+        "uvw": antenna_position[ant1] - antenna_position[ant2],
+        "chan_freq": .856e9 + np.arange(nchan)*chan_width,
+        "chan_width": chan_width,
+        "vis": rs.random_sample(shape) + rs.random_sample(shape)*1j,
+        "flag": (rs.random_sample(shape) < 0.1).astype(np.uint8),
+        "weight_spectrum": rs.random_sample(shape),
+    }
+
+
+def test_bda_uniform_channels(bda_data):
+    """ Uniform channel bins should match baseline_time_and_channel """
+    avg, summary = bda(decorrelation=0.95, max_fov=1.0,
+                       max_chan_bin_size=8, **bda_data)
+
+    assert np.all(summary.chan_bin_size == 8)
+
+    bl_avg, bl_summary = baseline_time_and_channel(decorrelation=0.95,
+                                                   max_fov=1.0,
+                                                   chan_bin_size=8,
+                                                   **bda_data)
+
+    out_rows = bl_avg.time.shape[0]
+    ncorr = bda_data["vis"].shape[2]
+
+    assert_array_equal(avg.offsets, np.arange(out_rows + 1)*8)
+    assert_array_equal(avg.time, bl_avg.time)
+    assert_array_equal(avg.antenna1, bl_avg.antenna1)
+    assert_array_equal(avg.antenna2, bl_avg.antenna2)
+    assert_array_equal(avg.uvw, bl_avg.uvw)
+    assert_array_equal(avg.chan_freq.reshape(out_rows, 8),
+                       np.broadcast_to(bl_avg.chan_freq, (out_rows, 8)))
+    assert_array_equal(avg.vis.reshape(out_rows, 8, ncorr), bl_avg.vis)
+    assert_array_equal(avg.flag.reshape(out_rows, 8, ncorr), bl_avg.flag)
+    assert_array_equal(avg.weight_spectrum.reshape(out_rows, 8, ncorr),
+                       bl_avg.weight_spectrum)
+    assert_array_equal(summary.output_rows, bl_summary.output_rows)
+
+
+def test_bda_ragged_channels(bda_data):
+    nchan = bda_data["chan_freq"].shape[0]
+
+    avg, summary = bda(decorrelation=0.95, max_fov=1.0, **bda_data)
+
+    # Baselines are averaged over differing numbers of channels
+    assert np.unique(summary.chan_bin_size).shape[0] > 1
+
+    row_meta, chan_meta, _ = bda_mapper(bda_data["time"],
+                                        bda_data["interval"],
+                                        bda_data["antenna1"],
+                                        bda_data["antenna2"],
+                                        bda_data["uvw"],
+                                        bda_data["chan_freq"],
+                                        bda_data["chan_width"],
+                                        decorrelation=0.95, max_fov=1.0)
+
+    ubl, _, bl_inv, _ = unique_baselines(bda_data["antenna1"],
+                                         bda_data["antenna2"])
+    out_rows = avg.time.shape[0]
+    assert avg.offsets.shape == (out_rows + 1,)
+    assert avg.vis.shape == (avg.offsets[-1], bda_data["vis"].shape[2])
+    assert avg.chan_freq.shape == (avg.offsets[-1],)
+
+    for r in range(out_rows):
+        in_rows = np.nonzero(row_meta.map == r)[0]
+        bl = bl_inv[in_rows[0]]
+        bin_size = summary.chan_bin_size[bl]
+        start, end = avg.offsets[r], avg.offsets[r + 1]
+
+        assert end - start == (nchan + bin_size - 1) // bin_size
+
+        for oc, c in enumerate(range(0, nchan, bin_size)):
+            chans = slice(c, c + bin_size)
+
+            assert_array_almost_equal(avg.chan_freq[start + oc],
+                                      bda_data["chan_freq"][chans].mean())
+            assert_array_almost_equal(avg.chan_width[start + oc],
+                                      bda_data["chan_width"][chans].sum())
+
+            vis = bda_data["vis"][in_rows, chans]
+            flag = bda_data["flag"][in_rows, chans] != 0
+            wts = bda_data["weight_spectrum"][in_rows, chans]
+
+            # Unflagged samples are averaged if present
+            all_flagged = flag.all(axis=(0, 1))
+            wts = np.where(flag == all_flagged[None, None, :], wts, 0.0)
+            exp_vis = (vis*wts).sum(axis=(0, 1)) / wts.sum(axis=(0, 1))
+
+            assert_array_almost_equal(avg.vis[start + oc], exp_vis)
+            assert_array_equal(avg.flag[start + oc], all_flagged)
+
+    # Compression is reported in (row, chan) samples
+    output_vis = np.zeros(ubl.shape[0], dtype=np.intp)
+
+    for r in range(out_rows):
+        bl = bl_inv[np.nonzero(row_meta.map == r)[0][0]]
+        output_vis[bl] += avg.offsets[r + 1] - avg.offsets[r]
+
+    assert_array_equal(summary.output_vis, output_vis)
+    assert_array_almost_equal(summary.compression,
+                              summary.input_vis / output_vis)
+
+
+def test_bda_requires_uvw_and_channels(bda_data):
+    del bda_data["uvw"]
+
+    with pytest.raises(ValueError, match="required"):
+        bda(**bda_data)
@@ -6,8 +6,11 @@ from numpy.testing import assert_array_equal, assert_array_almost_equal
 import pytest
 
 from africanus.averaging.support import unique_time, unique_baselines
-from africanus.averaging.time_and_channel_mapping import (row_mapper,
-                                                          channel_mapper)
+from africanus.averaging.time_and_channel_mapping import (
+                                    row_mapper,
+                                    parallel_row_mapper,
+                                    row_count,
+                                    channel_mapper)
 
 
 @pytest.fixture
@@ -108,6 +111,83 @@ def test_row_mapper(time, interval, ant1, ant2,
     assert_array_almost_equal(new_exp, new_exp2)
 
 
+@pytest.mark.parametrize("time_bin_secs", [0.1, 1, 2.5, 4, 7])
+@pytest.mark.parametrize("flag_density", [0.0, 0.3, 1.0])
+def test_parallel_row_mapper(time_bin_secs, flag_density):
+    rs = np.random.RandomState(42)
+
+    na = 7
+    ntime = 20
+    ant1, ant2 = (a.astype(np.int32) for a in np.triu_indices(na, 0))
+    nbl = ant1.shape[0]
+
+    time = np.repeat(np.arange(ntime, dtype=np.float64), nbl)
+    interval = np.ones_like(time)
+    ant1 = np.tile(ant1, ntime)
+    ant2 = np.tile(ant2, ntime)
+
+    # Remove some rows and shuffle the remainder
+    keep = rs.permutation(time.shape[0])[:int(0.8*time.shape[0])]
+    time = time[keep]
+    interval = interval[keep]
+    ant1 = ant1[keep]
+    ant2 = ant2[keep]
+
+    flag_row = (rs.random_sample(time.shape) < flag_density).astype(np.uint8)
+
+    serial = row_mapper(time, interval, ant1, ant2,
+                        flag_row=flag_row,
+                        time_bin_secs=time_bin_secs)
+
+    parallel = parallel_row_mapper(time, interval, ant1, ant2,
+                                   flag_row=flag_row,
+                                   time_bin_secs=time_bin_secs)
+
+    assert_array_equal(serial.map, parallel.map)
+    assert_array_equal(serial.time, parallel.time)
+    assert_array_equal(serial.interval, parallel.interval)
+    assert_array_equal(serial.flag_row, parallel.flag_row)
+
+    parallel = parallel_row_mapper(time, interval, ant1, ant2,
+                                   time_bin_secs=time_bin_secs)
+
+    assert parallel.flag_row is None
+    assert_array_equal(serial.map, parallel.map)
+
+
+@pytest.mark.parametrize("time_bin_secs", [0.1, 1, 2.5, 4, 7])
+def test_row_count(time_bin_secs):
+    rs = np.random.RandomState(42)
+
+    na = 5
+    ntime = 15
+    ant1, ant2 = (a.astype(np.int32) for a in np.triu_indices(na, 0))
+    nbl = ant1.shape[0]
+
+    time = np.repeat(np.arange(ntime, dtype=np.float64), nbl)
+    interval = np.ones_like(time)
+    ant1 = np.tile(ant1, ntime)
+    ant2 = np.tile(ant2, ntime)
+
+    keep = rs.permutation(time.shape[0])[:int(0.8*time.shape[0])]
+    time = time[keep]
+    interval = interval[keep]
+    ant1 = ant1[keep]
+    ant2 = ant2[keep]
+
+    # Flags do not influence the number of output rows
+    flag_row = (rs.random_sample(time.shape) < 0.3).astype(np.uint8)
+
+    row_meta = row_mapper(time, interval, ant1, ant2,
+                          flag_row=flag_row,
+                          time_bin_secs=time_bin_secs)
+
+    count = row_count(time, interval, ant1, ant2,
+                      time_bin_secs=time_bin_secs)
+
+    assert count == row_meta.time.shape[0]
+
+
 def test_channel_mapper():
     chan_map, out_chans = channel_mapper(64, 17)
 
@@ -5,7 +5,11 @@ from numpy.testing import assert_almost_equal
 import pytest
 
 from africanus.averaging.splines import (fit_cubic_spline,
-                                         evaluate_spline)
+                                         fit_cubic_splines,
+                                         evaluate_spline,
+                                         evaluate_splines,
+                                         evaluate_splines_indexed,
+                                         spline_intervals)
 
 
 # Generate y,z coords from given x coords
@@ -34,3 +38,64 @@ def test_fit_cubic_spline(order):
     dy = generate_y_coords(dx)
     sdy = evaluate_spline(spline, dx, order=order)
     assert_almost_equal(sdy, dy, decimal=2)
+
+
+@pytest.mark.parametrize("bc", [(2, 2, 0.0, 0.0),
+                                (1, 1, 1.7, -2.3),
+                                (2, 1, -1.0, 0.5)])
+@pytest.mark.parametrize("order", [0, 1, 2])
+def test_cubic_spline_vs_scipy(bc, order):
+    interpolate = pytest.importorskip("scipy.interpolate")
+
+    left_type, right_type, left_value, right_value = bc
+    x = np.sort(np.random.RandomState(42).random_sample(16))*4.0 - 2.0
+    y = generate_y_coords(x) + np.sin(3.0*x)
+
+    spline = fit_cubic_spline(x, y, left_type, right_type,
+                              left_value, right_value)
+    cs = interpolate.CubicSpline(x, y, bc_type=((left_type, left_value),
+                                                (right_type, right_value)))
+
+    p = np.linspace(x[0], x[-1], 101)
+    assert_almost_equal(evaluate_spline(spline, p, order=order),
+                        cs(p, order), decimal=10)
+
+
+@pytest.mark.parametrize("order", [0, 1, 2])
+def test_batched_cubic_splines(order):
+    rs = np.random.RandomState(42)
+    x = np.linspace(0.0, 100.0, 20)
+    y = rs.random_sample((x.shape[0], 7))
+
+    splines = fit_cubic_splines(x, y, left_type=1, left_value=0.3)
+
+    # Include extrapolated points and points on the knots
+    points = np.concatenate([rs.random_sample(50)*120.0 - 10.0, x])
+    sorted_points = np.sort(points)
+
+    intervals = spline_intervals(x, points)
+    sorted_intervals = spline_intervals(x, sorted_points)
+    values = evaluate_splines(splines, intervals, order=order)
+    sorted_values = evaluate_splines(splines, sorted_intervals, order=order)
+
+    assert values.shape == (points.shape[0], y.shape[1])
+
+    for s in range(y.shape[1]):
+        spline = fit_cubic_spline(x, y[:, s], left_type=1, left_value=0.3)
+
+        assert_almost_equal(splines.ma[:, s], spline.ma)
+        assert_almost_equal(splines.mb[:, s], spline.mb)
+        assert_almost_equal(splines.mc[:, s], spline.mc)
+
+        assert_almost_equal(values[:, s],
+                            evaluate_spline(spline, points, order=order))
+        assert_almost_equal(sorted_values[:, s],
+                            evaluate_spline(spline, sorted_points,
+                                            order=order))
+
+    # Evaluate a single spline per point
+    spline_index = rs.randint(0, y.shape[1], points.shape[0])
+    indexed = evaluate_splines_indexed(splines, intervals,
+                                       spline_index, order=order)
+    assert_almost_equal(indexed,
+                        values[np.arange(points.shape[0]), spline_index])
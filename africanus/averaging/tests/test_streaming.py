@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+
+import numpy as np
+from numpy.testing import assert_array_equal, assert_array_almost_equal
+import pytest
+
+from africanus.averaging.streaming import StreamingAverager
+from africanus.averaging.time_and_channel_avg import time_and_channel
+
+
+def _concatenate(outputs):
+    """ Concatenate row-based fields of averaging outputs """
+    fields = {}
+
+    for f in outputs[0]._fields:
+        if f in ("chan_freq", "chan_width", "effective_bw", "resolution"):
+            fields[f] = getattr(outputs[0], f)
+        elif getattr(outputs[0], f) is None:
+            fields[f] = None
+        else:
+            fields[f] = np.concatenate([getattr(o, f) for o in outputs])
+
+    return fields
+
+
+@pytest.mark.parametrize("time_bin_secs", [1.0, 3.0, 4.5, 100.0])
+@pytest.mark.parametrize("chan_bin_size", [1, 3])
+@pytest.mark.parametrize("time_chunks", [[20], [1, 19], [3, 5, 7, 5],
+                                         [4, 4, 4, 4, 4]])
+def test_streaming_averager(time_bin_secs, chan_bin_size, time_chunks):
+    rs = np.random.RandomState(42)
+
+    na = 5
+    ntime = sum(time_chunks)
+    nchan = 8
+    ncorr = 2
+
+    ant1, ant2 = (a.astype(np.int32) for a in np.triu_indices(na, 1))
+    nbl = ant1.shape[0]
+
+    time = np.repeat(np.arange(ntime, dtype=np.float64), nbl)
+    interval = np.ones_like(time)
+    ant1 = np.tile(ant1, ntime)
+    ant2 = np.tile(ant2, ntime)
+    nrow = time.shape[0]
+
+    # Drop some baselines
+    keep = rs.random_sample(nrow) < 0.9
+    time, interval, ant1, ant2 = (a[keep] for a in
+                                  (time, interval, ant1, ant2))
+    nrow = time.shape[0]
+
+    uvw = rs.random_sample((nrow, 3))
+    vis = (rs.random_sample((nrow, nchan, ncorr)) +
+           rs.random_sample((nrow, nchan, ncorr))*1j)
+    flag = (rs.random_sample((nrow, nchan, ncorr)) < 0.1).astype(np.uint8)
+    flag[rs.random_sample(nrow) < 0.1] = 1
+    weight_spectrum = rs.random_sample((nrow, nchan, ncorr))
+    chan_freq = np.linspace(.856e9, 2*.856e9, nchan)
+
+    expected = time_and_channel(time, interval, ant1, ant2,
+                                time_centroid=time, exposure=interval,
+                                uvw=uvw, vis=vis, flag=flag,
+                                weight_spectrum=weight_spectrum,
+                                chan_freq=chan_freq,
+                                time_bin_secs=time_bin_secs,
+                                chan_bin_size=chan_bin_size)
+
+    averager = StreamingAverager(time_bin_secs=time_bin_secs,
+                                 chan_bin_size=chan_bin_size)
+    outputs = []
+    start = 0
+
+    for tc in np.cumsum(time_chunks):
+        end = np.searchsorted(time, tc, side="left")
+        sel = slice(start, end)
+        start = end
+
+        outputs.append(averager.update(time[sel], interval[sel],
+                                       ant1[sel], ant2[sel],
+                                       time_centroid=time[sel],
+                                       exposure=interval[sel],
+                                       uvw=uvw[sel], vis=vis[sel],
+                                       flag=flag[sel],
+                                       weight_spectrum=weight_spectrum[sel],
+                                       chan_freq=chan_freq))
+
+        # At most one bin per baseline is carried over
+        assert averager.carried_rows <= nbl*time_bin_secs
+
+    outputs.append(averager.finalise())
+    assert averager.carried_rows == 0
+
+    result = _concatenate(outputs)
+
+    # Sort streamed output in the order produced by time_and_channel.
+    # Baselines are ordered on their packed int64 representation
+    bl = np.stack([result["antenna1"], result["antenna2"]], axis=1)
+    bl = bl.view(np.int64).ravel()
+    order = np.lexsort((bl, result["time"]))
+
+    assert_array_equal(result["time"][order], expected.time)
+    assert_array_equal(result["interval"][order], expected.interval)
+    assert_array_equal(result["flag_row"][order], expected.flag_row)
+    assert_array_equal(result["antenna1"][order], expected.antenna1)
+    assert_array_equal(result["antenna2"][order], expected.antenna2)
+    assert_array_almost_equal(result["time_centroid"][order],
+                              expected.time_centroid)
+    assert_array_almost_equal(result["exposure"][order], expected.exposure)
+    assert_array_almost_equal(result["uvw"][order], expected.uvw)
+    assert_array_almost_equal(result["vis"][order], expected.vis)
+    assert_array_equal(result["flag"][order], expected.flag)
+    assert_array_almost_equal(result["weight_spectrum"][order],
+                              expected.weight_spectrum)
+    assert_array_equal(result["chan_freq"], expected.chan_freq)
+    assert result["sigma"] is None
+
+
+def test_streaming_averager_errors():
+    time = np.arange(4, dtype=np.float64)
+    interval = np.ones_like(time)
+    ant1 = np.zeros(4, dtype=np.int32)
+    ant2 = np.ones(4, dtype=np.int32)
+    vis = np.ones((4, 2, 2), dtype=np.complex64)
+
+    averager = StreamingAverager(time_bin_secs=2.0)
+    averager.update(time[2:], interval[2:], ant1[2:], ant2[2:], vis=vis[2:])
+
+    with pytest.raises(ValueError, match="time order"):
+        averager.update(time[:2], interval[:2], ant1[:2], ant2[:2],
+                        vis=vis[:2])
+
+    averager = StreamingAverager(time_bin_secs=2.0)
+    averager.update(time[:2], interval[:2], ant1[:2], ant2[:2], vis=vis[:2])
+
+    with pytest.raises(ValueError, match="differ"):
+        averager.update(time[2:], interval[2:], ant1[2:], ant2[2:])
+
+    assert StreamingAverager().finalise() is None
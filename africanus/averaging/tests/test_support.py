@@ -5,7 +5,10 @@ import numpy as np
 from numpy.testing import assert_array_equal
 import pytest
 
-from africanus.averaging.support import (unique_baselines, unique_time)
+from africanus.averaging.support import (unique_baselines, unique_time,
+                                         parallel_unique_baselines,
+                                         parallel_unique_time,
+                                         _parallel_argsort)
 
 
 @pytest.fixture
@@ -57,3 +60,65 @@ def test_unique_baselines(ant1, ant2):
     assert_array_equal(bl[inv], test_bl)
     assert_array_equal(test_bl[idx], bl)
     assert_array_equal(counts, [2, 3, 1, 3, 1])
+
+
+@pytest.mark.parametrize("nrow", [0, 1, 17, 1000])
+@pytest.mark.parametrize("nchunks", [1, 2, 3, 8, 2000])
+def test_parallel_argsort(nrow, nchunks):
+    rs = np.random.RandomState(42)
+    data = rs.randint(0, 10, nrow).astype(np.float64)
+
+    # Must match a stable sort
+    assert_array_equal(_parallel_argsort(data, nchunks),
+                       np.argsort(data, kind='mergesort'))
+
+
+@pytest.mark.parametrize("presorted", [True, False])
+def test_parallel_unique_time(presorted):
+    rs = np.random.RandomState(42)
+    time = rs.randint(0, 50, 10000).astype(np.float64)
+
+    if presorted:
+        time.sort()
+
+    expected = unique_time(time)
+    result = parallel_unique_time(time)
+
+    for e, r in zip(expected, result):
+        assert_array_equal(e, r)
+
+    utime, idx, inv, counts = result
+    np_utime, np_idx, np_inv, np_counts = np.unique(time,
+                                                    return_index=True,
+                                                    return_inverse=True,
+                                                    return_counts=True)
+
+    assert_array_equal(utime, np_utime)
+    assert_array_equal(idx, np_idx)
+    assert_array_equal(inv, np_inv)
+    assert_array_equal(counts, np_counts)
+
+
+def test_unsorted_nan_time():
+    # NaNs must not be mistaken for sorted data
+    time = np.asarray([1.0, np.nan, 0.5])
+    utime, _, inv, _ = unique_time(time)
+    assert_array_equal(utime, [0.5, 1.0, np.nan])
+    assert_array_equal(inv, [1, 2, 0])
+
+
+def test_parallel_unique_baselines():
+    rs = np.random.RandomState(42)
+    ant1 = rs.randint(0, 16, 10000).astype(np.int32)
+    ant2 = rs.randint(0, 16, 10000).astype(np.int32)
+
+    expected = unique_baselines(ant1, ant2)
+    result = parallel_unique_baselines(ant1, ant2)
+
+    for e, r in zip(expected, result):
+        assert_array_equal(e, r)
+
+    empty = np.empty(0, dtype=np.int32)
+    ubl, idx, inv, counts = parallel_unique_baselines(empty, empty)
+    assert ubl.shape == (0, 2)
+    assert idx.shape == inv.shape == counts.shape == (0,)
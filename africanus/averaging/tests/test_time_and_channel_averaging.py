@@ -172,6 +172,7 @@ def _gen_testing_lookup(time, interval, ant1, ant2, flag_row, time_bin_secs,
 
                 effective_map = []
                 nominal_map = []
+                bin_low = time[ri] - half_int
 
             # Effective only includes unflagged samples
             if flag_row[ri] == 0:
@@ -448,3 +449,247 @@ def test_dask_averager(time, ant1, ant2, flagged_rows,
     # Compute all the fields
     fields = [getattr(avg, f) for f in avg._fields]
     avg = type(avg)(*da.compute(fields)[0])
+
+
+@pytest.mark.parametrize("time_bin_secs", [1, 2, 3, 4])
+@pytest.mark.parametrize("chan_bin_size", [1, 3])
+def test_dask_averager_row_chunks(time, ant1, ant2, interval,
+                                  frequency, chan_width, vis, flag,
+                                  time_bin_secs, chan_bin_size):
+    da = pytest.importorskip('dask.array')
+
+    from africanus.averaging.dask import (time_and_channel as dask_avg,
+                                          row_chunks)
+
+    rc = (6, 4)
+    fc = (4, 4, 4, 4)
+    cc = (4,)
+
+    vis = vis(sum(rc), sum(fc), sum(cc))
+    flag = flag(sum(rc), sum(fc), sum(cc))
+
+    da_time = da.from_array(time, chunks=(rc,))
+    da_interval = da.from_array(interval, chunks=(rc,))
+    da_ant1 = da.from_array(ant1, chunks=(rc,))
+    da_ant2 = da.from_array(ant2, chunks=(rc,))
+    da_chan_freq = da.from_array(frequency, chunks=(fc,))
+    da_chan_width = da.from_array(chan_width, chunks=(fc,))
+    da_vis = da.from_array(vis, chunks=(rc, fc, cc))
+    da_flag = da.from_array(flag, chunks=(rc, fc, cc))
+
+    chunks = row_chunks(da_time, da_interval, da_ant1, da_ant2,
+                        time_bin_secs=time_bin_secs)
+    chunks = tuple(chunks.compute().tolist())
+
+    def _avg(row_chunks=None):
+        return dask_avg(da_time, da_interval, da_ant1, da_ant2,
+                        chan_freq=da_chan_freq, chan_width=da_chan_width,
+                        vis=da_vis, flag=da_flag,
+                        time_bin_secs=time_bin_secs,
+                        chan_bin_size=chan_bin_size,
+                        row_chunks=row_chunks)
+
+    nan_avg = _avg()
+    known_avg = _avg(row_chunks=chunks)
+
+    assert all(np.isnan(c) for c in nan_avg.antenna1.chunks[0])
+    assert known_avg.antenna1.chunks[0] == chunks
+    assert known_avg.vis.chunks[0] == chunks
+    assert known_avg.vis.shape[0] == sum(chunks)
+
+    nan_vis, known_vis, known_ant1 = da.compute(nan_avg.vis, known_avg.vis,
+                                                known_avg.antenna1)
+    assert_array_equal(nan_vis, known_vis)
+    assert known_ant1.shape[0] == sum(chunks)
+
+    with pytest.raises(ValueError, match="row_chunks"):
+        _avg(row_chunks=chunks[:1])
+
+
+@pytest.mark.parametrize("chan_chunks, chan_bin_size, expected", [
+    ((4, 4, 4, 4), 4, (4, 4, 4, 4)),
+    ((5, 7, 3, 1), 3, (6, 6, 3, 1)),
+    ((5, 7, 3, 1), 4, (8, 4, 4)),
+    ((1, 1, 14), 5, (5, 11)),
+    ((5, 7, 3, 1), 20, (16,)),
+])
+def test_chan_bin_aligned_chunks(chan_chunks, chan_bin_size, expected):
+    pytest.importorskip('dask.array')
+
+    from africanus.averaging.dask import chan_bin_aligned_chunks
+
+    assert chan_bin_aligned_chunks(chan_chunks, chan_bin_size) == expected
+
+
+@pytest.mark.parametrize("chan_bin_size", [1, 3, 4, 5, 16, 20])
+@pytest.mark.parametrize("fc", [(5, 7, 3, 1), (1, 1, 1, 13), (2,)*8])
+def test_dask_averager_unaligned_chan_chunks(time, ant1, ant2, interval,
+                                             frequency, chan_width,
+                                             vis, flag, weight_spectrum,
+                                             chan_bin_size, fc):
+    da = pytest.importorskip('dask.array')
+
+    from africanus.averaging.dask import time_and_channel as dask_avg
+
+    rows = time.shape[0]
+    chans = sum(fc)
+    corrs = 4
+    vis = vis(rows, chans, corrs)
+    flag = flag(rows, chans, corrs)
+
+    np_avg = time_and_channel(time, interval, ant1, ant2,
+                              chan_freq=frequency, chan_width=chan_width,
+                              vis=vis, flag=flag,
+                              weight_spectrum=weight_spectrum,
+                              time_bin_secs=2,
+                              chan_bin_size=chan_bin_size)
+
+    # Chunk heavily in channel, with chunks that
+    # are not multiples of chan_bin_size
+    avg = dask_avg(da.from_array(time, chunks=rows),
+                   da.from_array(interval, chunks=rows),
+                   da.from_array(ant1, chunks=rows),
+                   da.from_array(ant2, chunks=rows),
+                   chan_freq=da.from_array(frequency, chunks=(fc,)),
+                   chan_width=da.from_array(chan_width, chunks=(fc,)),
+                   vis=da.from_array(vis, chunks=(rows, fc, corrs)),
+                   flag=da.from_array(flag, chunks=(rows, fc, corrs)),
+                   weight_spectrum=da.from_array(weight_spectrum,
+                                                 chunks=(rows, fc, corrs)),
+                   time_bin_secs=2,
+                   chan_bin_size=chan_bin_size)
+
+    out_chans = (chans + chan_bin_size - 1) // chan_bin_size
+    assert sum(avg.vis.chunks[1]) == out_chans
+    assert sum(avg.chan_freq.chunks[0]) == out_chans
+
+    fields = ["chan_freq", "chan_width", "vis", "flag", "weight_spectrum"]
+    results = da.compute(*[getattr(avg, f) for f in fields])
+
+    for field, result in zip(fields, results):
+        assert_array_almost_equal(getattr(np_avg, field), result)
+
+
+@pytest.mark.parametrize("decorrelation", [0.9, 0.98, 0.999])
+def test_baseline_dependent_averager(decorrelation):
+    from africanus.averaging.time_and_channel_avg import (
+        baseline_time_and_channel)
+
+    rs = np.random.RandomState(42)
+
+    na = 6
+    ntime = 50
+    nchan = 8
+    ncorr = 2
+
+    ant1, ant2 = (a.astype(np.int32) for a in np.triu_indices(na, 0))
+    nbl = ant1.shape[0]
+
+    # Baselines of increasing length, rotating slowly
+    bl_length = 100.0 * (ant2 - ant1)**2
+    angle = np.arange(ntime)[:, None] * 1e-3
+    uvw = np.stack([np.cos(angle) * bl_length,
+                    np.sin(angle) * bl_length,
+                    np.zeros_like(angle * bl_length)], axis=2)
+    uvw = uvw.reshape(-1, 3)
+
+    time = np.repeat(np.arange(ntime, dtype=np.float64) * 8.0, nbl)
+    interval = np.full_like(time, 8.0)
+    ant1 = np.tile(ant1, ntime)
+    ant2 = np.tile(ant2, ntime)
+    nrow = time.shape[0]
+
+    vis = (rs.random_sample((nrow, nchan, ncorr)) +
+           rs.random_sample((nrow, nchan, ncorr))*1j)
+    chan_freq = np.linspace(.856e9, 2*.856e9, nchan)
+
+    avg, summary = baseline_time_and_channel(time, interval, ant1, ant2,
+                                             uvw=uvw, chan_freq=chan_freq,
+                                             vis=vis,
+                                             decorrelation=decorrelation,
+                                             max_fov=2.0,
+                                             time_bin_secs=1e4,
+                                             chan_bin_size=2)
+
+    assert summary.antenna1.shape == (nbl,)
+    assert_array_equal(summary.input_rows, ntime)
+    assert summary.output_rows.sum() == avg.time.shape[0]
+    assert_array_almost_equal(summary.compression,
+                              summary.input_rows / summary.output_rows)
+
+    # Autocorrelations are averaged into a single, maximally sized bin
+    auto = summary.antenna1 == summary.antenna2
+    assert_array_equal(summary.time_bin_secs[auto], 1e4)
+    assert_array_equal(summary.output_rows[auto], 1)
+
+    # Longer baselines are averaged less
+    order = np.argsort(summary.uv_length)
+    assert np.all(np.diff(summary.time_bin_secs[order]) <= 0)
+    assert np.all(np.diff(summary.compression[order]) <= 0)
+
+    # Each baseline should match the fixed bin averager applied
+    # to that baseline with its time bin width
+    for a1, a2, secs in zip(summary.antenna1, summary.antenna2,
+                            summary.time_bin_secs):
+        sel = (ant1 == a1) & (ant2 == a2)
+        out_sel = (avg.antenna1 == a1) & (avg.antenna2 == a2)
+
+        bl_avg = time_and_channel(time[sel], interval[sel],
+                                  ant1[sel], ant2[sel],
+                                  uvw=uvw[sel], chan_freq=chan_freq,
+                                  vis=vis[sel],
+                                  time_bin_secs=secs,
+                                  chan_bin_size=2)
+
+        assert_array_equal(bl_avg.time, avg.time[out_sel])
+        assert_array_equal(bl_avg.interval, avg.interval[out_sel])
+        assert_array_almost_equal(bl_avg.uvw, avg.uvw[out_sel])
+        assert_array_almost_equal(bl_avg.vis, avg.vis[out_sel])
+
+    with pytest.raises(ValueError, match="uvw and chan_freq"):
+        baseline_time_and_channel(time, interval, ant1, ant2, vis=vis)
+
+
+@pytest.mark.parametrize("flagged_rows", [[], [8, 9], [0, 1]])
+@pytest.mark.parametrize("time_bin_secs", [1, 3])
+@pytest.mark.parametrize("chan_bin_size", [1, 5])
+@pytest.mark.parametrize("have_weight_spectrum", [True, False])
+def test_fused_average(time, ant1, ant2, flagged_rows,
+                       uvw, interval, weight, sigma,
+                       frequency, chan_width,
+                       vis, flag,
+                       weight_spectrum, sigma_spectrum,
+                       time_bin_secs, chan_bin_size,
+                       have_weight_spectrum):
+    from africanus.averaging.time_and_channel_avg import (
+        average_from_metadata, fused_average, merge_flags)
+
+    vis = vis(time.shape[0], nchan, ncorr)
+    flag = flag(time.shape[0], nchan, ncorr)
+    flag_row = np.zeros(time.shape, dtype=np.uint8)
+    flag_row[flagged_rows] = 1
+    flag[flagged_rows, :, :] = 1
+    flag_row = merge_flags(flag_row, flag)
+
+    if not have_weight_spectrum:
+        weight_spectrum = None
+
+    row_meta = row_mapper(time, interval, ant1, ant2, flag_row, time_bin_secs)
+    chan_meta = channel_mapper(nchan, chan_bin_size)
+
+    args = (row_meta, chan_meta, ant1, ant2,
+            time, interval, flag_row,
+            uvw, weight, sigma,
+            frequency, chan_width, chan_width, None,
+            vis, flag,
+            weight_spectrum, sigma_spectrum)
+
+    multi_pass = average_from_metadata(*args)
+    single_pass = fused_average(*args)
+
+    for field, expected, result in zip(multi_pass._fields,
+                                       multi_pass, single_pass):
+        if expected is None:
+            assert result is None, field
+        else:
+            assert_array_equal(expected, result, err_msg=field)
@@ -6,8 +6,10 @@ from collections import namedtuple
 from numba import types
 import numpy as np
 
-from africanus.averaging.time_and_channel_mapping import (row_mapper,
-                                                          channel_mapper)
+from africanus.averaging.time_and_channel_mapping import (
+                                    row_mapper,
+                                    baseline_row_mapper,
+                                    channel_mapper)
 from africanus.util.docs import DocstringTemplate
 from africanus.util.numba import is_numba_type_none, generated_jit, njit
 
@@ -761,6 +763,344 @@ def merge_flags(flag_row, flag):
     return impl
 
 
+@njit(nogil=True, cache=True)
+def average_from_metadata(row_meta, chan_meta, antenna1, antenna2,
+                          time_centroid, exposure, flag_row,
+                          uvw, weight, sigma,
+                          chan_freq, chan_width,
+                          effective_bw, resolution,
+                          vis, flag,
+                          weight_spectrum, sigma_spectrum):
+    """ Average all data, given row and channel mapping metadata """
+    # Average row data
+    row_data = row_average(row_meta, antenna1, antenna2, flag_row=flag_row,
+                           time_centroid=time_centroid, exposure=exposure,
+                           uvw=uvw, weight=weight, sigma=sigma)
+
+    # Average channel data
+    chan_data = chan_average(chan_meta, chan_freq=chan_freq,
+                             chan_width=chan_width,
+                             effective_bw=effective_bw,
+                             resolution=resolution)
+
+    # Average row and channel data
+    row_chan_data = row_chan_average(row_meta, chan_meta,
+                                     flag_row=flag_row, weight=weight,
+                                     vis=vis, flag=flag,
+                                     weight_spectrum=weight_spectrum,
+                                     sigma_spectrum=sigma_spectrum)
+
+    # Have to explicitly write it out because numba tuples
+    # are highly constrained types
+    return AverageOutput(row_meta.time,
+                         row_meta.interval,
+                         row_meta.flag_row,
+                         row_data.antenna1,
+                         row_data.antenna2,
+                         row_data.time_centroid,
+                         row_data.exposure,
+                         row_data.uvw,
+                         row_data.weight,
+                         row_data.sigma,
+                         chan_data.chan_freq,
+                         chan_data.chan_width,
+                         chan_data.effective_bw,
+                         chan_data.resolution,
+                         row_chan_data.vis,
+                         row_chan_data.flag,
+                         row_chan_data.weight_spectrum,
+                         row_chan_data.sigma_spectrum)
+
+
+@generated_jit(nopython=True, nogil=True, cache=True)
+def fused_average(row_meta, chan_meta, antenna1, antenna2,
+                  time_centroid, exposure, flag_row,
+                  uvw, weight, sigma,
+                  chan_freq, chan_width,
+                  effective_bw, resolution,
+                  vis, flag,
+                  weight_spectrum, sigma_spectrum):
+    """
+    Single pass equivalent of :func:`average_from_metadata`.
+
+    The row map is walked once, accumulating row-based columns
+    and (row, chan, corr)-based columns for each input row,
+    instead of separately in :func:`row_average` and
+    :func:`row_chan_average`.
+    Accumulation occurs in the same order so that
+    results are identical.
+    """
+    have_flag_row = not is_numba_type_none(flag_row)
+    have_vis = not is_numba_type_none(vis)
+    have_flag = not is_numba_type_none(flag)
+    have_weight = not is_numba_type_none(weight)
+    have_weight_spectrum = not is_numba_type_none(weight_spectrum)
+    have_sigma_spectrum = not is_numba_type_none(sigma_spectrum)
+
+    flags_match = matching_flag_factory(have_flag_row)
+    is_chan_flagged = is_chan_flagged_factory(have_flag)
+
+    vis_factory = chan_output_factory(have_vis)
+    weight_sum_factory = weight_sum_output_factory(have_vis)
+    flag_factory = chan_output_factory(have_flag)
+    weight_factory = chan_output_factory(have_weight_spectrum)
+    sigma_factory = chan_output_factory(have_sigma_spectrum)
+
+    vis_adder = vis_add_factory(have_vis,
+                                have_weight,
+                                have_weight_spectrum)
+    weight_adder = chan_add_factory(have_weight_spectrum)
+    sigma_adder = sigma_spectrum_add_factory(have_sigma_spectrum,
+                                             have_weight,
+                                             have_weight_spectrum)
+
+    vis_normaliser = vis_normaliser_factory(have_vis)
+    sigma_normaliser = sigma_spectrum_normaliser_factory(have_sigma_spectrum)
+    weight_normaliser = weight_spectrum_normaliser_factory(
+                            have_weight_spectrum)
+
+    set_flagged = set_flagged_factory(have_flag)
+
+    dummy_chan_freq = None
+    dummy_chan_width = None
+
+    def impl(row_meta, chan_meta, antenna1, antenna2,
+             time_centroid, exposure, flag_row,
+             uvw, weight, sigma,
+             chan_freq, chan_width,
+             effective_bw, resolution,
+             vis, flag,
+             weight_spectrum, sigma_spectrum):
+
+        out_rows = row_meta.time.shape[0]
+        nchan, ncorrs = chan_corrs(vis, flag,
+                                   weight_spectrum, sigma_spectrum,
+                                   dummy_chan_freq, dummy_chan_width,
+                                   dummy_chan_width, dummy_chan_width)
+
+        chan_map, out_chans = chan_meta
+        out_shape = (out_rows, out_chans, ncorrs)
+
+        # Row outputs
+        row_counts = np.zeros(out_rows, dtype=np.uint32)
+        ant1_avg = np.empty(out_rows, antenna1.dtype)
+        ant2_avg = np.empty(out_rows, antenna2.dtype)
+
+        uvw_avg = (
+            None if uvw is None else
+            np.zeros((out_rows,) + uvw.shape[1:],
+                     dtype=uvw.dtype))
+
+        time_centroid_avg = (
+            None if time_centroid is None else
+            np.zeros((out_rows,) + time_centroid.shape[1:],
+                     dtype=time_centroid.dtype))
+
+        exposure_avg = (
+            None if exposure is None else
+            np.zeros((out_rows,) + exposure.shape[1:],
+                     dtype=exposure.dtype))
+
+        weight_avg = (
+            None if weight is None else
+            np.zeros((out_rows,) + weight.shape[1:],
+                     dtype=weight.dtype))
+
+        sigma_avg = (
+            None if sigma is None else
+            np.zeros((out_rows,) + sigma.shape[1:],
+                     dtype=sigma.dtype))
+
+        sigma_weight_sum = (
+            None if sigma is None else
+            np.zeros((out_rows,) + sigma.shape[1:],
+                     dtype=sigma.dtype))
+
+        # Row and channel outputs
+        vis_avg = vis_factory(out_shape, vis)
+        vis_weight_sum = weight_sum_factory(out_shape, vis)
+        weight_spectrum_avg = weight_factory(out_shape, weight_spectrum)
+        sigma_spectrum_avg = sigma_factory(out_shape, sigma_spectrum)
+        sigma_spectrum_weight_sum = sigma_factory(out_shape, sigma_spectrum)
+
+        flagged_vis_avg = vis_factory(out_shape, vis)
+        flagged_vis_weight_sum = weight_sum_factory(out_shape, vis)
+        flagged_weight_spectrum_avg = weight_factory(out_shape,
+                                                     weight_spectrum)
+        flagged_sigma_spectrum_avg = sigma_factory(out_shape,
+                                                   sigma_spectrum)
+        flagged_sigma_spectrum_weight_sum = sigma_factory(out_shape,
+                                                          sigma_spectrum)
+
+        flag_avg = flag_factory(out_shape, flag)
+
+        counts = np.zeros(out_shape, dtype=np.uint32)
+        flag_counts = np.zeros(out_shape, dtype=np.uint32)
+
+        # Iterate over input rows, accumulating into output rows
+        for in_row, out_row in enumerate(row_meta.map):
+            # Here we can simply assign because input_row baselines
+            # should always match output row baselines
+            ant1_avg[out_row] = antenna1[in_row]
+            ant2_avg[out_row] = antenna2[in_row]
+
+            # Input and output flags must match in order for the
+            # current row to contribute to the remaining columns
+            if not flags_match(flag_row, in_row, row_meta.flag_row, out_row):
+                continue
+
+            if uvw is not None:
+                uvw_avg[out_row, 0] += uvw[in_row, 0]
+                uvw_avg[out_row, 1] += uvw[in_row, 1]
+                uvw_avg[out_row, 2] += uvw[in_row, 2]
+
+            if time_centroid is not None:
+                time_centroid_avg[out_row] += time_centroid[in_row]
+
+            if exposure is not None:
+                exposure_avg[out_row] += exposure[in_row]
+
+            if weight is not None:
+                for co in range(weight.shape[1]):
+                    weight_avg[out_row, co] += weight[in_row, co]
+
+            if sigma is not None:
+                for co in range(sigma.shape[1]):
+                    sva = sigma[in_row, co]**2
+
+                    # Use provided weights
+                    if weight is not None:
+                        wt = weight[in_row, co]
+                        sva *= wt ** 2
+                        sigma_weight_sum[out_row, co] += wt
+                    # Natural weights
+                    else:
+                        sigma_weight_sum[out_row, co] += 1.0
+
+                    # Assign
+                    sigma_avg[out_row, co] += sva
+
+            row_counts[out_row] += 1
+
+            for in_chan, out_chan in enumerate(chan_map):
+                for corr in range(ncorrs):
+                    if is_chan_flagged(flag, in_row, in_chan, corr):
+                        # Increment flagged averages and counts
+                        flag_counts[out_row, out_chan, corr] += 1
+
+                        vis_adder(flagged_vis_avg, flagged_vis_weight_sum, vis,
+                                  weight, weight_spectrum,
+                                  out_row, out_chan, in_row, in_chan, corr)
+                        weight_adder(flagged_weight_spectrum_avg,
+                                     weight_spectrum,
+                                     out_row, out_chan, in_row, in_chan, corr)
+                        sigma_adder(flagged_sigma_spectrum_avg,
+                                    flagged_sigma_spectrum_weight_sum,
+                                    sigma_spectrum,
+                                    weight,
+                                    weight_spectrum,
+                                    out_row, out_chan, in_row, in_chan, corr)
+                    else:
+                        # Increment unflagged averages and counts
+                        counts[out_row, out_chan, corr] += 1
+
+                        vis_adder(vis_avg, vis_weight_sum, vis,
+                                  weight, weight_spectrum,
+                                  out_row, out_chan, in_row, in_chan, corr)
+                        weight_adder(weight_spectrum_avg, weight_spectrum,
+                                     out_row, out_chan, in_row, in_chan, corr)
+                        sigma_adder(sigma_spectrum_avg,
+                                    sigma_spectrum_weight_sum,
+                                    sigma_spectrum,
+                                    weight,
+                                    weight_spectrum,
+                                    out_row, out_chan, in_row, in_chan, corr)
+
+        # Normalise
+        for r in range(out_rows):
+            count = row_counts[r]
+
+            if count > 0:
+                # Normalise uvw
+                if uvw is not None:
+                    uvw_avg[r, 0] /= count
+                    uvw_avg[r, 1] /= count
+                    uvw_avg[r, 2] /= count
+
+                # Normalise time centroid
+                if time_centroid is not None:
+                    time_centroid_avg[r] /= count
+
+                # Normalise sigma
+                if sigma is not None:
+                    for co in range(sigma.shape[1]):
+                        ssva = sigma_avg[r, co]
+                        wt = sigma_weight_sum[r, co]
+
+                        if wt != 0.0:
+                            ssva /= (wt**2)
+
+                        sigma_avg[r, co] = np.sqrt(ssva)
+
+            for f in range(out_chans):
+                for c in range(ncorrs):
+                    if counts[r, f, c] > 0:
+                        # We have some unflagged samples and
+                        # only these are used as averaged output
+                        vis_normaliser(vis_avg, vis_avg,
+                                       r, f, c,
+                                       vis_weight_sum)
+                        sigma_normaliser(sigma_spectrum_avg,
+                                         sigma_spectrum_avg,
+                                         r, f, c,
+                                         sigma_spectrum_weight_sum)
+                    elif flag_counts[r, f, c] > 0:
+                        # We only have flagged samples and
+                        # these are used as averaged output
+                        vis_normaliser(vis_avg, flagged_vis_avg,
+                                       r, f, c,
+                                       flagged_vis_weight_sum)
+                        sigma_normaliser(sigma_spectrum_avg,
+                                         flagged_sigma_spectrum_avg,
+                                         r, f, c,
+                                         flagged_sigma_spectrum_weight_sum)
+                        weight_normaliser(weight_spectrum_avg,
+                                          flagged_weight_spectrum_avg,
+                                          r, f, c)
+
+                        # Flag the output bin
+                        set_flagged(flag_avg, r, f, c)
+                    else:
+                        raise RowChannelAverageException("Zero-filled bin")
+
+        # Average channel data
+        chan_data = chan_average(chan_meta, chan_freq=chan_freq,
+                                 chan_width=chan_width,
+                                 effective_bw=effective_bw,
+                                 resolution=resolution)
+
+        return AverageOutput(row_meta.time,
+                             row_meta.interval,
+                             row_meta.flag_row,
+                             ant1_avg,
+                             ant2_avg,
+                             time_centroid_avg,
+                             exposure_avg,
+                             uvw_avg,
+                             weight_avg,
+                             sigma_avg,
+                             chan_data.chan_freq,
+                             chan_data.chan_width,
+                             chan_data.effective_bw,
+                             chan_data.resolution,
+                             vis_avg,
+                             flag_avg,
+                             weight_spectrum_avg,
+                             sigma_spectrum_avg)
+
+    return impl
+
+
 @generated_jit(nopython=True, nogil=True, cache=True)
 def time_and_channel(time, interval, antenna1, antenna2,
                      time_centroid=None, exposure=None, flag_row=None,
@@ -806,44 +1146,87 @@ def time_and_channel(time, interval, antenna1, antenna2,
         # Generate channel mapping metadata
         chan_meta = channel_mapper(nchan, chan_bin_size)
 
-        # Average row data
-        row_data = row_average(row_meta, antenna1, antenna2, flag_row=flag_row,
-                               time_centroid=time_centroid, exposure=exposure,
-                               uvw=uvw, weight=weight, sigma=sigma)
+        return fused_average(row_meta, chan_meta,
+                             antenna1, antenna2,
+                             time_centroid, exposure, flag_row,
+                             uvw, weight, sigma,
+                             chan_freq, chan_width,
+                             effective_bw, resolution,
+                             vis, flag,
+                             weight_spectrum, sigma_spectrum)
 
-        # Average channel data
-        chan_data = chan_average(chan_meta, chan_freq=chan_freq,
-                                 chan_width=chan_width,
-                                 effective_bw=effective_bw,
-                                 resolution=resolution)
+    return impl
 
-        # Average row and channel data
-        row_chan_data = row_chan_average(row_meta, chan_meta,
-                                         flag_row=flag_row, weight=weight,
-                                         vis=vis, flag=flag,
-                                         weight_spectrum=weight_spectrum,
-                                         sigma_spectrum=sigma_spectrum)
 
-        # Have to explicitly write it out because numba tuples
-        # are highly constrained types
-        return AverageOutput(row_meta.time,
-                             row_meta.interval,
-                             row_meta.flag_row,
-                             row_data.antenna1,
-                             row_data.antenna2,
-                             row_data.time_centroid,
-                             row_data.exposure,
-                             row_data.uvw,
-                             row_data.weight,
-                             row_data.sigma,
-                             chan_data.chan_freq,
-                             chan_data.chan_width,
-                             chan_data.effective_bw,
-                             chan_data.resolution,
-                             row_chan_data.vis,
-                             row_chan_data.flag,
-                             row_chan_data.weight_spectrum,
-                             row_chan_data.sigma_spectrum)
+@generated_jit(nopython=True, nogil=True, cache=True)
+def baseline_time_and_channel(time, interval, antenna1, antenna2,
+                              time_centroid=None, exposure=None,
+                              flag_row=None,
+                              uvw=None, weight=None, sigma=None,
+                              chan_freq=None, chan_width=None,
+                              effective_bw=None, resolution=None,
+                              vis=None, flag=None,
+                              weight_spectrum=None, sigma_spectrum=None,
+                              decorrelation=0.98, max_fov=45.0,
+                              time_bin_secs=np.inf, chan_bin_size=1):
+
+    if is_numba_type_none(uvw) or is_numba_type_none(chan_freq):
+        raise ValueError("uvw and chan_freq are required for "
+                         "baseline-dependent averaging")
+
+    valid_types = (types.misc.Omitted, types.scalars.Float,
+                   types.scalars.Integer)
+
+    for name, arg in (("decorrelation", decorrelation),
+                      ("max_fov", max_fov),
+                      ("time_bin_secs", time_bin_secs)):
+        if not isinstance(arg, valid_types):
+            raise TypeError("%s must be a scalar float" % name)
+
+    valid_types = (types.misc.Omitted, types.scalars.Integer)
+
+    if not isinstance(chan_bin_size, valid_types):
+        raise TypeError("chan_bin_size must be a scalar integer")
+
+    def impl(time, interval, antenna1, antenna2,
+             time_centroid=None, exposure=None, flag_row=None,
+             uvw=None, weight=None, sigma=None,
+             chan_freq=None, chan_width=None,
+             effective_bw=None, resolution=None,
+             vis=None, flag=None,
+             weight_spectrum=None, sigma_spectrum=None,
+             decorrelation=0.98, max_fov=45.0,
+             time_bin_secs=np.inf, chan_bin_size=1):
+
+        nchan, ncorrs = chan_corrs(vis, flag,
+                                   weight_spectrum, sigma_spectrum,
+                                   chan_freq, chan_width,
+                                   effective_bw, resolution)
+
+        # Merge flag_row and flag arrays
+        flag_row = merge_flags(flag_row, flag)
+
+        # Generate baseline-dependent row mapping metadata
+        row_meta, summary = baseline_row_mapper(
+                                time, interval, antenna1, antenna2,
+                                uvw, chan_freq, flag_row=flag_row,
+                                decorrelation=decorrelation,
+                                max_fov=max_fov,
+                                time_bin_secs=time_bin_secs)
+
+        # Generate channel mapping metadata
+        chan_meta = channel_mapper(nchan, chan_bin_size)
+
+        avg = fused_average(row_meta, chan_meta,
+                            antenna1, antenna2,
+                            time_centroid, exposure, flag_row,
+                            uvw, weight, sigma,
+                            chan_freq, chan_width,
+                            effective_bw, resolution,
+                            vis, flag,
+                            weight_spectrum, sigma_spectrum)
+
+        return avg, summary
 
     return impl
 
@@ -912,8 +1295,91 @@ namedtuple
 """)
 
 
+BASELINE_AVERAGING_DOCS = DocstringTemplate("""
+Averages in time and channel, with time bins that vary per baseline.
+
+The time bin width of each baseline is derived from the maximum
+uv-length of the baseline at the highest channel frequency,
+such that the amplitude of a source at the edge of the field
+of view is attenuated by no more than ``decorrelation``.
+Short baselines are therefore averaged over longer periods
+than long baselines.
+Channels are averaged into bins of ``chan_bin_size`` on all baselines.
+
+Parameters
+----------
+time : $(array_type)
+    Time values of shape :code:`(row,)`.
+interval : $(array_type)
+    Interval values of shape :code:`(row,)`.
+antenna1 : $(array_type)
+    First antenna indices of shape :code:`(row,)`
+antenna2 : $(array_type)
+    Second antenna indices of shape :code:`(row,)`
+time_centroid : $(array_type), optional
+    Time centroid values of shape :code:`(row,)`
+exposure : $(array_type), optional
+    Exposure values of shape :code:`(row,)`
+flag_row : $(array_type), optional
+    Flagged rows of shape :code:`(row,)`.
+uvw : $(array_type)
+    UVW coordinates in metres of shape :code:`(row, 3)`.
+weight : $(array_type), optional
+    Weight values of shape :code:`(row, corr)`.
+sigma : $(array_type), optional
+    Sigma values of shape :code:`(row, corr)`.
+chan_freq : $(array_type)
+    Channel frequencies of shape :code:`(chan,)`.
+chan_width : $(array_type), optional
+    Channel widths of shape :code:`(chan,)`.
+effective_bw : $(array_type), optional
+    Effective channel bandwidth of shape :code:`(chan,)`.
+resolution : $(array_type), optional
+    Effective channel resolution of shape :code:`(chan,)`.
+vis : $(array_type), optional
+    Visibility data of shape :code:`(row, chan, corr)`.
+flag : $(array_type), optional
+    Flag data of shape :code:`(row, chan, corr)`.
+weight_spectrum : $(array_type), optional
+    Weight spectrum of shape :code:`(row, chan, corr)`.
+sigma_spectrum : $(array_type), optional
+    Sigma spectrum of shape :code:`(row, chan, corr)`.
+decorrelation : float, optional
+    Acceptable fraction of the amplitude remaining after averaging.
+    Defaults to 0.98, which accepts a 2% loss in amplitude.
+max_fov : float, optional
+    Radius of the field of view in degrees. Defaults to 45.0.
+time_bin_secs : float, optional
+    Maximum summed interval in seconds to include within a bin.
+    Unbounded by default.
+chan_bin_size : int, optional
+    Number of bins to average together.
+    Defaults to 1.
+
+Returns
+-------
+average : namedtuple
+    A namedtuple whose entries correspond to the input arrays.
+    Output arrays will be ``None`` if the inputs were ``None``.
+summary : namedtuple
+    A namedtuple summarising the averaging of each unique baseline.
+    Contains :code:`(bl,)` arrays of
+    :code:`antenna1`, :code:`antenna2`,
+    the :code:`uv_length` in wavelengths,
+    the :code:`time_bin_secs` applied to the baseline,
+    the number of :code:`input_rows` and :code:`output_rows`,
+    and the :code:`compression` ratio of input to output rows.
+""")
+
+
 try:
     time_and_channel.__doc__ = AVERAGING_DOCS.substitute(
                                     array_type=":class:`numpy.ndarray`")
 except AttributeError:
     pass
+
+try:
+    baseline_time_and_channel.__doc__ = BASELINE_AVERAGING_DOCS.substitute(
+                                    array_type=":class:`numpy.ndarray`")
+except AttributeError:
+    pass
@@ -6,7 +6,11 @@ from collections import namedtuple
 import numpy as np
 import numba
 
-from africanus.averaging.support import unique_time, unique_baselines
+from africanus.averaging.support import (unique_time, unique_baselines,
+                                         parallel_unique_time,
+                                         parallel_unique_baselines)
+from africanus.constants import c as lightspeed
+from africanus.constants.consts import DEG2RAD, EARTH_ROTATION_RATE
 from africanus.util.numba import is_numba_type_none, generated_jit, njit, jit
 
 
@@ -52,10 +56,203 @@ def set_flag_row_factory(have_flag_row):
     return njit(nogil=True, cache=True)(impl)
 
 
+@njit(nogil=True, cache=True)
+def fill_row_lookup(row_lookup, bl_inv, time_inv):
+    """
+    Populates a :code:`(ubl, utime)` lookup from baseline and time
+    to input row, checking for duplicate (TIME, ANTENNA1, ANTENNA2)
+    combinations in the process.
+    """
+    for r in range(bl_inv.shape[0]):
+        bl = bl_inv[r]
+        t = time_inv[r]
+
+        if row_lookup[bl, t] == -1:
+            row_lookup[bl, t] = r
+        else:
+            raise ValueError("Duplicate (TIME, ANTENNA1, ANTENNA2) "
+                             "combinations were discovered in the input "
+                             "data. This is usually caused by not "
+                             "partitioning your data sufficiently "
+                             "by indexing columns, DATA_DESC_ID "
+                             "and SCAN_NUMBER in particular.")
+
+
+def baseline_binner_factory(is_flagged_fn):
+    """
+    Returns a function which averages the times of a single
+    baseline into bins of `time_bin_secs`, populating the
+    baseline's entries in the `time_lookup`, `interval_lookup`,
+    `bin_lookup` and `bin_flagged` arrays.
+    Returns the number of bins produced for the baseline.
+
+    Each baseline is binned independently of all other baselines.
+    """
+    def impl(bl, row_lookup, time, interval, flag_row,
+             time_bin_secs, sentinel,
+             time_lookup, interval_lookup,
+             bin_lookup, bin_flagged):
+
+        ntime = row_lookup.shape[1]
+        tbin = numba.int32(0)
+        bin_count = numba.int32(0)
+        bin_flag_count = numba.int32(0)
+        bin_low = time.dtype.type(0)
+
+        for t in range(ntime):
+            # Lookup input row
+            r = row_lookup[bl, t]
+
+            # Ignore if not present
+            if r == -1:
+                continue
+
+            # At this point, we decide whether to contribute to
+            # the current bin, or create a new one. We don't add
+            # the current sample to the current bin if
+            # high - low >= time_bin_secs
+            half_int = interval[r] * 0.5
+
+            # We're starting a new bin anyway,
+            # just set the lower bin value
+            if bin_count == 0:
+                bin_low = time[r] - half_int
+            # If we exceed the seconds in the bin,
+            # normalise the time and start a new bin
+            elif time[r] + half_int - bin_low > time_bin_secs:
+                # Normalise and flag the bin
+                # if total counts match flagged counts
+                if bin_count > 0:
+                    time_lookup[bl, tbin] /= bin_count
+                    bin_flagged[bl, tbin] = bin_count == bin_flag_count
+                # There was nothing in the bin
+                else:
+                    time_lookup[bl, tbin] = sentinel
+                    bin_flagged[bl, tbin] = False
+
+                tbin += 1
+                bin_count = 0
+                bin_flag_count = 0
+                bin_low = time[r] - half_int
+
+            # Record the output bin associated with the row
+            bin_lookup[bl, t] = tbin
+
+            # Time + Interval take unflagged + unflagged
+            # samples into account (nominal value)
+            time_lookup[bl, tbin] += time[r]
+            interval_lookup[bl, tbin] += interval[r]
+            bin_count += 1
+
+            # Record flags
+            if is_flagged_fn(flag_row, r):
+                bin_flag_count += 1
+
+        # Normalise the last bin if it has entries in it
+        if bin_count > 0:
+            time_lookup[bl, tbin] /= bin_count
+            bin_flagged[bl, tbin] = bin_count == bin_flag_count
+            tbin += 1
+
+        # Set any remaining bins to sentinel value and unflagged
+        for b in range(tbin, ntime):
+            time_lookup[bl, b] = sentinel
+            bin_flagged[bl, b] = False
+
+        return tbin
+
+    return njit(nogil=True, cache=True)(impl)
+
+
 RowMapOutput = namedtuple("RowMapOutput",
                           ["map", "time", "interval", "flag_row"])
 
 
+def row_map_factory(have_flag_row):
+    """
+    Returns a function producing a :class:`RowMapOutput` from
+    baseline and time inverse indices, and the
+    time bin width of each baseline.
+    """
+    is_flagged_fn = is_flagged_factory(have_flag_row)
+
+    output_flag_row = output_factory(have_flag_row)
+    set_flag_row = set_flag_row_factory(have_flag_row)
+    bin_baseline = baseline_binner_factory(is_flagged_fn)
+
+    def impl(time, interval, bl_inv, time_inv, nbl, ntime,
+             flag_row, bl_time_bin_secs):
+        sentinel = np.finfo(time.dtype).max
+        out_rows = numba.uint32(0)
+
+        scratch = np.full(3*nbl*ntime, -1, dtype=np.int32)
+        row_lookup = scratch[:nbl*ntime].reshape(nbl, ntime)
+        bin_lookup = scratch[nbl*ntime:2*nbl*ntime].reshape(nbl, ntime)
+        inv_argsort = scratch[2*nbl*ntime:]
+        time_lookup = np.zeros((nbl, ntime), dtype=time.dtype)
+        interval_lookup = np.zeros((nbl, ntime), dtype=interval.dtype)
+
+        # Is the entire bin flagged?
+        bin_flagged = np.zeros((nbl, ntime), dtype=np.bool_)
+
+        # Create a mapping from the full bl x time resolution back
+        # to the original input rows
+        fill_row_lookup(row_lookup, bl_inv, time_inv)
+
+        # Average times over each baseline and construct the
+        # bin_lookup and time_lookup arrays
+        for bl in range(nbl):
+            # Add this baseline's number of bins to the output rows
+            out_rows += bin_baseline(bl, row_lookup, time, interval,
+                                     flag_row, bl_time_bin_secs[bl],
+                                     sentinel,
+                                     time_lookup, interval_lookup,
+                                     bin_lookup, bin_flagged)
+
+        # Flatten the time lookup and argsort it
+        flat_time = time_lookup.ravel()
+        flat_int = interval_lookup.ravel()
+        argsort = np.argsort(flat_time, kind='mergesort')
+
+        # Generate lookup from flattened (bl, time) to output row
+        for i, a in enumerate(argsort):
+            inv_argsort[a] = i
+
+        # Construct the final row map
+        row_map = np.empty((time.shape[0]), dtype=np.uint32)
+
+        # Construct output flag row, if necessary
+        out_flag_row = output_flag_row(out_rows, flag_row)
+
+        # foreach input row
+        for in_row in range(time.shape[0]):
+            # Lookup baseline and time
+            bl = bl_inv[in_row]
+            t = time_inv[in_row]
+
+            # lookup time bin and output row
+            tbin = bin_lookup[bl, t]
+            # lookup output row in inv_argsort
+            out_row = inv_argsort[bl*ntime + tbin]
+
+            if out_row >= out_rows:
+                raise RowMapperError("out_row >= out_rows")
+
+            # Handle output row flagging
+            set_flag_row(flag_row, in_row,
+                         out_flag_row, out_row,
+                         bin_flagged[bl, tbin])
+
+            row_map[in_row] = out_row
+
+        time_ret = flat_time[argsort[:out_rows]]
+        int_ret = flat_int[argsort[:out_rows]]
+
+        return RowMapOutput(row_map, time_ret, int_ret, out_flag_row)
+
+    return njit(nogil=True, cache=True)(impl)
+
+
 @generated_jit(nopython=True, nogil=True, cache=True)
 def row_mapper(time, interval, antenna1, antenna2,
                flag_row=None, time_bin_secs=1):
@@ -179,162 +376,502 @@ def row_mapper(time, interval, antenna1, antenna2,
 
     """
     have_flag_row = not is_numba_type_none(flag_row)
+    map_rows = row_map_factory(have_flag_row)
+
+    def impl(time, interval, antenna1, antenna2,
+             flag_row=None, time_bin_secs=1):
+        ubl, _, bl_inv, _ = unique_baselines(antenna1, antenna2)
+        utime, _, time_inv, _ = unique_time(time)
+
+        nbl = ubl.shape[0]
+        ntime = utime.shape[0]
+        bl_time_bin_secs = np.full(nbl, time_bin_secs, dtype=time.dtype)
+
+        return map_rows(time, interval, bl_inv, time_inv,
+                        nbl, ntime, flag_row, bl_time_bin_secs)
+
+    return impl
+
+
+# Bins are established using both flagged and unflagged data
+_count_baseline_bins = baseline_binner_factory(is_flagged_factory(False))
+
+
+@njit(nogil=True, cache=True)
+def row_count(time, interval, antenna1, antenna2, time_bin_secs=1):
+    """
+    Counts the number of output rows that :func:`row_mapper` would
+    produce for the given inputs, without producing the mapping
+    or averaging `time` and `interval`.
+
+    The number of output rows is independent of flags, as
+    bins are established using both flagged and unflagged data.
+
+    Parameters
+    ----------
+    time : :class:`numpy.ndarray`
+        Time values of shape :code:`(row,)`.
+    interval : :class:`numpy.ndarray`
+        Exposure times of shape :code:`(row,)`.
+    antenna1 : :class:`numpy.ndarray`
+        Antenna 1 values of shape :code:`(row,)`.
+    antenna2 : :class:`numpy.ndarray`
+        Antenna 2 values of shape :code:`(row,)`.
+    time_bin_secs : int, optional
+        Number of timesteps to average into each bin
+
+    Returns
+    -------
+    int
+        Number of output rows
+    """
+    ubl, _, bl_inv, _ = unique_baselines(antenna1, antenna2)
+    utime, _, time_inv, _ = unique_time(time)
+
+    nbl = ubl.shape[0]
+    ntime = utime.shape[0]
+
+    row_lookup = np.full((nbl, ntime), -1, dtype=np.int32)
+    fill_row_lookup(row_lookup, bl_inv, time_inv)
+
+    # Scratch space for binning a single baseline at a time
+    sentinel = np.finfo(time.dtype).max
+    time_lookup = np.empty((1, ntime), dtype=time.dtype)
+    interval_lookup = np.empty((1, ntime), dtype=interval.dtype)
+    bin_lookup = np.empty((1, ntime), dtype=np.int32)
+    bin_flagged = np.empty((1, ntime), dtype=np.bool_)
+
+    out_rows = 0
+
+    for bl in range(nbl):
+        time_lookup[:] = 0
+        interval_lookup[:] = 0
+
+        # Bin with the row_mapper binner so that the counts agree
+        out_rows += _count_baseline_bins(0, row_lookup[bl:bl + 1],
+                                         time, interval, None,
+                                         time_bin_secs, sentinel,
+                                         time_lookup, interval_lookup,
+                                         bin_lookup, bin_flagged)
+
+    return out_rows
+
+
+def assign_flag_row_factory(have_flag_row):
+    if have_flag_row:
+        def impl(out_flag_row, out_row, flagged):
+            out_flag_row[out_row] = (1 if flagged else 0)
+    else:
+        def impl(out_flag_row, out_row, flagged):
+            pass
+
+    return njit(nogil=True, cache=True)(impl)
+
+
+@generated_jit(nopython=True, nogil=True, cache=True, parallel=True)
+def parallel_row_mapper(time, interval, antenna1, antenna2,
+                        flag_row=None, time_bin_secs=1):
+    """
+    Multi-threaded version of :func:`row_mapper`.
+
+    Rows are partitioned by unique baseline and the time samples
+    of each baseline are binned independently on separate threads.
+    Only the valid bins of each baseline are then sorted to produce
+    the output ordering, rather than the full :code:`(ubl, utime)` grid.
+    The sort is stable and each baseline's bins are laid out
+    in baseline order prior to sorting, so that ties in averaged
+    time are broken in the same way as :func:`row_mapper`.
+
+    The resulting mapping is identical to that produced by
+    :func:`row_mapper` and can be passed to the same
+    averaging functions.
+
+    The number of threads is controlled by numba's threading layer,
+    via :code:`NUMBA_NUM_THREADS` or :func:`numba.set_num_threads`.
+
+    Parameters
+    ----------
+    time : :class:`numpy.ndarray`
+        Time values of shape :code:`(row,)`.
+    interval : :class:`numpy.ndarray`
+        Exposure times of shape :code:`(row,)`.
+    antenna1 : :class:`numpy.ndarray`
+        Antenna 1 values of shape :code:`(row,)`.
+    antenna2 : :class:`numpy.ndarray`
+        Antenna 2 values of shape :code:`(row,)`.
+    flag_row : :class:`numpy.ndarray`, optional
+        Positive values indicate that a row is flagged, while
+        zero implies unflagged. Has shape :code:`(row,)`.
+    time_bin_secs : int, optional
+        Number of timesteps to average into each bin
+
+    Returns
+    -------
+    map : :class:`numpy.ndarray`
+        Mapping from `np.arange(row)` to output row indices
+        of shape :code:`(row,)`
+    time : :class:`numpy.ndarray`
+        Averaged time values of shape :code:`(out_row,)`
+    interval : :class:`numpy.ndarray`
+        Summed interval values of shape :code:`(out_row,)`
+    flag_row : :class:`numpy.ndarray` or None
+        Output flag rows of shape :code:`(out_row,)`.
+        None if no input flag_row was supplied.
+
+    Raises
+    ------
+    RowMapperError
+        Raised if an illegal condition occurs
+    """
+    have_flag_row = not is_numba_type_none(flag_row)
     is_flagged_fn = is_flagged_factory(have_flag_row)
 
     output_flag_row = output_factory(have_flag_row)
-    set_flag_row = set_flag_row_factory(have_flag_row)
+    assign_flag_row = assign_flag_row_factory(have_flag_row)
+    bin_baseline = baseline_binner_factory(is_flagged_fn)
 
     def impl(time, interval, antenna1, antenna2,
              flag_row=None, time_bin_secs=1):
-        ubl, _, bl_inv, _ = unique_baselines(antenna1, antenna2)
-        utime, _, time_inv, _ = unique_time(time)
+        ubl, _, bl_inv, _ = parallel_unique_baselines(antenna1, antenna2)
+        utime, _, time_inv, _ = parallel_unique_time(time)
 
+        nrow = time.shape[0]
         nbl = ubl.shape[0]
         ntime = utime.shape[0]
 
         sentinel = np.finfo(time.dtype).max
-        out_rows = numba.uint32(0)
 
-        scratch = np.full(3*nbl*ntime, -1, dtype=np.int32)
-        row_lookup = scratch[:nbl*ntime].reshape(nbl, ntime)
-        bin_lookup = scratch[nbl*ntime:2*nbl*ntime].reshape(nbl, ntime)
-        inv_argsort = scratch[2*nbl*ntime:]
+        row_lookup = np.full((nbl, ntime), -1, dtype=np.int32)
+        bin_lookup = np.full((nbl, ntime), -1, dtype=np.int32)
         time_lookup = np.zeros((nbl, ntime), dtype=time.dtype)
         interval_lookup = np.zeros((nbl, ntime), dtype=interval.dtype)
-
-        # Is the entire bin flagged?
         bin_flagged = np.zeros((nbl, ntime), dtype=np.bool_)
+        bl_bins = np.empty(nbl, dtype=np.int32)
 
         # Create a mapping from the full bl x time resolution back
         # to the original input rows
-        for r in range(time.shape[0]):
-            bl = bl_inv[r]
-            t = time_inv[r]
-
-            if row_lookup[bl, t] == -1:
-                row_lookup[bl, t] = r
-            else:
-                raise ValueError("Duplicate (TIME, ANTENNA1, ANTENNA2) "
-                                 "combinations were discovered in the input "
-                                 "data. This is usually caused by not "
-                                 "partitioning your data sufficiently "
-                                 "by indexing columns, DATA_DESC_ID "
-                                 "and SCAN_NUMBER in particular.")
+        fill_row_lookup(row_lookup, bl_inv, time_inv)
 
-        # Average times over each baseline and construct the
-        # bin_lookup and time_lookup arrays
-        for bl in range(ubl.shape[0]):
-            tbin = numba.int32(0)
-            bin_count = numba.int32(0)
-            bin_flag_count = numba.int32(0)
-            bin_low = time.dtype.type(0)
-
-            for t in range(utime.shape[0]):
-                # Lookup input row
-                r = row_lookup[bl, t]
-
-                # Ignore if not present
-                if r == -1:
-                    continue
-
-                # At this point, we decide whether to contribute to
-                # the current bin, or create a new one. We don't add
-                # the current sample to the current bin if
-                # high - low >= time_bin_secs
-                half_int = interval[r] * 0.5
-
-                # We're starting a new bin anyway,
-                # just set the lower bin value
-                if bin_count == 0:
-                    bin_low = time[r] - half_int
-                # If we exceed the seconds in the bin,
-                # normalise the time and start a new bin
-                elif time[r] + half_int - bin_low > time_bin_secs:
-                    # Normalise and flag the bin
-                    # if total counts match flagged counts
-                    if bin_count > 0:
-                        time_lookup[bl, tbin] /= bin_count
-                        bin_flagged[bl, tbin] = bin_count == bin_flag_count
-                    # There was nothing in the bin
-                    else:
-                        time_lookup[bl, tbin] = sentinel
-                        bin_flagged[bl, tbin] = False
-
-                    tbin += 1
-                    bin_count = 0
-                    bin_flag_count = 0
-
-                # Record the output bin associated with the row
-                bin_lookup[bl, t] = tbin
-
-                # Time + Interval take unflagged + unflagged
-                # samples into account (nominal value)
-                time_lookup[bl, tbin] += time[r]
-                interval_lookup[bl, tbin] += interval[r]
-                bin_count += 1
-
-                # Record flags
-                if is_flagged_fn(flag_row, r):
-                    bin_flag_count += 1
-
-            # Normalise the last bin if it has entries in it
-            if bin_count > 0:
-                time_lookup[bl, tbin] /= bin_count
-                bin_flagged[bl, tbin] = bin_count == bin_flag_count
-                tbin += 1
+        # Bin each baseline independently
+        for bl in numba.prange(nbl):
+            bl_bins[bl] = bin_baseline(bl, row_lookup, time, interval,
+                                       flag_row, time_bin_secs, sentinel,
+                                       time_lookup, interval_lookup,
+                                       bin_lookup, bin_flagged)
 
-            # Add this baseline's number of bins to the output rows
-            out_rows += tbin
+        # Offset of each baseline's bins in a compacted bin array
+        bl_offsets = np.empty(nbl + 1, dtype=np.intp)
+        bl_offsets[0] = 0
 
-            # Set any remaining bins to sentinel value and unflagged
-            for b in range(tbin, ntime):
-                time_lookup[bl, b] = sentinel
-                bin_flagged[bl, b] = False
+        for bl in range(nbl):
+            bl_offsets[bl + 1] = bl_offsets[bl] + bl_bins[bl]
 
-        # Flatten the time lookup and argsort it
-        flat_time = time_lookup.ravel()
-        flat_int = interval_lookup.ravel()
-        argsort = np.argsort(flat_time, kind='mergesort')
+        out_rows = bl_offsets[nbl]
 
-        # Generate lookup from flattened (bl, time) to output row
-        for i, a in enumerate(argsort):
-            inv_argsort[a] = i
+        # Compact valid bins in (baseline, bin) order
+        bin_time = np.empty(out_rows, dtype=time.dtype)
+        bin_bl = np.empty(out_rows, dtype=np.int32)
+        bin_tbin = np.empty(out_rows, dtype=np.int32)
 
-        # Construct the final row map
-        row_map = np.empty((time.shape[0]), dtype=np.uint32)
+        for bl in numba.prange(nbl):
+            offset = bl_offsets[bl]
 
-        # Construct output flag row, if necessary
+            for b in range(bl_bins[bl]):
+                bin_time[offset + b] = time_lookup[bl, b]
+                bin_bl[offset + b] = bl
+                bin_tbin[offset + b] = b
+
+        # A stable sort on the compacted bins produces the
+        # same ordering as the stable sort over the full grid
+        argsort = np.argsort(bin_time, kind='mergesort')
+        inv_argsort = np.empty(out_rows, dtype=np.uint32)
+
+        time_ret = np.empty(out_rows, dtype=time.dtype)
+        int_ret = np.empty(out_rows, dtype=interval.dtype)
         out_flag_row = output_flag_row(out_rows, flag_row)
 
-        # foreach input row
-        for in_row in range(time.shape[0]):
-            # Lookup baseline and time
-            bl = bl_inv[in_row]
-            t = time_inv[in_row]
+        for out_row in numba.prange(out_rows):
+            i = argsort[out_row]
+            bl = bin_bl[i]
+            tbin = bin_tbin[i]
 
-            # lookup time bin and output row
-            tbin = bin_lookup[bl, t]
-            # lookup output row in inv_argsort
-            out_row = inv_argsort[bl*ntime + tbin]
+            inv_argsort[i] = out_row
+            time_ret[out_row] = time_lookup[bl, tbin]
+            int_ret[out_row] = interval_lookup[bl, tbin]
+            assign_flag_row(out_flag_row, out_row, bin_flagged[bl, tbin])
 
-            if out_row >= out_rows:
-                raise RowMapperError("out_row >= out_rows")
+        # Construct the final row map
+        row_map = np.empty(nrow, dtype=np.uint32)
+        invalid = 0
 
-            # Handle output row flagging
-            set_flag_row(flag_row, in_row,
-                         out_flag_row, out_row,
-                         bin_flagged[bl, tbin])
+        for in_row in numba.prange(nrow):
+            bl = bl_inv[in_row]
+            tbin = bin_lookup[bl, time_inv[in_row]]
+            row_map[in_row] = inv_argsort[bl_offsets[bl] + tbin]
 
-            row_map[in_row] = out_row
+            # Unflagged input rows should never
+            # contribute to flagged output rows
+            if (bin_flagged[bl, tbin] and
+                    not is_flagged_fn(flag_row, in_row)):
+                invalid += 1
 
-        time_ret = flat_time[argsort[:out_rows]]
-        int_ret = flat_int[argsort[:out_rows]]
+        if invalid > 0:
+            raise RowMapperError("Unflagged input row contributing "
+                                 "to flagged output row. "
+                                 "This should never happen!")
 
         return RowMapOutput(row_map, time_ret, int_ret, out_flag_row)
 
     return impl
 
 
+@njit(nogil=True, cache=True)
+def inv_sinc(sinc_x, tol=1e-12):
+    r"""
+    Finds :math:`x \in [0, \pi]` such that
+    :math:`\frac{\sin x}{x} =` ``sinc_x``, by bisection.
+    """
+    if sinc_x >= 1.0:
+        return 0.0
+    elif sinc_x <= 0.0:
+        return np.pi
+
+    lower = 0.0
+    upper = np.pi
+
+    while upper - lower > tol:
+        mid = 0.5*(lower + upper)
+
+        if np.sin(mid) / mid > sinc_x:
+            lower = mid
+        else:
+            upper = mid
+
+    return 0.5*(lower + upper)
+
+
+@njit(nogil=True, cache=True)
+def decorrelation_time_bin_secs(uv_length, decorrelation,
+                                max_fov, max_time_bin_secs):
+    r"""
+    Computes the time bin width of each baseline, such that the amplitude
+    of a source at the edge of the field of view decorrelates by
+    no more than ``decorrelation``.
+
+    The phase of a source at direction cosine :math:`l` changes
+    at a rate of at most :math:`2 \pi \omega_E |uv| l`,
+    where :math:`\omega_E` is the Earth's angular velocity and
+    :math:`|uv|` the uv-length in wavelengths.
+    Averaging over :math:`\Delta t` then attenuates the amplitude
+    by :math:`\textrm{sinc}(\pi \omega_E |uv| l \Delta t)`.
+
+    Parameters
+    ----------
+    uv_length : :class:`numpy.ndarray`
+        uv-length of each baseline in wavelengths, of shape :code:`(bl,)`.
+    decorrelation : float
+        Acceptable fraction of the amplitude remaining after averaging.
+        0.98, for example, accepts a 2% loss in amplitude.
+    max_fov : float
+        Radius of the field of view in degrees.
+    max_time_bin_secs : float
+        Maximum time bin width in seconds.
+
+    Returns
+    -------
+    time_bin_secs : :class:`numpy.ndarray`
+        Time bin width in seconds of each baseline,
+        of shape :code:`(bl,)`.
+    """
+    x = inv_sinc(decorrelation)
+    max_l = np.sin(max_fov * DEG2RAD)
+
+    time_bin_secs = np.empty(uv_length.shape[0], dtype=np.float64)
+
+    for bl in range(uv_length.shape[0]):
+        rate = np.pi * EARTH_ROTATION_RATE * uv_length[bl] * max_l
+
+        if rate == 0.0:
+            time_bin_secs[bl] = max_time_bin_secs
+        else:
+            time_bin_secs[bl] = min(x / rate, max_time_bin_secs)
+
+    return time_bin_secs
+
+
+@njit(nogil=True, cache=True)
+def decorrelation_chan_bin_size(uv_length, decorrelation, max_fov,
+                                chan_freq, chan_width, max_chan_bin_size):
+    r"""
+    Computes the channel bin size of each baseline, such that the amplitude
+    of a source at the edge of the field of view decorrelates by
+    no more than ``decorrelation``.
+
+    Over a bandwidth :math:`\Delta \nu`, the phase of a source at
+    direction cosine :math:`l` changes by at most
+    :math:`2 \pi \Delta \nu |uv| l / \nu`, where :math:`|uv|` is the
+    uv-length in wavelengths at frequency :math:`\nu`.
+    Averaging over :math:`\Delta \nu` then attenuates the amplitude
+    by :math:`\textrm{sinc}(\pi \Delta \nu |uv| l / \nu)`.
+
+    Parameters
+    ----------
+    uv_length : :class:`numpy.ndarray`
+        uv-length of each baseline in wavelengths at
+        the highest frequency, of shape :code:`(bl,)`.
+    decorrelation : float
+        Acceptable fraction of the amplitude remaining after averaging.
+    max_fov : float
+        Radius of the field of view in degrees.
+    chan_freq : :class:`numpy.ndarray`
+        Channel frequencies of shape :code:`(chan,)`.
+    chan_width : :class:`numpy.ndarray`
+        Channel widths of shape :code:`(chan,)`.
+    max_chan_bin_size : float
+        Maximum number of channels in a bin.
+
+    Returns
+    -------
+    chan_bin_size : :class:`numpy.ndarray`
+        Number of channels averaged together on each baseline,
+        of shape :code:`(bl,)`.
+    """
+    nchan = chan_width.shape[0]
+    x = inv_sinc(decorrelation)
+    max_l = np.sin(max_fov * DEG2RAD)
+    max_freq = chan_freq.max()
+    max_width = np.abs(chan_width).max()
+    max_size = max(min(max_chan_bin_size, nchan), 1)
+
+    chan_bin_size = np.empty(uv_length.shape[0], dtype=np.intp)
+
+    for bl in range(uv_length.shape[0]):
+        rate = np.pi * uv_length[bl] * max_l * max_width / max_freq
+
+        if rate == 0.0:
+            chan_bin_size[bl] = max_size
+        else:
+            bins = np.floor(x / rate)
+            chan_bin_size[bl] = max(min(bins, max_size), 1)
+
+    return chan_bin_size
+
+
+BaselineSummary = namedtuple("BaselineSummary",
+                             ["antenna1", "antenna2", "uv_length",
+                              "time_bin_secs", "input_rows",
+                              "output_rows", "compression"])
+
+
+@generated_jit(nopython=True, nogil=True, cache=True)
+def baseline_row_mapper(time, interval, antenna1, antenna2, uvw, chan_freq,
+                        flag_row=None, decorrelation=0.98, max_fov=45.0,
+                        time_bin_secs=np.inf):
+    """
+    Generates a baseline-dependent mapping from high resolution
+    to low resolution rows.
+
+    Whereas :func:`row_mapper` applies the same `time_bin_secs`
+    to every baseline, this function derives the time bin width
+    of each baseline from its maximum uv-length at the highest
+    frequency in ``chan_freq``, so that short baselines
+    are averaged more than long baselines.
+    See :func:`decorrelation_time_bin_secs` for further details.
+
+    Parameters
+    ----------
+    time : :class:`numpy.ndarray`
+        Time values of shape :code:`(row,)`.
+    interval : :class:`numpy.ndarray`
+        Exposure times of shape :code:`(row,)`.
+    antenna1 : :class:`numpy.ndarray`
+        Antenna 1 values of shape :code:`(row,)`.
+    antenna2 : :class:`numpy.ndarray`
+        Antenna 2 values of shape :code:`(row,)`.
+    uvw : :class:`numpy.ndarray`
+        UVW coordinates in metres of shape :code:`(row, 3)`.
+    chan_freq : :class:`numpy.ndarray`
+        Channel frequencies of shape :code:`(chan,)`.
+    flag_row : :class:`numpy.ndarray`, optional
+        Positive values indicate that a row is flagged, while
+        zero implies unflagged. Has shape :code:`(row,)`.
+    decorrelation : float, optional
+        Acceptable fraction of the amplitude remaining after averaging.
+        Defaults to 0.98.
+    max_fov : float, optional
+        Radius of the field of view in degrees. Defaults to 45.0.
+    time_bin_secs : float, optional
+        Maximum time bin width in seconds. Unbounded by default.
+
+    Returns
+    -------
+    row_meta : namedtuple
+        Row mapping, with the same fields as :func:`row_mapper`.
+    summary : namedtuple
+        Summary of the averaging performed on each unique baseline,
+        with fields :code:`antenna1`, :code:`antenna2`,
+        :code:`uv_length` (wavelengths), :code:`time_bin_secs`,
+        :code:`input_rows`, :code:`output_rows`
+        and :code:`compression`, the ratio of input to output rows.
+    """
+    have_flag_row = not is_numba_type_none(flag_row)
+    map_rows = row_map_factory(have_flag_row)
+
+    def impl(time, interval, antenna1, antenna2, uvw, chan_freq,
+             flag_row=None, decorrelation=0.98, max_fov=45.0,
+             time_bin_secs=np.inf):
+        ubl, _, bl_inv, bl_counts = unique_baselines(antenna1, antenna2)
+        utime, _, time_inv, _ = unique_time(time)
+
+        nbl = ubl.shape[0]
+        ntime = utime.shape[0]
+
+        # Maximum uv-length of each baseline in wavelengths
+        uv_length = np.zeros(nbl, dtype=np.float64)
+        wavelength = lightspeed / chan_freq.max()
+
+        for r in range(time.shape[0]):
+            bl = bl_inv[r]
+            uvl = np.sqrt(uvw[r, 0]**2 + uvw[r, 1]**2) / wavelength
+
+            if uvl > uv_length[bl]:
+                uv_length[bl] = uvl
+
+        bl_time_bin_secs = decorrelation_time_bin_secs(uv_length,
+                                                       decorrelation,
+                                                       max_fov,
+                                                       time_bin_secs)
+
+        row_meta = map_rows(time, interval, bl_inv, time_inv,
+                            nbl, ntime, flag_row,
+                            bl_time_bin_secs.astype(time.dtype))
+
+        # Count the output rows produced by each baseline
+        out_rows = row_meta.time.shape[0]
+        out_bl = np.empty(out_rows, dtype=np.intp)
+
+        for r in range(time.shape[0]):
+            out_bl[row_meta.map[r]] = bl_inv[r]
+
+        out_counts = np.zeros(nbl, dtype=np.intp)
+
+        for r in range(out_rows):
+            out_counts[out_bl[r]] += 1
+
+        compression = np.empty(nbl, dtype=np.float64)
+
+        for bl in range(nbl):
+            compression[bl] = bl_counts[bl] / out_counts[bl]
+
+        summary = BaselineSummary(ubl[:, 0], ubl[:, 1], uv_length,
+                                  bl_time_bin_secs, bl_counts,
+                                  out_counts, compression)
+
+        return row_meta, summary
+
+    return impl
+
+
 @jit(nopython=True, nogil=True, cache=True)
 def channel_mapper(nchan, chan_bin_size=1):
     chan_map = np.empty(nchan, dtype=np.uint32)
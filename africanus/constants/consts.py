@@ -12,3 +12,6 @@ minus_two_pi_over_c = -two_pi_over_c
 
 DEG2RAD = 3.14 / 180.0 if on_rtd() else np.pi / 180.0
 ARCSEC2RAD = 3.14 / (180 * 3600) if on_rtd() else np.pi / (180 * 3600)
+
+# Angular velocity of the Earth's rotation in radians per second
+EARTH_ROTATION_RATE = 7.2921150e-5
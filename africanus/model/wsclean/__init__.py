@@ -1,4 +1,7 @@
-__all__ = ["load", "spectra"]
+__all__ = ["load", "load_arrays", "load_chunks", "cached_load",
+           "spectra", "parallel_spectra"]
 
-from africanus.model.wsclean.file_model import load
-from africanus.model.wsclean.spec_model import spectra
+from africanus.model.wsclean.file_model import load, load_arrays
+from africanus.model.wsclean.file_chunks import load_chunks
+from africanus.model.wsclean.file_cache import cached_load
+from africanus.model.wsclean.spec_model import spectra, parallel_spectra
@@ -1,24 +1,39 @@
 # -*- coding: utf-8 -*-
 
 
-from africanus.model.wsclean.spec_model import (spectra as np_spectra,
-                                                SPECTRA_DOCS)
+from operator import getitem
+import os
+
+import numpy as np
+
+from africanus.model.wsclean.file_chunks import (_chunk_offsets,
+                                                 _load_chunk,
+                                                 DEFAULT_BLOCK_SIZE)
+from africanus.model.wsclean.file_model import _parse_header
+from africanus.model.wsclean.spec_model import (
+                                spectra as np_spectra,
+                                parallel_spectra as np_parallel_spectra,
+                                SPECTRA_DOCS)
 from africanus.util.requirements import requires_optional
 
 try:
+    from dask.base import tokenize
     import dask.array as da
+    import dask.blockwise as db
+    from dask.highlevelgraph import HighLevelGraph
 except ImportError as e:
     opt_import_error = e
 else:
     opt_import_error = None
 
 
-def _wrapper(stokes, spi, log_si, ref_freq, frequency):
-    return np_spectra(stokes, spi[0], log_si, ref_freq, frequency)
+def _wrapper(stokes, spi, log_si, ref_freq, frequency, parallel):
+    fn = np_parallel_spectra if parallel else np_spectra
+    return fn(stokes, spi[0], log_si, ref_freq, frequency)
 
 
 @requires_optional('dask.array', opt_import_error)
-def spectra(stokes, spi, log_si, ref_freq, frequency):
+def spectra(stokes, spi, log_si, ref_freq, frequency, parallel=False):
     corrs = tuple("corr-%d" % i for i in range(len(stokes.shape[1:])))
     log_si_schema = None if isinstance(log_si, bool) else ("source",)
 
@@ -28,11 +43,134 @@ def spectra(stokes, spi, log_si, ref_freq, frequency):
                         log_si, log_si_schema,
                         ref_freq, ("source",),
                         frequency, ("chan",),
+                        parallel, None,
                         dtype=stokes.dtype)
 
 
+def _load_chunk_wrapper(offsets, filename, header_line,
+                        spi_coeffs, string_widths):
+    start, end = offsets[0]
+    return tuple(a for _, a in _load_chunk(filename, start, end,
+                                           header_line, spi_coeffs,
+                                           string_widths))
+
+
+def _getitem_source(chunks, idx, dims, shape, dtype):
+    """ Extract source arrays from a dask array of tuples """
+    name = ("wsclean-load-getitem-%d-" % idx) + tokenize(chunks, idx)
+    layers = db.blockwise(getitem, name, dims,
+                          chunks.name, ("source",),
+                          idx, None,
+                          new_axes=dict(zip(dims[1:], shape)),
+                          numblocks={chunks.name: chunks.numblocks})
+    graph = HighLevelGraph.from_collections(name, layers, (chunks,))
+
+    return da.Array(graph, name, chunks.chunks + tuple((s,) for s in shape),
+                    meta=np.empty((0,)*len(dims), dtype=dtype),
+                    dtype=dtype)
+
+
+_COLUMN_DTYPES = {
+    'LogarithmicSI': np.bool_,
+}
+
+
+@requires_optional('dask.array', opt_import_error)
+def load_arrays(filename, chunks, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Loads a wsclean component model into dask arrays
+    with source chunks of ``chunks`` sources.
+
+    The file is scanned for the byte offsets of each source chunk,
+    without parsing the sources. Each chunk then
+    reads and parses its own lines when computed,
+    so that the full component list is never held in memory.
+
+    .. code-block:: python
+
+        sources = dict(load_arrays("components.txt", chunks=10000))
+
+        I = sources["I"]
+        spi = sources["SpectralIndex"]
+
+    Parameters
+    ----------
+    filename : str
+        Filename of wsclean model file.
+    chunks : int
+        Number of sources in each chunk.
+        The last chunk may contain fewer sources.
+    block_size : int, optional
+        Number of bytes read at a time when scanning the file.
+        Defaults to 16MB.
+
+    See Also
+    --------
+    africanus.model.wsclean.load_arrays
+    africanus.model.wsclean.load_chunks
+
+    Returns
+    -------
+    list of (name, :class:`dask.array.Array`) tuples
+        list of column (name, value) tuples,
+        chunked along the source dimension.
+        ``SpectralIndex`` has shape :code:`(source, coeffs)`,
+        where sources with fewer coefficients than the maximum
+        in the file are padded with zeros.
+    """
+    filename = os.path.abspath(filename)
+    (header_line, offsets, source_chunks,
+     spi_coeffs, string_widths) = _chunk_offsets(filename, chunks,
+                                                 block_size)
+    header = header_line.split("#", 1)[0].strip()
+    column_names, _ = _parse_header(header)
+
+    # Ties the graph to the file contents
+    stat = os.stat(filename)
+    token = tokenize(filename, stat.st_size, stat.st_mtime_ns, chunks)
+    offsets = da.from_array(offsets, chunks=(1, 2),
+                            name="wsclean-offsets-" + token)
+
+    source_tuples = da.blockwise(_load_chunk_wrapper, ("source",),
+                                 offsets, ("source", "offset"),
+                                 filename, None,
+                                 header_line, None,
+                                 spi_coeffs, None,
+                                 string_widths, None,
+                                 concatenate=True,
+                                 adjust_chunks={"source": source_chunks},
+                                 meta=np.empty((0,), dtype=np.object),
+                                 dtype=np.object)
+
+    arrays = []
+
+    for idx, name in enumerate(column_names):
+        if name == "SpectralIndex":
+            dims, shape = ("source", "spi"), (spi_coeffs,)
+        else:
+            dims, shape = ("source",), ()
+
+        if name in string_widths:
+            # Chunks are widened to the widest string in the file
+            dtype = np.dtype("<U%d" % string_widths[name])
+        else:
+            dtype = _COLUMN_DTYPES.get(name, np.float64)
+        arrays.append((name, _getitem_source(source_tuples, idx,
+                                             dims, shape, dtype)))
+
+    return arrays
+
+
+EXTRA_DASK_ARGS = """parallel : bool, optional
+    If True, evaluate each chunk with
+    :func:`~africanus.model.wsclean.spec_model.parallel_spectra`.
+    Defaults to False.
+"""
+
 try:
     spectra.__doc__ = SPECTRA_DOCS.substitute(
-                            array_type=":class:`dask.array.Array`")
+                            array_type=":class:`dask.array.Array`",
+                            extra_notes="",
+                            extra_args=EXTRA_DASK_ARGS)
 except AttributeError:
     pass
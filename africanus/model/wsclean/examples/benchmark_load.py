@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Compares the per-field :func:`load` parser with the
+compiled :func:`load_arrays` parser on a synthetic
+WSClean component list.
+
+.. code-block:: bash
+
+    $ python benchmark_load.py -ns 100000
+    $ python benchmark_load.py -ns 100000 -o components.txt
+
+The generated component list is written to a temporary file
+unless an output filename is supplied.
+"""
+
+import argparse
+from collections import namedtuple
+import os
+import tempfile
+from timeit import default_timer as timer
+
+import numpy as np
+
+from africanus.model.wsclean.file_model import (_column_arrays,
+                                                load, load_arrays)
+
+
+Result = namedtuple("Result", ["parser", "time"])
+
+_HEADER = ("Format = Name, Type, Ra, Dec, I, SpectralIndex, "
+           "LogarithmicSI, ReferenceFrequency='125584411.621094', "
+           "MajorAxis, MinorAxis, Orientation\n")
+
+
+def create_parser():
+    p = argparse.ArgumentParser()
+    p.add_argument("-ns", "--sources", type=int, default=100000)
+    p.add_argument("-nspi", "--spi-coeffs", type=int, default=2)
+    p.add_argument("-o", "--output", default=None)
+    p.add_argument("-r", "--repeats", type=int, default=3)
+    return p
+
+
+def _sexagesimal(value, sep):
+    """ Formats positive and negative values as (units, mins, secs) """
+    sign = np.where(value < 0, "-", "")
+    value = np.abs(value)
+    units = np.floor(value).astype(np.int64)
+    mins = np.floor((value - units)*60.0).astype(np.int64)
+    secs = (value - units - mins / 60.0)*3600.0
+
+    return ["%s%02d%s%02d%s%06.3f" % (s, u, sep, m, sep, x)
+            for s, u, m, x in zip(sign, units, mins, secs)]
+
+
+def synthesise(args):
+    """
+    Produces the lines of a synthetic component list,
+    with numbers written to 15 significant digits as WSClean does
+    """
+    rs = np.random.RandomState(42)
+    ns = args.sources
+
+    ra = _sexagesimal(rs.uniform(-12.0, 12.0, ns), ":")
+    dec = _sexagesimal(rs.uniform(-89.0, 89.0, ns), ".")
+    flux = rs.random_sample(ns)*1e-3
+    spi = rs.normal(0.0, 0.1, (ns, args.spi_coeffs))
+    log_si = rs.random_sample(ns) < 0.5
+    gauss = rs.random_sample(ns) < 0.5
+    axes = rs.random_sample((ns, 2))*100.0
+    orientation = rs.random_sample(ns)*180.0
+
+    lines = [_HEADER]
+
+    for s in range(ns):
+        if gauss[s]:
+            stype = "GAUSSIAN"
+            shape = "%.15g,%.15g,%.15g" % (axes[s, 0], axes[s, 1],
+                                           orientation[s])
+        else:
+            stype = "POINT"
+            shape = ",,"
+
+        # Leave some reference frequencies to the header default
+        ref_freq = "" if s % 10 == 0 else "125584411.621094"
+
+        lines.append("s%dc0,%s,%s,%s,%.15g,[%s],%s,%s,%s\n" % (
+            s, stype, ra[s], dec[s], flux[s],
+            ",".join("%.15g" % c for c in spi[s]),
+            "true" if log_si[s] else "false",
+            ref_freq, shape))
+
+    return lines
+
+
+def benchmark(args, fn):
+    timings = []
+
+    for _ in range(args.repeats):
+        start = timer()
+        result = fn()
+        timings.append(timer() - start)
+
+    return result, min(timings)
+
+
+def main(argv=None):
+    args = create_parser().parse_args(argv)
+    lines = synthesise(args)
+
+    if args.output is None:
+        fd, filename = tempfile.mkstemp(suffix=".txt")
+        os.close(fd)
+    else:
+        filename = args.output
+
+    try:
+        with open(filename, "w") as f:
+            f.writelines(lines)
+
+        print("%d sources, %d SpectralIndex coefficients, %.1f MB" %
+              (args.sources, args.spi_coeffs,
+               os.path.getsize(filename) / (1024.**2)))
+
+        expected, load_time = benchmark(
+            args, lambda: _column_arrays(load(filename)))
+        arrays, load_arrays_time = benchmark(
+            args, lambda: load_arrays(filename))
+    finally:
+        if args.output is None:
+            os.remove(filename)
+
+    for (name, a), (_, e) in zip(arrays, expected):
+        if not np.array_equal(a, e):
+            raise ValueError("load and load_arrays differ "
+                             "in column %s" % name)
+
+    print("%-12s %10s %8s" % ("Parser", "Time", "Speedup"))
+    print("%-12s %9.4fs %7.2fx" % ("load", load_time, 1.0))
+    print("%-12s %9.4fs %7.2fx" % ("load_arrays", load_arrays_time,
+                                   load_time / load_arrays_time))
+
+    return [Result("load", load_time),
+            Result("load_arrays", load_arrays_time)]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+
+
+def test_benchmark_load():
+    from africanus.model.wsclean.examples.benchmark_load import main
+
+    results = main(["-ns", "100", "-nspi", "3", "-r", "1"])
+
+    assert [r.parser for r in results] == ["load", "load_arrays"]
+    assert all(r.time >= 0.0 for r in results)
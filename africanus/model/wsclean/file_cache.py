@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+
+
+from hashlib import sha1
+import json
+import os
+from os.path import join as pjoin
+import shutil
+import tempfile
+
+import numpy as np
+
+from africanus.model.wsclean.file_model import load_arrays
+from africanus.util.appdirs import user_cache_dir
+from africanus.util.files import sha_hash_file
+
+# Increment when the layout of cache entries changes
+CACHE_VERSION = 1
+
+_META_FILENAME = "meta.json"
+_default_cache_dir = pjoin(user_cache_dir, "wsclean")
+
+
+def _read_meta(entry_dir):
+    try:
+        with open(pjoin(entry_dir, _META_FILENAME), "r") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if meta.get("version") != CACHE_VERSION:
+        return None
+
+    return meta
+
+
+def _write_meta(entry_dir, meta):
+    with open(pjoin(entry_dir, _META_FILENAME), "w") as f:
+        json.dump(meta, f)
+
+
+def _load_entry(entry_dir, meta, mmap_mode):
+    return [(name, np.load(pjoin(entry_dir, "%s.npy" % name),
+                           mmap_mode=mmap_mode,
+                           allow_pickle=False))
+            for name in meta["columns"]]
+
+
+def _write_entry(cache_dir, entry_dir, arrays, meta):
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # Write into a temporary directory and move it into
+    # place, so that partially written entries are never read
+    tmp_dir = tempfile.mkdtemp(dir=cache_dir)
+
+    try:
+        for name, array in arrays:
+            np.save(pjoin(tmp_dir, "%s.npy" % name), array,
+                    allow_pickle=False)
+
+        _write_meta(tmp_dir, meta)
+        shutil.rmtree(entry_dir, ignore_errors=True)
+
+        try:
+            os.rename(tmp_dir, entry_dir)
+        except OSError:
+            # Another process wrote the entry first
+            pass
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def cached_load(filename, cache_dir=None, mmap_mode="r"):
+    """
+    Loads a wsclean component model, caching the parsed
+    columns as numpy arrays.
+
+    The first call parses ``filename`` with :func:`load_arrays` and saves
+    each column as a ``.npy`` file in a cache entry keyed on the
+    absolute path of ``filename``. Subsequent calls memory-map
+    these arrays, avoiding the cost of parsing the text file.
+
+    An entry is valid while the size and modification time of
+    ``filename`` are unchanged. If they differ, the SHA1 hash of
+    the file contents is compared with the hash recorded in the entry
+    and the file is only parsed again if its contents have changed.
+
+    .. code-block:: python
+
+        sources = dict(cached_load("components.txt"))
+
+        I = sources["I"]
+        spi = sources["SpectralIndex"]
+
+    Parameters
+    ----------
+    filename : str
+        Filename of wsclean model file.
+    cache_dir : str, optional
+        Directory holding cache entries.
+        Defaults to a ``wsclean`` directory in the user cache directory.
+    mmap_mode : {None, 'r', 'r+', 'c'}, optional
+        Memory-mapping mode passed to :func:`numpy.load`.
+        Defaults to ``'r'``, so that the arrays are read-only views
+        of the cached files.
+
+    See Also
+    --------
+    africanus.model.wsclean.load
+
+    Returns
+    -------
+    list of (name, :class:`numpy.ndarray`) tuples
+        list of column (name, value) tuples.
+        ``Name`` and ``Type`` are string arrays,
+        ``LogarithmicSI`` a boolean array and the other columns
+        are float64 arrays.
+        ``SpectralIndex`` has shape :code:`(source, coeffs)`,
+        where sources with fewer coefficients are padded with zeros.
+    """
+    if cache_dir is None:
+        cache_dir = _default_cache_dir
+
+    filename = os.path.abspath(filename)
+    key = sha1(filename.encode("utf-8")).hexdigest()
+    entry_dir = pjoin(cache_dir, key)
+
+    stat = os.stat(filename)
+    meta = _read_meta(entry_dir)
+
+    if meta is not None and meta["size"] == stat.st_size:
+        if meta["mtime_ns"] == stat.st_mtime_ns:
+            return _load_entry(entry_dir, meta, mmap_mode)
+
+        # The file was touched, check whether the contents changed
+        content_hash = sha_hash_file(filename)
+
+        if meta["sha1"] == content_hash:
+            meta["mtime_ns"] = stat.st_mtime_ns
+            _write_meta(entry_dir, meta)
+            return _load_entry(entry_dir, meta, mmap_mode)
+    else:
+        content_hash = sha_hash_file(filename)
+
+    arrays = load_arrays(filename)
+
+    meta = {"version": CACHE_VERSION,
+            "filename": filename,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha1": content_hash,
+            "columns": [name for name, _ in arrays]}
+
+    _write_entry(cache_dir, entry_dir, arrays, meta)
+
+    if mmap_mode is None:
+        return arrays
+
+    return _load_entry(entry_dir, meta, mmap_mode)
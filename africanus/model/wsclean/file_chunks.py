@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+
+
+import numpy as np
+
+from africanus.model.wsclean.file_model import (_load_buffer,
+                                                _parse_header,
+                                                _str_column, _strip,
+                                                _COMMA, _LBRACKET,
+                                                _NEWLINE, _RBRACKET,
+                                                _FAST_COLUMN_CONVERTERS)
+from africanus.util.numba import njit
+
+# Number of bytes read at a time when scanning for source chunks
+DEFAULT_BLOCK_SIZE = 2**24
+
+
+def _lines(filename):
+    """ Produces the lines of ``filename`` or an iterable as bytes """
+    if isinstance(filename, str):
+        with open(filename, "rb") as fh:
+            for line in fh:
+                yield line
+    else:
+        for line in filename:
+            yield line.rstrip("\n").encode() + b"\n"
+
+
+def _header_line(lines, filename):
+    """ Consumes ``lines`` up to and including the header line """
+    for line in lines:
+        header_line = line.decode()
+
+        if header_line.split("#", 1)[0].strip():
+            return header_line
+
+    raise ValueError("'%s' does not contain a valid wsclean header"
+                     % filename)
+
+
+def load_chunks(filename, chunk_size):
+    """
+    Lazily loads a wsclean component model
+    in chunks of ``chunk_size`` sources.
+
+    Lines are read as the chunks are consumed and
+    only a single chunk is held in memory,
+    so that sources from enormous component lists can
+    be processed before the whole file has been read.
+
+    .. code-block:: python
+
+        for chunk in load_chunks("components.txt", 10000):
+            sources = dict(chunk)
+            I = sources["I"]
+
+    Parameters
+    ----------
+    filename : str or iterable
+        Filename of wsclean model file or iterable
+        producing the lines of the file.
+    chunk_size : int
+        Number of sources in each chunk.
+        The last chunk may contain fewer sources.
+
+    See Also
+    --------
+    africanus.model.wsclean.load_arrays
+
+    Yields
+    ------
+    list of (name, :class:`numpy.ndarray`) tuples
+        list of column (name, value) tuples of each chunk,
+        as produced by :func:`load_arrays`.
+        ``SpectralIndex`` coefficients are padded with zeros
+        to the maximum number of coefficients in the chunk.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+
+    lines = _lines(filename)
+    header_line = _header_line(lines, filename)
+    chunk = []
+
+    for line in lines:
+        if not line.strip():
+            continue
+
+        chunk.append(line)
+
+        if len(chunk) == chunk_size:
+            yield _load_buffer(np.frombuffer(b"".join(chunk), np.uint8),
+                               header_line)
+            chunk = []
+
+    if chunk:
+        yield _load_buffer(np.frombuffer(b"".join(chunk), np.uint8),
+                           header_line)
+
+
+@njit(nogil=True, cache=True)
+def _scan_block(buf, nsrc, chunk_size, string_columns, widths):
+    """
+    Finds the offsets of the lines starting each chunk
+    of ``chunk_size`` sources among the complete lines in ``buf``,
+    given the ``nsrc`` sources in preceding blocks.
+    The maximum byte width of the fields of each column
+    flagged in ``string_columns`` is recorded in ``widths``.
+
+    Returns the chunk offsets, the updated number of sources,
+    the maximum number of SpectralIndex coefficients and
+    the offset of the incomplete line at the end of ``buf``.
+    """
+    nlines = 0
+
+    for i in range(buf.shape[0]):
+        if buf[i] == _NEWLINE:
+            nlines += 1
+
+    chunk_starts = np.empty(nlines, dtype=np.int64)
+    nchunks = 0
+    max_coeffs = 0
+    i = 0
+
+    while True:
+        eol = i
+
+        while eol < buf.shape[0] and buf[eol] != _NEWLINE:
+            eol += 1
+
+        if eol == buf.shape[0]:
+            break
+
+        start, end = _strip(buf, i, eol)
+
+        if start < end:
+            if nsrc % chunk_size == 0:
+                chunk_starts[nchunks] = i
+                nchunks += 1
+
+            nsrc += 1
+
+            # Split fields on commas outside brackets
+            col = 0
+            field_start = start
+            depth = 0
+
+            for j in range(start, end + 1):
+                if j < end and buf[j] == _LBRACKET:
+                    depth += 1
+                elif j < end and buf[j] == _RBRACKET:
+                    depth = max(depth - 1, 0)
+                elif j == end or (buf[j] == _COMMA and depth == 0):
+                    if col < string_columns.shape[0] and string_columns[col]:
+                        s, e = _strip(buf, field_start, j)
+                        widths[col] = max(widths[col], e - s)
+
+                    col += 1
+                    field_start = j + 1
+
+            # Count the SpectralIndex coefficients
+            lbracket = start
+
+            while lbracket < end and buf[lbracket] != _LBRACKET:
+                lbracket += 1
+
+            rbracket = lbracket + 1
+
+            while rbracket < end and buf[rbracket] != _RBRACKET:
+                rbracket += 1
+
+            if rbracket < end:
+                start, end = _strip(buf, lbracket + 1, rbracket)
+                ncoeffs = 1 if start < end else 0
+
+                for j in range(start, end):
+                    if buf[j] == _COMMA:
+                        ncoeffs += 1
+
+                max_coeffs = max(max_coeffs, ncoeffs)
+
+        i = eol + 1
+
+    return chunk_starts[:nchunks], nsrc, max_coeffs, i
+
+
+def _chunk_offsets(filename, chunk_size, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Scans a wsclean component model for the byte offsets
+    of chunks of ``chunk_size`` sources, without parsing the sources.
+
+    Parameters
+    ----------
+    filename : str
+        Filename of wsclean model file.
+    chunk_size : int
+        Number of sources in each chunk.
+    block_size : int, optional
+        Number of bytes read at a time.
+
+    Returns
+    -------
+    header_line : str
+        The header line of the file.
+    offsets : :class:`numpy.ndarray`
+        int64 array of shape :code:`(chunk, 2)` holding
+        the start and end byte offsets of each chunk.
+    source_chunks : tuple of ints
+        Number of sources in each chunk.
+    spi_coeffs : int
+        Maximum number of SpectralIndex coefficients.
+    string_widths : dict
+        Maximum width of each string column,
+        including any default in the header.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+
+    with open(filename, "rb") as fh:
+        lines = iter(fh.readline, b"")
+        header_line = _header_line(lines, filename)
+        offset = fh.tell()
+
+        header = header_line.split("#", 1)[0].strip()
+        column_names, defaults = _parse_header(header)
+        string_columns = np.array([_FAST_COLUMN_CONVERTERS.get(n)
+                                   is _str_column for n in column_names])
+        widths = np.zeros(len(column_names), dtype=np.int64)
+
+        chunk_starts = []
+        nsrc = 0
+        spi_coeffs = 0
+        tail = b""
+
+        while True:
+            block = fh.read(block_size)
+            # Terminate the last line
+            data = tail + (block if block else b"\n")
+            starts, nsrc, ncoeffs, end = _scan_block(
+                np.frombuffer(data, np.uint8), nsrc, chunk_size,
+                string_columns, widths)
+
+            chunk_starts.append(starts + offset)
+            spi_coeffs = max(spi_coeffs, ncoeffs)
+            offset += end
+            tail = data[end:]
+
+            if not block:
+                break
+
+    starts = np.concatenate(chunk_starts)
+
+    if starts.size == 0:
+        # A single empty chunk
+        starts = np.array([offset])
+
+    ends = np.append(starts[1:], offset)
+    nchunks = starts.shape[0]
+    source_chunks = ((chunk_size,)*(nchunks - 1) +
+                     (nsrc - chunk_size*(nchunks - 1),))
+
+    # Strings are at least one character wide, as in load_arrays,
+    # and empty fields are replaced with the header default
+    string_widths = {name: max(int(width), len(default or ""), 1)
+                     for name, width, default, string
+                     in zip(column_names, widths, defaults, string_columns)
+                     if string}
+
+    return (header_line, np.stack([starts, ends], axis=1),
+            source_chunks, spi_coeffs, string_widths)
+
+
+def _load_chunk(filename, start, end, header_line,
+                spi_coeffs, string_widths):
+    """
+    Loads the sources between the ``start`` and ``end``
+    byte offsets of ``filename``, padding ``SpectralIndex``
+    to ``spi_coeffs`` coefficients and widening string
+    columns to the widths in ``string_widths``,
+    so that all chunks of a column share a dtype.
+    """
+    with open(filename, "rb") as fh:
+        fh.seek(start)
+        data = fh.read(end - start)
+
+    arrays = _load_buffer(np.frombuffer(data, np.uint8), header_line)
+
+    for i, (name, values) in enumerate(arrays):
+        if name == "SpectralIndex" and values.shape[1] < spi_coeffs:
+            padding = ((0, 0), (0, spi_coeffs - values.shape[1]))
+            arrays[i] = (name, np.pad(values, padding, mode="constant"))
+        elif name in string_widths:
+            arrays[i] = (name, values.astype("<U%d" % string_widths[name]))
+
+    return arrays
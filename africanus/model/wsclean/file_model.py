@@ -5,6 +5,10 @@ from ast import literal_eval
 import math
 import re
 
+import numpy as np
+
+from africanus.util.numba import njit
+
 hour_re = re.compile(r"(?P<sign>[+-]*)"
                      r"(?P<hours>\d+):"
                      r"(?P<mins>\d+):"
@@ -203,3 +207,611 @@ def load(filename):
     finally:
         if close_filename:
             fh.close()
+
+
+def _spi_array(spi):
+    """
+    Pads ragged SpectralIndex lists with zero coefficients,
+    which do not contribute to the spectrum
+    """
+    ncoeffs = max((len(s) for s in spi), default=0)
+    array = np.zeros((len(spi), ncoeffs), dtype=np.float64)
+
+    for i, s in enumerate(spi):
+        array[i, :len(s)] = s
+
+    return array
+
+
+def _column_arrays(columns):
+    """ Converts (name, list of values) columns to numpy arrays """
+    arrays = []
+
+    for name, values in columns:
+        if name == "SpectralIndex":
+            arrays.append((name, _spi_array(values)))
+        elif name in ("Name", "Type"):
+            arrays.append((name, np.asarray(values, dtype=np.str_)))
+        elif name == "LogarithmicSI":
+            arrays.append((name, np.asarray(values, dtype=np.bool_)))
+        else:
+            arrays.append((name, np.asarray(values, dtype=np.float64)))
+
+    return arrays
+
+
+# Byte values used by the tokeniser
+_NEWLINE = ord("\n")
+_COMMA = ord(",")
+_LBRACKET = ord("[")
+_RBRACKET = ord("]")
+_PLUS = ord("+")
+_MINUS = ord("-")
+_DOT = ord(".")
+_COLON = ord(":")
+_ZERO = ord("0")
+_NINE = ord("9")
+_LOWER_E = ord("e")
+_UPPER_E = ord("E")
+_TRUE = np.frombuffer(b"true", dtype=np.uint8)
+
+# Status of parsed fields
+_OK = 0
+_EMPTY = 1
+_FALLBACK = 2
+
+# Powers of ten that are exactly representable as doubles
+_POW10 = np.array([10.0**e for e in range(23)])
+_MAX_EXACT_MANTISSA = 2**53
+
+
+@njit(nogil=True, cache=True, inline='always')
+def _isspace(b):
+    return b == 32 or (b >= 9 and b <= 13)
+
+
+@njit(nogil=True, cache=True, inline='always')
+def _isdigit(b):
+    return b >= _ZERO and b <= _NINE
+
+
+@njit(nogil=True, cache=True, inline='always')
+def _strip(buf, start, end):
+    while start < end and _isspace(buf[start]):
+        start += 1
+
+    while end > start and _isspace(buf[end - 1]):
+        end -= 1
+
+    return start, end
+
+
+@njit(nogil=True, cache=True)
+def _tokenise(buf, ncolumns, spi_index):
+    """
+    Finds the stripped (start, end) byte offsets of the
+    :code:`(column, line)` fields of all non-empty lines in ``buf``.
+    Offsets of the SpectralIndex column exclude the brackets.
+    """
+    n = buf.shape[0]
+    nlines = 1
+
+    for i in range(n):
+        if buf[i] == _NEWLINE:
+            nlines += 1
+
+    starts = np.empty((ncolumns, nlines), dtype=np.int64)
+    ends = np.empty((ncolumns, nlines), dtype=np.int64)
+
+    line = 0
+    i = 0
+
+    while i < n:
+        eol = i
+
+        while eol < n and buf[eol] != _NEWLINE:
+            eol += 1
+
+        s, e = _strip(buf, i, eol)
+
+        # Skip blank lines
+        if s == e:
+            i = eol + 1
+            continue
+
+        pos = i
+        col = 0
+
+        while True:
+            if col == ncolumns:
+                raise ValueError("Too many components")
+
+            if col == spi_index:
+                while pos < eol and _isspace(buf[pos]):
+                    pos += 1
+
+                if pos == eol or buf[pos] != _LBRACKET:
+                    raise ValueError("SpectralIndex is not bracketed")
+
+                field_end = pos + 1
+
+                while field_end < eol and buf[field_end] != _RBRACKET:
+                    field_end += 1
+
+                if field_end == eol:
+                    raise ValueError("SpectralIndex is not bracketed")
+
+                s, e = _strip(buf, pos + 1, field_end)
+                field_end += 1
+
+                while field_end < eol and _isspace(buf[field_end]):
+                    field_end += 1
+
+                if field_end < eol and buf[field_end] != _COMMA:
+                    raise ValueError("SpectralIndex is not a field")
+            else:
+                field_end = pos
+
+                while field_end < eol and buf[field_end] != _COMMA:
+                    field_end += 1
+
+                s, e = _strip(buf, pos, field_end)
+
+            starts[col, line] = s
+            ends[col, line] = e
+            col += 1
+
+            if field_end == eol:
+                break
+
+            pos = field_end + 1
+
+        if col != ncolumns:
+            raise ValueError("Too few components")
+
+        line += 1
+        i = eol + 1
+
+    return starts[:, :line], ends[:, :line]
+
+
+@njit(nogil=True, cache=True, inline='always')
+def _parse_float(buf, start, end):
+    """
+    Parses the decimal number in ``buf[start:end]``.
+
+    Mantissas of at most 53 bits scaled by exactly representable
+    powers of ten are correctly rounded by a single multiplication
+    or division, and so match :func:`float`.
+    Other numbers return the ``_FALLBACK`` status.
+    """
+    if start == end:
+        return 0.0, _EMPTY
+
+    negative = False
+
+    if buf[start] == _MINUS:
+        negative = True
+        start += 1
+    elif buf[start] == _PLUS:
+        start += 1
+
+    mantissa = 0
+    exponent = 0
+    digits = False
+
+    while start < end and _isdigit(buf[start]):
+        if mantissa >= 10**17:
+            return 0.0, _FALLBACK
+
+        mantissa = mantissa*10 + (buf[start] - _ZERO)
+        digits = True
+        start += 1
+
+    if start < end and buf[start] == _DOT:
+        start += 1
+
+        while start < end and _isdigit(buf[start]):
+            if mantissa >= 10**17:
+                return 0.0, _FALLBACK
+
+            mantissa = mantissa*10 + (buf[start] - _ZERO)
+            exponent -= 1
+            digits = True
+            start += 1
+
+    if not digits:
+        return 0.0, _FALLBACK
+
+    if start < end and (buf[start] == _LOWER_E or buf[start] == _UPPER_E):
+        start += 1
+        exp_negative = False
+
+        if start < end and buf[start] == _MINUS:
+            exp_negative = True
+            start += 1
+        elif start < end and buf[start] == _PLUS:
+            start += 1
+
+        exp_value = 0
+        exp_digits = False
+
+        while start < end and _isdigit(buf[start]):
+            if exp_value >= 10**4:
+                return 0.0, _FALLBACK
+
+            exp_value = exp_value*10 + (buf[start] - _ZERO)
+            exp_digits = True
+            start += 1
+
+        if not exp_digits:
+            return 0.0, _FALLBACK
+
+        exponent += -exp_value if exp_negative else exp_value
+
+    if start != end:
+        return 0.0, _FALLBACK
+
+    if mantissa == 0:
+        value = 0.0
+    elif (mantissa > _MAX_EXACT_MANTISSA or
+            exponent < -22 or exponent > 22):
+        return 0.0, _FALLBACK
+    elif exponent < 0:
+        value = np.float64(mantissa) / _POW10[-exponent]
+    else:
+        value = np.float64(mantissa) * _POW10[exponent]
+
+    return -value if negative else value, _OK
+
+
+@njit(nogil=True, cache=True)
+def _float_fields(buf, starts, ends):
+    values = np.empty(starts.shape[0], dtype=np.float64)
+    status = np.empty(starts.shape[0], dtype=np.int8)
+
+    for i in range(starts.shape[0]):
+        values[i], status[i] = _parse_float(buf, starts[i], ends[i])
+
+    return values, status
+
+
+@njit(nogil=True, cache=True, inline='always')
+def _digits_end(buf, start, end):
+    while start < end and _isdigit(buf[start]):
+        start += 1
+
+    return start
+
+
+@njit(nogil=True, cache=True)
+def _sexagesimal_fields(buf, starts, ends, sep, units):
+    """
+    Converts ``units<sep>mins<sep>secs`` fields to radians,
+    where ``units`` are the number of units in a circle.
+    Fields which are not digits with an optional leading sign
+    and decimal seconds return the ``_FALLBACK`` status.
+    """
+    values = np.empty(starts.shape[0], dtype=np.float64)
+    status = np.empty(starts.shape[0], dtype=np.int8)
+
+    for i in range(starts.shape[0]):
+        start = starts[i]
+        end = ends[i]
+        values[i] = 0.0
+
+        if start == end:
+            status[i] = _EMPTY
+            continue
+
+        negative = buf[start] == _MINUS
+
+        if negative or buf[start] == _PLUS:
+            start += 1
+
+        units_end = _digits_end(buf, start, end)
+        mins_end = _digits_end(buf, units_end + 1, end)
+        secs_end = _digits_end(buf, mins_end + 1, end)
+
+        if secs_end < end and buf[secs_end] == _DOT:
+            secs_end = _digits_end(buf, secs_end + 1, end)
+
+        if (units_end == start or units_end == end or
+                buf[units_end] != sep or
+                mins_end == units_end + 1 or mins_end == end or
+                buf[mins_end] != sep or
+                secs_end == mins_end + 1 or
+                not _isdigit(buf[mins_end + 1]) or
+                secs_end != end):
+            status[i] = _FALLBACK
+            continue
+
+        u, ustatus = _parse_float(buf, start, units_end)
+        m, mstatus = _parse_float(buf, units_end + 1, mins_end)
+        s, sstatus = _parse_float(buf, mins_end + 1, end)
+
+        if ustatus != _OK or mstatus != _OK or sstatus != _OK:
+            status[i] = _FALLBACK
+            continue
+
+        value = u / units
+        value += m / (units*60.0)
+        value += s / (units*60.0*60.0)
+
+        if negative:
+            value = -value
+
+        values[i] = 2.0 * math.pi * value
+        status[i] = _OK
+
+    return values, status
+
+
+@njit(nogil=True, cache=True)
+def _bool_fields(buf, starts, ends):
+    values = np.zeros(starts.shape[0], dtype=np.bool_)
+    status = np.full(starts.shape[0], _OK, dtype=np.int8)
+
+    for i in range(starts.shape[0]):
+        start = starts[i]
+
+        if start == ends[i]:
+            status[i] = _EMPTY
+        elif ends[i] - start == _TRUE.shape[0]:
+            values[i] = True
+
+            for j in range(_TRUE.shape[0]):
+                if buf[start + j] != _TRUE[j]:
+                    values[i] = False
+
+    return values, status
+
+
+@njit(nogil=True, cache=True)
+def _string_fields(buf, starts, ends):
+    """ Copies fields into the rows of a zero-padded byte array """
+    width = 1
+
+    for i in range(starts.shape[0]):
+        width = max(width, ends[i] - starts[i])
+
+    chars = np.zeros((starts.shape[0], width), dtype=np.uint8)
+
+    for i in range(starts.shape[0]):
+        for j in range(ends[i] - starts[i]):
+            chars[i, j] = buf[starts[i] + j]
+
+    return chars
+
+
+@njit(nogil=True, cache=True)
+def _spi_fields(buf, starts, ends):
+    """
+    Parses the comma separated coefficients of SpectralIndex fields
+    into a zero-padded :code:`(source, coeffs)` array
+    """
+    nsrc = starts.shape[0]
+    ncoeffs = np.zeros(nsrc, dtype=np.int64)
+
+    for i in range(nsrc):
+        if starts[i] < ends[i]:
+            ncoeffs[i] = 1
+
+            for j in range(starts[i], ends[i]):
+                if buf[j] == _COMMA:
+                    ncoeffs[i] += 1
+
+    spi = np.zeros((nsrc, ncoeffs.max() if nsrc > 0 else 0),
+                   dtype=np.float64)
+    status = np.full(nsrc, _OK, dtype=np.int8)
+
+    for i in range(nsrc):
+        pos = starts[i]
+
+        for c in range(ncoeffs[i]):
+            coeff_end = pos
+
+            while coeff_end < ends[i] and buf[coeff_end] != _COMMA:
+                coeff_end += 1
+
+            s, e = _strip(buf, pos, coeff_end)
+            spi[i, c], coeff_status = _parse_float(buf, s, e)
+
+            if coeff_status != _OK:
+                status[i] = _FALLBACK
+
+            pos = coeff_end + 1
+
+    return spi, status
+
+
+def _field_str(buf, start, end):
+    return buf[start:end].tobytes().decode()
+
+
+def _fill_fallbacks(buf, starts, ends, values, status, default, converter):
+    """
+    Converts fields with the ``_FALLBACK`` status with ``converter``
+    and replaces empty fields with the converted ``default``
+    """
+    for i in np.flatnonzero(status == _FALLBACK):
+        values[i] = converter(_field_str(buf, starts[i], ends[i]))
+
+    empty = status == _EMPTY
+
+    if empty.any():
+        if default is None:
+            # Generate a default as load does
+            try:
+                values[empty] = converter()
+            except Exception:
+                raise ValueError("Missing values and no default")
+        else:
+            values[empty] = converter(default)
+
+    return values
+
+
+def _float_column(buf, starts, ends, default):
+    values, status = _float_fields(buf, starts, ends)
+    return _fill_fallbacks(buf, starts, ends, values, status,
+                           default, float)
+
+
+def _hour_column(buf, starts, ends, default):
+    values, status = _sexagesimal_fields(buf, starts, ends, _COLON, 24.0)
+    return _fill_fallbacks(buf, starts, ends, values, status,
+                           default, _hour_converter)
+
+
+def _deg_column(buf, starts, ends, default):
+    values, status = _sexagesimal_fields(buf, starts, ends, _DOT, 360.0)
+    return _fill_fallbacks(buf, starts, ends, values, status,
+                           default, _deg_converter)
+
+
+def _bool_column(buf, starts, ends, default):
+    values, status = _bool_fields(buf, starts, ends)
+    return _fill_fallbacks(buf, starts, ends, values, status,
+                           default, _COLUMN_CONVERTERS["LogarithmicSI"])
+
+
+def _str_column(buf, starts, ends, default):
+    chars = _string_fields(buf, starts, ends)
+    values = chars.view("S%d" % chars.shape[1])[:, 0].astype(np.str_)
+
+    if default is not None:
+        values = np.where(ends == starts, default, values)
+
+    return values
+
+
+def _spi_column(buf, starts, ends, default):
+    spi, status = _spi_fields(buf, starts, ends)
+
+    # Fall back to literal_eval for irregular entries
+    for i in np.flatnonzero(status):
+        coeffs = literal_eval("[%s]" % _field_str(buf, starts[i], ends[i]))
+
+        if len(coeffs) > spi.shape[1]:
+            raise ValueError("Irregular SpectralIndex '%s'" % coeffs)
+
+        spi[i, :] = 0.0
+        spi[i, :len(coeffs)] = coeffs
+
+    return spi
+
+
+_FAST_COLUMN_CONVERTERS = {
+    'Name': _str_column,
+    'Type': _str_column,
+    'Ra': _hour_column,
+    'Dec': _deg_column,
+    'I': _float_column,
+    'SpectralIndex': _spi_column,
+    'LogarithmicSI': _bool_column,
+    'ReferenceFrequency': _float_column,
+    'MajorAxis': _float_column,
+    'MinorAxis': _float_column,
+    'Orientation': _float_column,
+}
+
+
+def _load_buffer(buf, header_line):
+    """
+    Parses the lines in the uint8 array ``buf``,
+    which follow the ``header_line`` of a wsclean model file
+    """
+    header = header_line.split("#", 1)[0].strip()
+    column_names, defaults = _parse_header(header)
+
+    try:
+        converters = [_FAST_COLUMN_CONVERTERS[n] for n in column_names]
+    except KeyError as e:
+        raise ValueError("No converter registered for column %s" % str(e))
+
+    try:
+        spi_index = column_names.index("SpectralIndex")
+    except ValueError:
+        spi_index = -1
+
+    try:
+        starts, ends = _tokenise(buf, len(column_names), spi_index)
+
+        return [(name, converter(buf, starts[c], ends[c], default))
+                for c, (name, converter, default)
+                in enumerate(zip(column_names, converters, defaults))]
+    except ValueError:
+        # Report errors with line numbers
+        lines = [line for line in buf.tobytes().decode().splitlines()
+                 if line.strip()]
+        return _column_arrays(load([header_line] + lines))
+
+
+def load_arrays(filename):
+    """
+    Loads wsclean component model into numpy arrays.
+
+    Unlike :func:`load`, which converts each field of each line
+    with python functions, the file is tokenised at once and
+    numeric columns are converted by compiled kernels.
+    Numbers produce the same values as :func:`float`,
+    which is only called for numbers with more than
+    15 significant digits or large exponents.
+    Similarly, :func:`ast.literal_eval` is only called for
+    irregular ``SpectralIndex`` entries.
+    Blank lines are ignored and files that cannot be tokenised,
+    for example due to an irregular number of fields,
+    are parsed with :func:`load` to report the offending line.
+
+    .. code-block:: python
+
+        sources = dict(load_arrays("components.txt"))
+
+        I = sources["I"]
+        spi = sources["SpectralIndex"]
+
+    Parameters
+    ----------
+    filename : str or iterable
+        Filename of wsclean model file or iterable
+        producing the lines of the file.
+
+    See Also
+    --------
+    africanus.model.wsclean.load
+
+    Returns
+    -------
+    list of (name, :class:`numpy.ndarray`) tuples
+        list of column (name, value) tuples.
+        ``Name`` and ``Type`` are string arrays,
+        ``LogarithmicSI`` a boolean array and the other columns
+        are float64 arrays.
+        ``SpectralIndex`` has shape :code:`(source, coeffs)`,
+        where sources with fewer coefficients are padded with zeros.
+    """
+    if isinstance(filename, str):
+        with open(filename, "rb") as fh:
+            data = fh.read()
+    else:
+        data = "\n".join(line.rstrip("\n") for line in filename).encode()
+
+    # Search for a header until we find a non-empty string
+    start = 0
+
+    while start < len(data):
+        end = data.find(b"\n", start)
+        end = len(data) if end == -1 else end
+        header_line = data[start:end].decode()
+        header = header_line.split("#", 1)[0].strip()
+        start = end + 1
+
+        if header:
+            break
+    else:
+        raise ValueError("'%s' does not contain a valid wsclean header"
+                         % filename)
+
+    return _load_buffer(np.frombuffer(data, dtype=np.uint8)[start:],
+                        header_line)
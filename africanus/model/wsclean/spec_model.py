@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
+import numba
 from numba import types
 import numpy as np
 
-from africanus.util.numba import generated_jit
+from africanus.util.numba import generated_jit, jit
 from africanus.util.docs import DocstringTemplate
 
 
@@ -119,6 +120,129 @@ def spectra(I, coeffs, log_poly, ref_freq, frequency):  # noqa: E741
     return impl
 
 
+def spectra_groups(coeffs, log_poly):
+    """
+    Groups sources by polynomial type and order,
+    where the order excludes trailing zero coefficients.
+
+    Parameters
+    ----------
+    coeffs : :class:`numpy.ndarray`
+        Polynomial coefficients of shape :code:`(source, comp)`
+    log_poly : :class:`numpy.ndarray` or bool
+        Logarithmic polynomial flags of shape :code:`(source,)`
+
+    Returns
+    -------
+    index : :class:`numpy.ndarray`
+        Source indices sorted by group.
+    offsets : :class:`numpy.ndarray`
+        Offsets of each group in ``index``
+        of shape :code:`(group + 1,)`.
+    group_log_poly : :class:`numpy.ndarray`
+        Whether each group uses logarithmic polynomials.
+    group_order : :class:`numpy.ndarray`
+        Polynomial order of each group.
+    """
+    nsrc, ncoeffs = coeffs.shape
+    log_poly = np.broadcast_to(np.asarray(log_poly, dtype=np.bool_), (nsrc,))
+
+    if ncoeffs == 0:
+        # argmax is undefined without coefficients
+        order = np.zeros(nsrc, dtype=np.intp)
+    else:
+        nonzero = coeffs != 0
+        order = np.where(nonzero.any(axis=1),
+                         ncoeffs - np.argmax(nonzero[:, ::-1], axis=1), 0)
+
+    key = log_poly*(ncoeffs + 1) + order
+    index = np.argsort(key, kind="stable")
+    keys, starts = np.unique(key[index], return_index=True)
+    offsets = np.append(starts, nsrc)
+
+    return index, offsets, keys > ncoeffs, keys % (ncoeffs + 1)
+
+
+@jit(nopython=True, nogil=True, cache=True, parallel=True)
+def parallel_spectra_impl(I, coeffs, ref_index, ref_freqs,  # noqa: E741
+                          frequency, index, offsets,
+                          group_log_poly, group_order, dtype):
+    nsrc = I.shape[0]
+    nchan = frequency.shape[0]
+    nref = ref_freqs.shape[0]
+
+    # Polynomial variables of each unique reference frequency
+    log_table = np.empty((nref, nchan), dtype=dtype)
+    ordinary_table = np.empty((nref, nchan), dtype=dtype)
+
+    for r in range(nref):
+        for f in range(nchan):
+            ratio = frequency[f] / ref_freqs[r]
+            log_table[r, f] = np.log(ratio)
+            ordinary_table[r, f] = ratio - 1.0
+
+    spectral_model = np.empty((nsrc, nchan), dtype=dtype)
+
+    for g in range(offsets.shape[0] - 1):
+        order = group_order[g]
+        log_poly = group_log_poly[g]
+        table = log_table if log_poly else ordinary_table
+
+        for i in numba.prange(offsets[g], offsets[g + 1]):
+            s = index[i]
+            r = ref_index[s]
+            base = np.log(I[s]) if log_poly else I[s]
+
+            for f in range(nchan):
+                x = table[r, f]
+                poly = 0.0
+
+                # Horner's scheme for sum(coeffs[c] * x**(c + 1))
+                for c in range(order - 1, -1, -1):
+                    poly = (poly + coeffs[s, c]) * x
+
+                if log_poly:
+                    spectral_model[s, f] = np.exp(base + poly)
+                else:
+                    spectral_model[s, f] = base + poly
+
+    return spectral_model
+
+
+def parallel_spectra(I, coeffs, log_poly, ref_freq, frequency):  # noqa: E741
+    if not (I.shape[0] == coeffs.shape[0] == ref_freq.shape[0]):
+        raise ValueError("first dimensions of I, coeffs "
+                         "and ref_freq don't match.")
+
+    if isinstance(log_poly, np.ndarray):
+        if log_poly.shape[0] != coeffs.shape[0]:
+            raise ValueError("coeffs.shape[0] != log_poly.shape[0]")
+    elif not isinstance(log_poly, (bool, np.bool_)):
+        raise ValueError("log_poly must be ndarray or bool")
+
+    index, offsets, group_log_poly, group_order = spectra_groups(coeffs,
+                                                                 log_poly)
+
+    # Validate logarithmic polynomials up front,
+    # rather than within parallel loops
+    for g in np.flatnonzero(group_log_poly):
+        src = index[offsets[g]:offsets[g + 1]]
+
+        if np.any(I[src] <= 0.0):
+            raise ValueError("Log polynomial flux must be > 0")
+
+        if np.any(coeffs[src, :group_order[g]] <= 0.0):
+            raise ValueError("log polynomial coefficient must be > 0")
+
+    ref_freqs, ref_index = np.unique(ref_freq, return_inverse=True)
+    dtype = np.result_type(*(np.dtype(a.dtype.name) for a
+                             in (I, coeffs, ref_freq, frequency)))
+
+    return parallel_spectra_impl(I, coeffs, ref_index, ref_freqs,
+                                 frequency, index, offsets,
+                                 group_log_poly, group_order, dtype)
+
+
 SPECTRA_DOCS = DocstringTemplate(r"""
 Produces a spectral model from a polynomial expansion of
 a wsclean file model. Depending on how `log_poly` is set
@@ -137,7 +261,7 @@ the expansion:
               \log({\lambda/\lambda_{ref}})^{c+1}
             \right) \\
 
-
+$(extra_notes)
 See the `WSClean Component List
 <https://sourceforge.net/p/wsclean/wiki/ComponentList/>`_
 for further details.
@@ -158,7 +282,7 @@ ref_freq : $(array_type)
     Source reference frequencies of shape :code:`(source,)`
 frequency : $(array_type)
     frequencies of shape :code:`(chan,)`
-
+$(extra_args)
 See Also
 --------
 africanus.model.wsclean.load
@@ -169,8 +293,26 @@ spectral_model : $(array_type)
     Spectral Model of shape :code:`(source, chan)`
 """)
 
+PARALLEL_SPECTRA_NOTES = r"""
+Sources are grouped by polynomial type and order,
+excluding trailing zero coefficients,
+and the sources of each group are evaluated in parallel.
+The polynomials are evaluated with Horner's scheme over
+tables of :math:`\log(\lambda/\lambda_{ref})` and
+:math:`\lambda/\lambda_{ref} - 1`
+for each unique reference frequency.
+As a result, values may differ from :func:`spectra`
+by a few units in the last place.
+"""
+
 try:
     spectra.__doc__ = SPECTRA_DOCS.substitute(
-                            array_type=":class:`numpy.ndarray`")
+                            array_type=":class:`numpy.ndarray`",
+                            extra_notes="", extra_args="")
+
+    parallel_spectra.__doc__ = SPECTRA_DOCS.substitute(
+                            array_type=":class:`numpy.ndarray`",
+                            extra_notes=PARALLEL_SPECTRA_NOTES,
+                            extra_args="")
 except AttributeError:
     pass
@@ -7,7 +7,9 @@ import pytest
 
 from africanus.model.wsclean.file_model import load
 from africanus.model.wsclean.spec_model import (ordinary_spectral_model,
-                                                log_spectral_model, spectra)
+                                                log_spectral_model,
+                                                parallel_spectra,
+                                                spectra, spectra_groups)
 from africanus.model.wsclean.dask import spectra as dask_spectra
 
 
@@ -67,7 +69,77 @@ def test_spectral_model(spectral_model_inputs, freq):
     assert_array_almost_equal(model, log_spec_model)
 
 
-def test_dask_spectral_model(spectral_model_inputs, freq):
+def test_spectra_groups():
+    coeffs = np.array([[1.0, 2.0, 0.0],
+                       [0.0, 0.0, 0.0],
+                       [1.0, 0.0, 3.0],
+                       [4.0, 0.0, 0.0],
+                       [1.0, 0.0, 0.0]])
+    log_poly = np.array([False, False, False, True, False])
+
+    index, offsets, group_log_poly, group_order = spectra_groups(coeffs,
+                                                                 log_poly)
+
+    assert index.tolist() == [1, 4, 0, 2, 3]
+    assert offsets.tolist() == [0, 1, 2, 3, 4, 5]
+    assert group_log_poly.tolist() == [False, False, False, False, True]
+    assert group_order.tolist() == [0, 1, 2, 3, 1]
+
+    # SpectralIndex entries of [] produce no coefficients
+    index, offsets, group_log_poly, group_order = spectra_groups(
+        coeffs[:, :0], log_poly)
+
+    assert index.tolist() == [0, 1, 2, 4, 3]
+    assert offsets.tolist() == [0, 4, 5]
+    assert group_log_poly.tolist() == [False, True]
+    assert group_order.tolist() == [0, 0]
+
+
+def test_parallel_spectral_model(spectral_model_inputs, freq):
+    I, spi, log_si, ref_freq = spectral_model_inputs
+
+    # Ensure positive flux for logarithmic polynomials
+    I[log_si] = np.abs(I[log_si])
+    spi[log_si] = np.abs(spi[log_si])
+
+    # Introduce mixed polynomial orders and reference frequencies
+    # spectra requires positive coefficients for logarithmic polynomials
+    spi = np.concatenate([spi, np.where(log_si, 1e-3, 0.0)[:, None]], axis=1)
+    spi[0, 2] = 1e-2
+    spi[3, 1:] = 0.0
+    ref_freq[1] = freq[3]
+
+    for log_poly in (log_si, False):
+        expected = spectra(I, spi, log_poly, ref_freq, freq)
+        model = parallel_spectra(I, spi, log_poly, ref_freq, freq)
+        assert_array_almost_equal(model, expected)
+
+    I = np.abs(I)  # noqa
+    spi = np.abs(spi)
+    # Trailing zero coefficients are not validated
+    spi[spi == 0.0] = 1e-3
+    spi[5, 1:] = 0.0
+    expected = spectra(I, spi[:, :1], True, ref_freq, freq)
+    model = parallel_spectra(I, spi[:, :1], True, ref_freq, freq)
+    assert_array_almost_equal(model, expected)
+
+    model = parallel_spectra(I, spi, True, ref_freq, freq)
+    assert_array_almost_equal(model[5], expected[5])
+
+    # No coefficients produces a flat spectrum
+    expected = spectra(I, spi[:, :0], log_si, ref_freq, freq)
+    model = parallel_spectra(I, spi[:, :0], log_si, ref_freq, freq)
+    assert_array_almost_equal(model, expected)
+
+    with pytest.raises(ValueError, match="flux must be > 0"):
+        parallel_spectra(-I, spi, True, ref_freq, freq)
+
+    with pytest.raises(ValueError, match="coefficient must be > 0"):
+        parallel_spectra(I, -spi, True, ref_freq, freq)
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_dask_spectral_model(spectral_model_inputs, freq, parallel):
     da = pytest.importorskip("dask.array")
 
     I, spi, log_si, ref_freq = spectral_model_inputs
@@ -100,5 +172,5 @@ def test_dask_spectral_model(spectral_model_inputs, freq):
     freq = da.from_array(freq, chunks=(freq_chunks,))
 
     # Compute spectra and compare
-    model = dask_spectra(I, spi, log_si, ref_freq, freq)
+    model = dask_spectra(I, spi, log_si, ref_freq, freq, parallel=parallel)
     assert_array_almost_equal(model, spec_model)
@@ -1,9 +1,13 @@
 # -*- coding: utf-8 -*-
 
 
+import os
+
 import numpy as np
+import pytest
 
-from africanus.model.wsclean.file_model import load
+from africanus.model.wsclean.file_model import (_column_arrays,
+                                                load, load_arrays)
 
 
 def test_wsclean_model_file(wsclean_model_file):
@@ -83,3 +87,143 @@ def test_wsclean_model_file(wsclean_model_file):
     assert name[-1] == "s1c2" and stype[-1] == "GAUSSIAN"
 
     assert I[-1] == 0.000660490865128381
+
+
+def test_load_arrays(wsclean_model_file, monkeypatch):
+    from africanus.model.wsclean import file_model
+
+    expected = _column_arrays(load(wsclean_model_file))
+
+    # The file is parsed without falling back to load
+    monkeypatch.setattr(file_model, "load", None)
+    arrays = load_arrays(wsclean_model_file)
+
+    assert [n for n, _ in arrays] == [n for n, _ in expected]
+
+    for (name, values), (_, expected_values) in zip(arrays, expected):
+        assert values.dtype == expected_values.dtype
+        assert np.array_equal(values, expected_values)
+
+
+def test_load_arrays_irregular(monkeypatch):
+    from africanus.model.wsclean import file_model
+
+    lines = ["Format = Name, Ra, Dec, I, SpectralIndex, "
+             "ReferenceFrequency='1e9'",
+             "a,-00:00:01.5,-0.0.1,0.12345678901234567,[1.0],1.5e9",
+             "",
+             "b, +01:02:03 , 10.20.30, -1e-30, [ 2.5E+2 , -3 ,4. ] ,",
+             "c,01:02:03abc,10.20.30.5,.5,[],2e9",
+             "d,01:02:03,10.20.30,1,[1.0,2.0,],2e9",
+             "e,01:02:03,10.20.30,1,[0x1],2e9"]
+
+    expected = dict(_column_arrays(load(line for line in lines if line)))
+
+    with monkeypatch.context() as m:
+        m.setattr(file_model, "load", None)
+        arrays = dict(load_arrays(lines))
+
+    assert arrays.keys() == expected.keys()
+    assert arrays["SpectralIndex"].shape == (5, 3)
+
+    for name, values in arrays.items():
+        assert values.dtype == expected[name].dtype
+        assert np.array_equal(values, expected[name])
+
+    # Irregular number of fields are reported by load
+    with pytest.raises(ValueError, match="should have 6 components"):
+        load_arrays(lines + ["f,01:02:03,10.20.30,1,[1.0]"])
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 10])
+def test_load_chunks(wsclean_model_file, chunk_size):
+    from africanus.model.wsclean.file_chunks import load_chunks
+
+    expected = load_arrays(wsclean_model_file)
+    chunks = list(load_chunks(wsclean_model_file, chunk_size))
+
+    assert ([len(dict(c)["I"]) for c in chunks] ==
+            [len(s) for s in np.array_split(np.arange(7),
+                                            range(chunk_size, 7,
+                                                  chunk_size))])
+
+    for i, (name, values) in enumerate(expected):
+        chunk_values = np.concatenate([c[i][1] for c in chunks])
+        assert np.array_equal(chunk_values, values)
+
+
+@pytest.mark.parametrize("chunks", [3, 7])
+@pytest.mark.parametrize("block_size", [16, 2**24])
+def test_dask_load_arrays(wsclean_model_file, chunks, block_size):
+    da = pytest.importorskip("dask.array")
+    from africanus.model.wsclean.dask import load_arrays as da_load_arrays
+
+    expected = load_arrays(wsclean_model_file)
+    arrays = da_load_arrays(wsclean_model_file, chunks,
+                            block_size=block_size)
+
+    assert [n for n, _ in arrays] == [n for n, _ in expected]
+
+    source_chunks = (3, 3, 1) if chunks == 3 else (7,)
+    computed = da.compute(*(a for _, a in arrays))
+
+    for (name, array), values, (_, expected_values) in zip(arrays, computed,
+                                                           expected):
+        assert array.chunks[0] == source_chunks
+        assert array.shape == expected_values.shape
+        # String columns are not truncated to the width of a chunk
+        assert array.dtype == expected_values.dtype
+        assert values.dtype == expected_values.dtype
+        assert np.array_equal(values, expected_values)
+
+
+def test_cached_wsclean_model_file(wsclean_model_file, tmpdir, monkeypatch):
+    from africanus.model.wsclean import file_cache
+    from africanus.model.wsclean.file_cache import cached_load
+
+    cache_dir = str(tmpdir.join("cache"))
+    expected = list(load(wsclean_model_file))
+    sources = cached_load(wsclean_model_file, cache_dir=cache_dir)
+
+    assert [n for n, _ in sources] == [n for n, _ in expected]
+
+    for (name, values), (_, expected_values) in zip(sources, expected):
+        assert isinstance(values, np.memmap)
+
+        if name == "SpectralIndex":
+            assert values.shape == (7, 2)
+            assert np.all(values == np.asarray(expected_values))
+        else:
+            assert values.tolist() == expected_values
+
+    # Subsequent loads don't parse the file
+    def fail(filename):
+        raise AssertionError("File parsed")
+
+    monkeypatch.setattr(file_cache, "load_arrays", fail)
+    sources = dict(cached_load(wsclean_model_file, cache_dir=cache_dir))
+    assert sources["Name"][0] == "s0c0"
+
+    # Touching the file with unchanged contents reuses the entry
+    stat = os.stat(wsclean_model_file)
+    os.utime(wsclean_model_file, ns=(stat.st_atime_ns,
+                                     stat.st_mtime_ns + 10**9))
+    sources = dict(cached_load(wsclean_model_file, cache_dir=cache_dir))
+    assert sources["Name"].shape == (7,)
+
+    # Changed contents invalidate the entry
+    with open(wsclean_model_file, "r") as f:
+        lines = f.readlines()
+
+    with open(wsclean_model_file, "w") as f:
+        f.writelines(lines[:-1])
+
+    with pytest.raises(AssertionError, match="File parsed"):
+        cached_load(wsclean_model_file, cache_dir=cache_dir)
+
+    monkeypatch.undo()
+    sources = dict(cached_load(wsclean_model_file, cache_dir=cache_dir,
+                               mmap_mode=None))
+    assert sources["Name"].tolist() == [
+        "s0c0", "s0c1", "s0c2", "s0c3", "s1c0", "s1c1"]
+    assert not isinstance(sources["I"], np.memmap)
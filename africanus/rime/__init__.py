@@ -2,9 +2,22 @@
 
 from africanus.rime.phase import phase_delay
 from africanus.rime.feeds import feed_rotation
-from africanus.rime.fast_beam_cubes import beam_cube_dde
+from africanus.rime.fast_beam_cubes import (beam_cube_dde,
+                                            parallel_beam_cube_dde,
+                                            beam_sampling_plan,
+                                            BeamSamplingPlan,
+                                            cached_beam_cube_dde,
+                                            transformed_beam_cube_dde,
+                                            BeamAngleCache)
 from africanus.rime.parangles import parallactic_angles
-from africanus.rime.transform import transform_sources
-from africanus.rime.zernike import zernike_dde
-from africanus.rime.predict import predict_vis, apply_gains
-from africanus.rime.wsclean_predict import wsclean_predict
+from africanus.rime.transform import (transform_sources,
+                                      compact_transform_sources,
+                                      SourceCoords)
+from africanus.rime.zernike import (zernike_dde,
+                                    zernike_table,
+                                    ZernikeTable)
+from africanus.rime.predict import (predict_vis, parallel_predict_vis,
+                                     apply_gains)
+from africanus.rime.wsclean_predict import (wsclean_predict,
+                                            parallel_wsclean_predict)
+from africanus.rime.fused_predict import fused_predict
@@ -2,14 +2,21 @@
 
 
 from africanus.rime.phase import (phase_delay as np_phase_delay,
-                                  PHASE_DELAY_DOCS)
+                                  PHASE_DELAY_DOCS,
+                                  RECURRENCE_ANCHOR_INTERVAL)
 from africanus.rime.parangles import parallactic_angles as np_parangles
 from africanus.rime.feeds import feed_rotation as np_feed_rotation
 from africanus.rime.feeds import FEED_ROTATION_DOCS
 from africanus.rime.transform import transform_sources as np_transform_sources
-from africanus.rime.fast_beam_cubes import (beam_cube_dde as np_beam_cube_dde,
-                                            BEAM_CUBE_DOCS)
+from africanus.rime.fast_beam_cubes import (
+                                beam_cube_dde as np_beam_cube_dde,
+                                parallel_beam_cube_dde as
+                                np_parallel_beam_cube_dde,
+                                BeamSamplingPlan,
+                                BEAM_CUBE_DOCS)
 from africanus.rime.dask_predict import predict_vis, wsclean_predict  # noqa
+from africanus.rime.fused_predict import (fused_predict as np_fused_predict,
+                                          FUSED_PREDICT_DOCS)
 from africanus.rime.zernike import zernike_dde as np_zernike_dde
 
 
@@ -27,18 +34,28 @@ else:
     da_import_error = None
 
 
-def _phase_delay_wrap(lm, uvw, frequency, convention):
-    return np_phase_delay(lm[0], uvw[0], frequency, convention=convention)
+def _phase_delay_wrap(lm, uvw, frequency, convention,
+                      recurrence, anchor_interval, accumulate_dtype):
+    return np_phase_delay(lm[0], uvw[0], frequency, convention=convention,
+                          recurrence=recurrence,
+                          anchor_interval=anchor_interval,
+                          accumulate_dtype=accumulate_dtype)
 
 
 @requires_optional('dask.array', da_import_error)
-def phase_delay(lm, uvw, frequency, convention='fourier'):
+def phase_delay(lm, uvw, frequency, convention='fourier',
+                recurrence=False,
+                anchor_interval=RECURRENCE_ANCHOR_INTERVAL,
+                accumulate_dtype=None):
     """ Dask wrapper for phase_delay function """
     return da.core.blockwise(_phase_delay_wrap, ("source", "row", "chan"),
                              lm, ("source", "(l,m)"),
                              uvw, ("row", "(u,v,w)"),
                              frequency, ("chan",),
                              convention=convention,
+                             recurrence=recurrence,
+                             anchor_interval=anchor_interval,
+                             accumulate_dtype=accumulate_dtype,
                              dtype=infer_complex_dtype(lm, uvw, frequency))
 
 
@@ -107,18 +124,27 @@ def transform_sources(lm, parallactic_angles, pointing_errors,
 def _beam_cube_dde_wrapper(beam, beam_lm_extents, beam_freq_map,
                            lm, parallactic_angles,
                            point_errors, antenna_scaling,
-                           frequencies):
-    return np_beam_cube_dde(beam[0][0][0], beam_lm_extents[0][0],
-                            beam_freq_map[0], lm[0],
-                            parallactic_angles, point_errors[0],
-                            antenna_scaling[0], frequencies)
+                           frequencies, parallel,
+                           freq_data, lm_scale, accumulate_dtype):
+    fn = np_parallel_beam_cube_dde if parallel else np_beam_cube_dde
+
+    # freq_data loses the "freq-data" dim
+    plan = (None if freq_data is None else
+            BeamSamplingPlan(freq_data[0], lm_scale))
+
+    return fn(beam[0][0][0], beam_lm_extents[0][0],
+              beam_freq_map[0], lm[0],
+              parallactic_angles, point_errors[0],
+              antenna_scaling[0], frequencies, plan,
+              accumulate_dtype)
 
 
 @requires_optional('dask.array', da_import_error)
 def beam_cube_dde(beam, beam_lm_extents, beam_freq_map,
                   lm, parallactic_angles,
                   point_errors, antenna_scaling,
-                  frequencies):
+                  frequencies, parallel=False, plan=None,
+                  accumulate_dtype=None):
 
     if not all(len(c) == 1 for c in beam.chunks):
         raise ValueError("Beam chunking unsupported")
@@ -129,6 +155,14 @@ def beam_cube_dde(beam, beam_lm_extents, beam_freq_map,
     if not all(len(c) == 1 for c in beam_lm_extents.chunks):
         raise ValueError("Chunking of beam_lm_extents unsupported")
 
+    if plan is None:
+        freq_data = lm_scale = None
+    else:
+        # Split the plan's frequency data into channel chunks
+        freq_data = da.asarray(plan.freq_data)
+        freq_data = freq_data.rechunk((frequencies.chunks[0], 3))
+        lm_scale = np.asarray(plan.lm_scale)
+
     corr_shapes = beam.shape[3:]
     corr_dims = tuple("corr-%d" % i for i in range(len(corr_shapes)))
 
@@ -144,18 +178,24 @@ def beam_cube_dde(beam, beam_lm_extents, beam_freq_map,
                              point_errors, ("time", "ant", "chan", "pt-comp"),
                              antenna_scaling, ("ant", "chan", "scale-comp"),
                              frequencies, ("chan",),
+                             parallel, None,
+                             freq_data, (None if freq_data is None
+                                         else ("chan", "freq-data")),
+                             lm_scale, None,
+                             accumulate_dtype, None,
                              dtype=beam.dtype)
 
 
-def _zernike_wrapper(coords, coeffs, noll_index):
+def _zernike_wrapper(coords, coeffs, noll_index, parallel):
     # coords loses "three" dim
     # coeffs loses "poly" dim
     # noll_index loses "poly" dim
-    return np_zernike_dde(coords[0], coeffs[0], noll_index[0])
+    return np_zernike_dde(coords[0], coeffs[0], noll_index[0],
+                          parallel=parallel)
 
 
 @requires_optional('dask.array', da_import_error)
-def zernike_dde(coords, coeffs, noll_index):
+def zernike_dde(coords, coeffs, noll_index, parallel=False):
     ncorrs = len(coeffs.shape[2:-1])
     corr_dims = tuple("corr-%d" % i for i in range(ncorrs))
 
@@ -167,9 +207,58 @@ def zernike_dde(coords, coeffs, noll_index):
                              ("ant", "chan") + corr_dims + ("poly",),
                              noll_index,
                              ("ant", "chan") + corr_dims + ("poly",),
+                             parallel, None,
                              dtype=coeffs.dtype)
 
 
+def _fused_predict_wrap(lm, uvw, frequency, stokes, spi, ref_freq,
+                        base, stokes_schema, corr_schema, convention):
+    # lm loses "(l,m)" dim
+    # uvw loses "(u,v,w)" dim
+    # stokes loses "pol" dim
+    # spi loses "spi-comp" and "pol" dims
+    vis = np_fused_predict(lm[0], uvw[0], frequency, stokes[0], spi[0][0],
+                           ref_freq, base=base,
+                           stokes_schema=stokes_schema,
+                           corr_schema=corr_schema,
+                           convention=convention)
+    # Reintroduce the source dimension
+    return vis[None, ...]
+
+
+@requires_optional('dask.array', da_import_error)
+def fused_predict(lm, uvw, frequency, stokes, spi, ref_freq,
+                  base=0, stokes_schema=("I", "Q", "U", "V"),
+                  corr_schema=(("XX", "XY"), ("YX", "YY")),
+                  convention='fourier'):
+    corr_shape = np.asarray(corr_schema).shape
+    corr_dims = tuple("corr-%d" % i for i in range(len(corr_shape)))
+
+    out_dtype = np.result_type(np.complex64, lm.dtype, uvw.dtype,
+                               frequency.dtype, stokes.dtype,
+                               spi.dtype, ref_freq.dtype)
+
+    # Each block holds the visibilities of a single source chunk
+    vis = da.core.blockwise(_fused_predict_wrap,
+                            ("source", "row", "chan") + corr_dims,
+                            lm, ("source", "(l,m)"),
+                            uvw, ("row", "(u,v,w)"),
+                            frequency, ("chan",),
+                            stokes, ("source", "pol"),
+                            spi, ("source", "spi-comp", "pol"),
+                            ref_freq, ("source",),
+                            base=base,
+                            stokes_schema=stokes_schema,
+                            corr_schema=corr_schema,
+                            convention=convention,
+                            adjust_chunks={"source": 1},
+                            new_axes=dict(zip(corr_dims, corr_shape)),
+                            dtype=out_dtype)
+
+    # Sum over source chunks
+    return vis.sum(axis=0)
+
+
 try:
     phase_delay.__doc__ = PHASE_DELAY_DOCS.substitute(
                             array_type=":class:`dask.array.Array`")
@@ -196,9 +285,31 @@ try:
 except AttributeError:
     pass
 
+BEAM_CUBE_DASK_ARGS = """
+    frequency : :class:`dask.array.Array`
+        Frequencies of shape :code:`(chan,)`.
+    parallel : bool, optional
+        If True, each chunk is interpolated with
+        :func:`~africanus.rime.fast_beam_cubes.parallel_beam_cube_dde`,
+        splitting its time and antenna dimensions across threads.
+        Defaults to False.
+    plan : :class:`~africanus.rime.fast_beam_cubes.BeamSamplingPlan`, optional
+        Sampling plan produced by
+        :func:`~africanus.rime.fast_beam_cubes.beam_sampling_plan`
+        for this beam and the full ``frequency`` array.
+        It is split into the channel chunks of ``frequency``.
+    accumulate_dtype : {np.complex64, np.complex128}, optional
+        Complex dtype in which interpolated beam values
+        are summed and normalised.
+        Defaults to the beam dtype.
+"""
+
 try:
-    beam_cube_dde.__doc__ = BEAM_CUBE_DOCS.substitute(
-                                array_type=":class:`dask.array.Array`")
+    beam_cube_dde.__doc__ = mod_docs(
+        BEAM_CUBE_DOCS.substitute(array_type=":class:`dask.array.Array`"),
+        [("\n    frequency : :class:`dask.array.Array`\n"
+          "        Frequencies of shape :code:`(chan,)`.\n",
+          BEAM_CUBE_DASK_ARGS)])
 except AttributeError:
     pass
 
@@ -208,3 +319,9 @@ try:
                                      ":class:`dask.array.Array`")])
 except AttributeError:
     pass
+
+try:
+    fused_predict.__doc__ = FUSED_PREDICT_DOCS.substitute(
+                                array_type=":class:`dask.array.Array`")
+except AttributeError:
+    pass
@@ -2,7 +2,7 @@
 
 from functools import reduce
 from itertools import product
-from operator import mul
+from operator import add, mul
 
 try:
     from collections.abc import Mapping
@@ -169,10 +169,182 @@ class LinearReduction(Mapping):
         return {k: v for k, v in d.items() if k in self.output_indices}
 
 
-def linear_reduction(time_index, antenna1, antenna2,
-                     dde1_jones, source_coh, dde2_jones,
-                     predict_check_tup, out_dtype):
+def _tree_leaf(barrier, func, *args):
+    """
+    Calls ``func`` with ``args``. ``barrier`` is the result
+    of the previous reduction group and is ignored, but
+    forces the previous group to complete before this leaf runs.
+    """
+    return func(*args)
+
+
+def _tree_sum(arrays):
+    return reduce(add, arrays)
+
 
+class TreeReduction(Mapping):
+    """
+    k-ary tree reduction of ``func`` over the blocks of ``axis``.
+
+    The blocks of ``axis`` are divided into groups of ``max_inflight``
+    blocks. Within a group, ``func`` is called on each block in parallel
+    and the results are summed ``split_every`` at a time.
+    Each group's sum is added to the previous group's sum and
+    the blocks of a group only start once the previous group
+    has been summed. At most ``max_inflight`` results
+    of ``func`` and the previous group's sum are
+    therefore held in memory at any point.
+
+    ``max_inflight=1`` and ``split_every=2`` produces a linear chain,
+    while ``max_inflight`` equal to the number of blocks produces
+    a fully parallel tree reduction.
+    """
+    def __init__(
+        self,
+        func,
+        output_indices,
+        indices,
+        numblocks,
+        axis=None,
+        split_every=2,
+        max_inflight=None,
+    ):
+        self.func = func
+        self.output_indices = tuple(output_indices)
+        self.indices = tuple((name, tuple(ind) if ind is not None else ind)
+                             for name, ind in indices)
+        self.numblocks = numblocks
+
+        if axis is None:
+            raise ValueError("axis not set")
+
+        if axis in self.output_indices:
+            raise ValueError("axis in output_indices")
+
+        if split_every < 2:
+            raise ValueError("split_every %d < 2" % split_every)
+
+        if max_inflight is not None and max_inflight < 1:
+            raise ValueError("max_inflight %d < 1" % max_inflight)
+
+        self.axis = axis
+        self.split_every = split_every
+        self.max_inflight = max_inflight
+
+        token = tokenize(self.func,
+                         self.output_indices,
+                         self.indices,
+                         self.numblocks,
+                         self.axis,
+                         self.split_every,
+                         self.max_inflight)
+
+        self.func_name = funcname(self.func)
+        self.name = "-".join((self.func_name, "tree", token))
+
+    @property
+    def _dict(self):
+        if hasattr(self, "_cached_dict"):
+            return self._cached_dict
+
+        # Reduction axis
+        ax = self.axis
+
+        # Number of blocks for each dimension, derived from the input
+        dim_blocks = db.broadcast_dimensions(self.indices, self.numblocks)
+        nblocks = dim_blocks[ax]
+        max_inflight = self.max_inflight or nblocks
+        split_every = self.split_every
+
+        out_dims = (ax,) + self.output_indices
+        dim_map = {k: i for i, k in enumerate(out_dims)}
+
+        dsk = {}
+        leaf_name = "-".join((self.func_name, "leaf", tokenize(self.name)))
+        int_name = "-".join((self.func_name,
+                             "intermediate",
+                             tokenize(self.name)))
+
+        groups = [range(g, min(g + max_inflight, nblocks))
+                  for g in range(0, nblocks, max_inflight)]
+
+        # Iterate over the output keys creating associated tasks
+        for out_ind in product(*[range(dim_blocks[d])
+                                 for d in self.output_indices]):
+            out_key = (self.name,) + out_ind
+            prev_key = None
+
+            for g, group in enumerate(groups):
+                keys = []
+
+                for b in group:
+                    task = [_tree_leaf, prev_key, self.func]
+                    in_ind = (b,) + out_ind
+
+                    for arg, ind in self.indices:
+                        if ind is None:
+                            # Literal arg, embed
+                            task.append(arg)
+                        else:
+                            # Derive input key from output key indices
+                            task.append(tuple(_ind_map(arg, ind, in_ind,
+                                                       dim_map, dim_blocks)))
+
+                    key = (leaf_name, b) + out_ind
+                    dsk[key] = tuple(task)
+                    keys.append(key)
+
+                # Sum the previous group into this group
+                if prev_key is not None:
+                    keys.append(prev_key)
+
+                last_group = g == len(groups) - 1
+                depth = 0
+
+                # Sum split_every keys at a time
+                while len(keys) > 1:
+                    new_keys = []
+                    last_level = len(keys) <= split_every
+
+                    for i in range(0, len(keys), split_every):
+                        if last_level and last_group:
+                            key = out_key
+                        else:
+                            key = (int_name, g, depth, i) + out_ind
+
+                        dsk[key] = (_tree_sum, keys[i:i + split_every])
+                        new_keys.append(key)
+
+                    keys = new_keys
+                    depth += 1
+
+                prev_key = keys[0]
+
+            # A single block was not summed, alias the output to it
+            if prev_key != out_key:
+                dsk[out_key] = prev_key
+
+        self._cached_dict = dsk
+
+        return self._cached_dict
+
+    def __getitem__(self, key):
+        return self._dict[key]
+
+    def __iter__(self):
+        return iter(self._dict)
+
+    def __len__(self):
+        return len(self._dict)
+
+
+def _source_reduction(reduction_type, time_index, antenna1, antenna2,
+                      dde1_jones, source_coh, dde2_jones,
+                      predict_check_tup, out_dtype, **kwargs):
+    """
+    Reduces :func:`~africanus.rime.predict_vis` over source chunks
+    with the ``reduction_type`` graph, constructed with ``kwargs``
+    """
     (have_ddes1, have_coh, have_ddes2,
      have_dies1, have_bvis, have_dies2) = predict_check_tup
 
@@ -203,13 +375,13 @@ def linear_reduction(time_index, antenna1, antenna2,
                  for a, i in args
                  if a is not None}
 
-    lr = LinearReduction(np_predict_vis, ("row", "chan") + cdims,
-                         name_args,
-                         numblocks=numblocks,
-                         feed_index=7,
-                         axis='source')
+    reduction = reduction_type(np_predict_vis, ("row", "chan") + cdims,
+                               name_args,
+                               numblocks=numblocks,
+                               axis='source',
+                               **kwargs)
 
-    graph = HighLevelGraph.from_collections(lr.name, lr,
+    graph = HighLevelGraph.from_collections(reduction.name, reduction,
                                             [a for a, i in args
                                              if a is not None])
 
@@ -219,7 +391,37 @@ def linear_reduction(time_index, antenna1, antenna2,
     chunk_map['row'] = time_index.chunks[0]  # Override
 
     chunks = tuple(chunk_map[d] for d in ('row', 'chan') + cdims)
-    return da.Array(graph, lr.name, chunks, dtype=out_dtype)
+    return da.Array(graph, reduction.name, chunks, dtype=out_dtype)
+
+
+def linear_reduction(time_index, antenna1, antenna2,
+                     dde1_jones, source_coh, dde2_jones,
+                     predict_check_tup, out_dtype):
+    """
+    Does a linear reduction over source coherencies,
+    feeding each source chunk's result into the next
+    """
+    return _source_reduction(LinearReduction, time_index,
+                             antenna1, antenna2,
+                             dde1_jones, source_coh, dde2_jones,
+                             predict_check_tup, out_dtype,
+                             feed_index=7)
+
+
+def tree_reduction(time_index, antenna1, antenna2,
+                   dde1_jones, source_coh, dde2_jones,
+                   predict_check_tup, out_dtype,
+                   split_every=2, max_inflight=None):
+    """
+    Does a k-ary tree reduction over source coherencies,
+    with at most ``max_inflight`` source chunks in memory
+    """
+    return _source_reduction(TreeReduction, time_index,
+                             antenna1, antenna2,
+                             dde1_jones, source_coh, dde2_jones,
+                             predict_check_tup, out_dtype,
+                             split_every=split_every,
+                             max_inflight=max_inflight)
 
 
 def _predict_coh_wrapper(time_index, antenna1, antenna2,
@@ -355,7 +557,7 @@ def apply_dies(time_index, antenna1, antenna2,
 def predict_vis(time_index, antenna1, antenna2,
                 dde1_jones=None, source_coh=None, dde2_jones=None,
                 die1_jones=None, base_vis=None, die2_jones=None,
-                streams=None):
+                streams=None, split_every=None, max_inflight=None):
 
     predict_check_tup = predict_checks(time_index, antenna1, antenna2,
                                        dde1_jones, source_coh, dde2_jones,
@@ -422,6 +624,20 @@ def predict_vis(time_index, antenna1, antenna2,
                                                dde2_jones,
                                                predict_check_tup,
                                                out_dtype)
+        elif split_every is not None or max_inflight is not None:
+            if split_every is None:
+                split_every = 2
+
+            sum_coherencies = tree_reduction(time_index,
+                                             antenna1,
+                                             antenna2,
+                                             dde1_jones,
+                                             source_coh,
+                                             dde2_jones,
+                                             predict_check_tup,
+                                             out_dtype,
+                                             split_every=split_every,
+                                             max_inflight=max_inflight)
         else:
             sum_coherencies = parallel_reduction(time_index,
                                                  antenna1,
@@ -503,6 +719,20 @@ EXTRA_DASK_ARGS = """
 streams : {False, True}
     If ``True`` the coherencies are serially summed in a linear chain.
     If ``False``, dask uses a tree style reduction algorithm.
+split_every : int, optional
+    If set, the coherencies of ``split_every`` source chunks are
+    summed at a time in a k-ary tree reduction.
+    Defaults to 2 if only ``max_inflight`` is set.
+    Ignored if ``streams`` is ``True``.
+max_inflight : int, optional
+    If set, at most ``max_inflight`` source chunks are
+    reduced concurrently in a k-ary tree reduction.
+    Groups of ``max_inflight`` source chunks are reduced in turn,
+    bounding peak memory to roughly ``max_inflight``
+    :code:`(row, chan, corr_1, corr_2)` chunks per output chunk.
+    ``max_inflight=1`` is equivalent to ``streams=True``, while
+    leaving it unset reduces all source chunks in parallel.
+    Ignored if ``streams`` is ``True``.
 """
 
 EXTRA_DASK_NOTES = """
@@ -578,4 +808,5 @@ except AttributeError:
     pass
 
 wsclean_predict.__doc__ = WSCLEAN_PREDICT_DOCS.substitute(
-                            array_type=":class:`dask.array.Array`")
+                            array_type=":class:`dask.array.Array`",
+                            extra_args="")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Compares the throughput and accuracy of the exact :func:`phase_delay`
+kernel with the phasor recurrence enabled by ``recurrence=True``,
+for several anchor intervals.
+
+.. code-block:: bash
+
+    $ python benchmark_phase_delay.py
+    $ python benchmark_phase_delay.py -ns 100 -nr 10000 -nc 4096 \\
+        -a 1 4 16 64 256 --dtype float32
+
+Accuracy is reported as the maximum absolute error of the
+recurrence phasors relative to the exact kernel.
+"""
+
+import argparse
+from collections import namedtuple
+from timeit import default_timer as timer
+
+import numpy as np
+
+from africanus.rime.phase import phase_delay
+
+
+Result = namedtuple("Result", ["anchor_interval", "time", "max_error"])
+
+
+def create_parser():
+    p = argparse.ArgumentParser()
+    p.add_argument("-ns", "--sources", type=int, default=10)
+    p.add_argument("-nr", "--rows", type=int, default=10000)
+    p.add_argument("-nc", "--channels", type=int, default=1024)
+    p.add_argument("-a", "--anchor-intervals", type=int, nargs="+",
+                   default=[4, 16, 64, 256])
+    p.add_argument("--dtype", choices=["float32", "float64"],
+                   default="float64")
+    p.add_argument("-r", "--repeats", type=int, default=3)
+    return p
+
+
+def synthesise(args):
+    rs = np.random.RandomState(42)
+    dtype = np.dtype(args.dtype)
+
+    # Sources within a degree of the phase centre
+    # and MeerKAT-like baseline lengths
+    lm = (rs.random_sample((args.sources, 2)) - 0.5)*np.deg2rad(2.0)
+    uvw = (rs.random_sample((args.rows, 3)) - 0.5)*8e3
+    frequency = np.linspace(.856e9, 2*.856e9, args.channels)
+
+    return (lm.astype(dtype), uvw.astype(dtype), frequency.astype(dtype))
+
+
+def benchmark(args, fn):
+    timings = []
+
+    for _ in range(args.repeats):
+        start = timer()
+        result = fn()
+        timings.append(timer() - start)
+
+    return result, min(timings)
+
+
+def main(argv=None):
+    args = create_parser().parse_args(argv)
+    lm, uvw, frequency = synthesise(args)
+
+    # Compile kernels on a small problem
+    phase_delay(lm[:1], uvw[:1], frequency[:2])
+    phase_delay(lm[:1], uvw[:1], frequency[:2], recurrence=True)
+
+    print("%d sources, %d rows, %d channels, %s" %
+          (args.sources, args.rows, args.channels, args.dtype))
+    print("%-16s %11s %8s %12s" % ("Kernel", "Time", "Speedup",
+                                   "Max Error"))
+
+    exact, exact_time = benchmark(args, lambda: phase_delay(lm, uvw,
+                                                            frequency))
+    print("%-16s %10.4fs %7.2fx %12.3e" % ("exact", exact_time, 1.0, 0.0))
+
+    results = [Result(None, exact_time, 0.0)]
+
+    for anchor in args.anchor_intervals:
+        fast, time = benchmark(args, lambda: phase_delay(
+                                    lm, uvw, frequency, recurrence=True,
+                                    anchor_interval=anchor))
+        error = np.abs(fast - exact).max()
+        print("%-16s %10.4fs %7.2fx %12.3e" % (
+            "anchor=%d" % anchor, time, exact_time / time, error))
+
+        results.append(Result(anchor, time, error))
+
+    return results
+
+
+if __name__ == "__main__":
+    main()
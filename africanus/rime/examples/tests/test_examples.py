@@ -8,3 +8,14 @@ def test_examples():
 
     # TODO(sjperkins)
     # Call with a fake MS once pytest-ms is available
+
+
+def test_benchmark_phase_delay():
+    from africanus.rime.examples.benchmark_phase_delay import main
+
+    results = main(["-ns", "2", "-nr", "10", "-nc", "32",
+                    "-a", "1", "8", "-r", "1"])
+
+    assert [r.anchor_interval for r in results] == [None, 1, 8]
+    assert results[1].max_error == 0.0
+    assert all(r.max_error < 1e-8 for r in results)
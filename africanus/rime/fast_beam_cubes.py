@@ -1,10 +1,15 @@
 # -*- coding: utf-8 -*-
 
+from collections import OrderedDict, namedtuple
 from functools import reduce
+import hashlib
+from threading import Lock
 
+import numba
 import numpy as np
-from africanus.util.docs import DocstringTemplate
-from africanus.util.numba import njit
+from africanus.util.docs import DocstringTemplate, mod_docs
+from africanus.util.numba import generated_jit, njit
+from africanus.util.type_inference import infer_dtype_arg
 
 
 @njit(nogil=True, cache=True)
@@ -55,55 +60,218 @@ def freq_grid_interp(frequency, beam_freq_map):
     return freq_data
 
 
-@njit(nogil=True, cache=True)
-def beam_cube_dde(beam, beam_lm_extents, beam_freq_map,
-                  lm, parallactic_angles, point_errors, antenna_scaling,
-                  frequency):
+@njit(nogil=True, inline='always')
+def _interpolate_beam(fbeam, vl, vm, gc0, nud, cube,
+                      corr_sum, absc_sum, beam_scratch):
+    """
+    Trilinearly interpolates the flattened beam cube ``fbeam``
+    at lm coordinate ``(vl, vm)`` between the beam frequency
+    planes ``gc0`` and ``gc0 + 1``, weighted by ``nud`` and ``1 - nud``,
+    storing the normalised correlations in ``corr_sum``.
+    ``cube`` holds the lm extents, scaling and grid limits.
+    """
+    (lower_l, lower_m, lscale, mscale,
+     lmaxf, mmaxf, lmaxi, mmaxi, zero, one) = cube
+    ncorrs = corr_sum.shape[0]
+    gc1 = gc0 + 1
+    inv_nud = 1.0 - nud
 
-    nsrc = lm.shape[0]
-    ntime, nants = parallactic_angles.shape
-    nchan = frequency.shape[0]
-    beam_lw, beam_mh, beam_nud = beam.shape[:3]
-    corrs = beam.shape[3:]
+    # Shift into the cube coordinate system
+    vl = lscale*(vl - lower_l)
+    vm = mscale*(vm - lower_m)
 
-    if beam_lw < 2 or beam_mh < 2 or beam_nud < 2:
-        raise ValueError("beam_lw, beam_mh and beam_nud must be >= 2")
+    # Clamp the coordinates to the edges of the cube
+    vl = max(zero, min(vl, lmaxf))
+    vm = max(zero, min(vm, mmaxf))
 
-    # Flatten correlations
-    ncorrs = reduce(lambda x, y: x*y, corrs, 1)
+    # Snap to the lower grid coordinates
+    gl0 = np.int32(np.floor(vl))
+    gm0 = np.int32(np.floor(vm))
 
-    lower_l, upper_l = beam_lm_extents[0]
-    lower_m, upper_m = beam_lm_extents[1]
+    # Snap to the upper grid coordinates
+    gl1 = min(gl0 + 1, lmaxi)
+    gm1 = min(gm0 + 1, mmaxi)
 
-    ex_dtype = beam_lm_extents.dtype
+    # Difference between grid and offset coordinates
+    ld = vl - gl0
+    md = vm - gm0
 
-    # Maximum l and m indices in float and int
-    lmaxf = ex_dtype.type(beam_lw - 1)
-    mmaxf = ex_dtype.type(beam_mh - 1)
-    lmaxi = beam_lw - 1
-    mmaxi = beam_mh - 1
+    # Zero accumulation arrays
+    corr_sum[:] = 0
+    absc_sum[:] = 0
 
-    lscale = lmaxf / (upper_l - lower_l)
-    mscale = mmaxf / (upper_m - lower_m)
+    # Accumulate lower cube correlations
+    beam_scratch[:] = fbeam[gl0, gm0, gc0, :]
+    weight = (one - ld)*(one - md)*nud
 
-    one = ex_dtype.type(1)
-    zero = ex_dtype.type(0)
+    for c in range(ncorrs):
+        absc_sum[c] += weight * np.abs(beam_scratch[c])
+        corr_sum[c] += weight * beam_scratch[c]
 
-    # Flatten the beam on correlation
-    fbeam = beam.reshape((beam_lw, beam_mh, beam_nud, ncorrs))
+    beam_scratch[:] = fbeam[gl1, gm0, gc0, :]
+    weight = ld*(one - md)*nud
 
-    # Allocate output array with correlations flattened
-    fjones = np.empty((nsrc, ntime, nants, nchan, ncorrs), dtype=beam.dtype)
+    for c in range(ncorrs):
+        absc_sum[c] += weight * np.abs(beam_scratch[c])
+        corr_sum[c] += weight * beam_scratch[c]
 
-    # Compute frequency interpolation stuff
-    freq_data = freq_grid_interp(frequency, beam_freq_map)
+    beam_scratch[:] = fbeam[gl0, gm1, gc0, :]
+    weight = (one - ld)*md*nud
 
-    corr_sum = np.zeros((ncorrs,), dtype=beam.dtype)
-    absc_sum = np.zeros((ncorrs,), dtype=beam.real.dtype)
-    beam_scratch = np.zeros((ncorrs,), dtype=beam.dtype)
+    for c in range(ncorrs):
+        absc_sum[c] += weight * np.abs(beam_scratch[c])
+        corr_sum[c] += weight * beam_scratch[c]
+
+    beam_scratch[:] = fbeam[gl1, gm1, gc0, :]
+    weight = ld*md*nud
+
+    for c in range(ncorrs):
+        absc_sum[c] += weight * np.abs(beam_scratch[c])
+        corr_sum[c] += weight * beam_scratch[c]
+
+    # Accumulate upper cube correlations
+    beam_scratch[:] = fbeam[gl0, gm0, gc1, :]
+    weight = (one - ld)*(one - md)*inv_nud
+
+    for c in range(ncorrs):
+        absc_sum[c] += weight * np.abs(beam_scratch[c])
+        corr_sum[c] += weight * beam_scratch[c]
+
+    beam_scratch[:] = fbeam[gl1, gm0, gc1, :]
+    weight = ld*(one - md)*inv_nud
+
+    for c in range(ncorrs):
+        absc_sum[c] += weight * np.abs(beam_scratch[c])
+        corr_sum[c] += weight * beam_scratch[c]
+
+    beam_scratch[:] = fbeam[gl0, gm1, gc1, :]
+    weight = (one - ld)*md*inv_nud
+
+    for c in range(ncorrs):
+        absc_sum[c] += weight * np.abs(beam_scratch[c])
+        corr_sum[c] += weight * beam_scratch[c]
+
+    beam_scratch[:] = fbeam[gl1, gm1, gc1, :]
+    weight = ld*md*inv_nud
+
+    for c in range(ncorrs):
+        absc_sum[c] += weight * np.abs(beam_scratch[c])
+        corr_sum[c] += weight * beam_scratch[c]
+
+    for c in range(ncorrs):
+        # Added all correlations, normalise
+        div = np.abs(corr_sum[c])
+
+        if div == 0.0:
+            # This case probably works out to a zero assign
+            corr_sum[c] *= absc_sum[c]
+        else:
+            corr_sum[c] *= absc_sum[c] / div
+
+
+@generated_jit(nopython=True, nogil=True, cache=True)
+def _beam_accumulators(ncorrs, beam, accumulate_dtype):
+    """
+    Returns complex and absolute value accumulators in
+    ``accumulate_dtype``, or the beam dtype if None
+    """
+    acc_dtype = infer_dtype_arg(accumulate_dtype)
+
+    if acc_dtype is None:
+        acc_dtype = np.dtype(beam.dtype.name)
+    elif acc_dtype.kind != 'c':
+        raise TypeError("accumulate_dtype %s is not complex" % acc_dtype)
+
+    abs_dtype = np.empty(0, dtype=acc_dtype).real.dtype
+
+    def impl(ncorrs, beam, accumulate_dtype):
+        return (np.zeros((ncorrs,), dtype=acc_dtype),
+                np.zeros((ncorrs,), dtype=abs_dtype))
+
+    return impl
+
+
+def beam_cube_dde_factory(parallel):
+    """
+    Factory function returning a beam cube interpolation function.
+    If ``parallel`` is True, the time and antenna
+    dimensions are split across threads.
+    """
+    @njit(nogil=True, cache=True, parallel=parallel)
+    def impl(beam, beam_lm_extents, beam_freq_map,
+             lm, parallactic_angles, point_errors, antenna_scaling,
+             frequency, plan=None, accumulate_dtype=None):
+
+        nsrc = lm.shape[0]
+        ntime, nants = parallactic_angles.shape
+        nchan = frequency.shape[0]
+        beam_lw, beam_mh, beam_nud = beam.shape[:3]
+        corrs = beam.shape[3:]
+
+        if beam_lw < 2 or beam_mh < 2 or beam_nud < 2:
+            raise ValueError("beam_lw, beam_mh and beam_nud must be >= 2")
+
+        # Flatten correlations
+        ncorrs = beam.size // (beam_lw*beam_mh*beam_nud)
+
+        lower_l, upper_l = beam_lm_extents[0]
+        lower_m, upper_m = beam_lm_extents[1]
+
+        ex_dtype = beam_lm_extents.dtype
+
+        # Maximum l and m indices in float and int
+        lmaxf = ex_dtype.type(beam_lw - 1)
+        mmaxf = ex_dtype.type(beam_mh - 1)
+        lmaxi = beam_lw - 1
+        mmaxi = beam_mh - 1
+
+        one = ex_dtype.type(1)
+        zero = ex_dtype.type(0)
+
+        # Flatten the beam on correlation
+        fbeam = beam.reshape((beam_lw, beam_mh, beam_nud, ncorrs))
+
+        # Allocate output array with correlations flattened
+        fjones = np.empty((nsrc, ntime, nants, nchan, ncorrs),
+                          dtype=beam.dtype)
+
+        if plan is None:
+            lscale = lmaxf / (upper_l - lower_l)
+            mscale = mmaxf / (upper_m - lower_m)
+
+            # Compute frequency interpolation stuff
+            freq_data = freq_grid_interp(frequency, beam_freq_map)
+        else:
+            # Reuse the precomputed sampling plan
+            lscale = plan.lm_scale[0]
+            mscale = plan.lm_scale[1]
+            freq_data = plan.freq_data
+
+            if freq_data.shape[0] != nchan:
+                raise ValueError("Number of plan and frequency "
+                                 "channels differ")
+
+        cube = (lower_l, lower_m, lscale, mscale,
+                lmaxf, mmaxf, lmaxi, mmaxi, zero, one)
+
+        # Referencing parallel places it in the closure, which keys the
+        # numba cache, unlike the parallel compilation option
+        if not parallel:
+            # Scratch buffers shared by all (time, antenna)
+            corr_sum, absc_sum = _beam_accumulators(ncorrs, beam,
+                                                    accumulate_dtype)
+            beam_scratch = np.zeros((ncorrs,), dtype=beam.dtype)
+
+        for ta in numba.prange(ntime*nants):
+            t = ta // nants
+            a = ta - t*nants
+
+            if parallel:
+                # Scratch buffers private to each (time, antenna)
+                corr_sum, absc_sum = _beam_accumulators(ncorrs, beam,
+                                                        accumulate_dtype)
+                beam_scratch = np.zeros((ncorrs,), dtype=beam.dtype)
 
-    for t in range(ntime):
-        for a in range(nants):
             sin_pa = np.sin(parallactic_angles[t, a])
             cos_pa = np.cos(parallactic_angles[t, a])
 
@@ -116,10 +284,8 @@ def beam_cube_dde(beam, beam_lm_extents, beam_freq_map,
                     freq_scale = freq_data[f, 0]
                     # lower and upper frequency weights
                     nud = freq_data[f, 1]
-                    inv_nud = 1.0 - nud
-                    # lower and upper frequency grid position
+                    # lower frequency grid position
                     gc0 = np.int32(freq_data[f, 2])
-                    gc1 = gc0 + 1
 
                     # Apply any frequency scaling
                     sl = l * freq_scale
@@ -137,104 +303,341 @@ def beam_cube_dde(beam, beam_lm_extents, beam_freq_map,
                     vl *= antenna_scaling[a, f, 0]
                     vm *= antenna_scaling[a, f, 1]
 
-                    # Shift into the cube coordinate system
-                    vl = lscale*(vl - lower_l)
-                    vm = mscale*(vm - lower_m)
+                    _interpolate_beam(fbeam, vl, vm, gc0, nud, cube,
+                                      corr_sum, absc_sum, beam_scratch)
 
-                    # Clamp the coordinates to the edges of the cube
-                    vl = max(zero, min(vl, lmaxf))
-                    vm = max(zero, min(vm, mmaxf))
+                    # Assign normalised values
+                    for c in range(ncorrs):
+                        fjones[s, t, a, f, c] = corr_sum[c]
 
-                    # Snap to the lower grid coordinates
-                    gl0 = np.int32(np.floor(vl))
-                    gm0 = np.int32(np.floor(vm))
+        return fjones.reshape((nsrc, ntime, nants, nchan) + corrs)
 
-                    # Snap to the upper grid coordinates
-                    gl1 = min(gl0 + 1, lmaxi)
-                    gm1 = min(gm0 + 1, mmaxi)
+    return impl
 
-                    # Difference between grid and offset coordinates
-                    ld = vl - gl0
-                    md = vm - gm0
 
-                    # Zero accumulation arrays
-                    corr_sum[:] = 0
-                    absc_sum[:] = 0
+beam_cube_dde = beam_cube_dde_factory(False)
+parallel_beam_cube_dde = beam_cube_dde_factory(True)
 
-                    # Accumulate lower cube correlations
-                    beam_scratch[:] = fbeam[gl0, gm0, gc0, :]
-                    weight = (one - ld)*(one - md)*nud
 
-                    for c in range(ncorrs):
-                        absc_sum[c] += weight * np.abs(beam_scratch[c])
-                        corr_sum[c] += weight * beam_scratch[c]
+@njit(nogil=True, cache=True)
+def transformed_beam_cube_dde(beam, beam_lm_extents, beam_freq_map,
+                              coords, plan=None):
+    nsrc, ntime, nants = coords.lm.shape[:3]
+    nchan = coords.frequency.shape[0]
+    beam_lw, beam_mh, beam_nud = beam.shape[:3]
+    corrs = beam.shape[3:]
 
-                    beam_scratch[:] = fbeam[gl1, gm0, gc0, :]
-                    weight = ld*(one - md)*nud
+    if beam_lw < 2 or beam_mh < 2 or beam_nud < 2:
+        raise ValueError("beam_lw, beam_mh and beam_nud must be >= 2")
 
-                    for c in range(ncorrs):
-                        absc_sum[c] += weight * np.abs(beam_scratch[c])
-                        corr_sum[c] += weight * beam_scratch[c]
+    # Flatten correlations
+    ncorrs = reduce(lambda x, y: x*y, corrs, 1)
 
-                    beam_scratch[:] = fbeam[gl0, gm1, gc0, :]
-                    weight = (one - ld)*md*nud
+    lower_l, upper_l = beam_lm_extents[0]
+    lower_m, upper_m = beam_lm_extents[1]
 
-                    for c in range(ncorrs):
-                        absc_sum[c] += weight * np.abs(beam_scratch[c])
-                        corr_sum[c] += weight * beam_scratch[c]
+    ex_dtype = beam_lm_extents.dtype
 
-                    beam_scratch[:] = fbeam[gl1, gm1, gc0, :]
-                    weight = ld*md*nud
+    # Maximum l and m indices in float and int
+    lmaxf = ex_dtype.type(beam_lw - 1)
+    mmaxf = ex_dtype.type(beam_mh - 1)
+    lmaxi = beam_lw - 1
+    mmaxi = beam_mh - 1
 
-                    for c in range(ncorrs):
-                        absc_sum[c] += weight * np.abs(beam_scratch[c])
-                        corr_sum[c] += weight * beam_scratch[c]
+    one = ex_dtype.type(1)
+    zero = ex_dtype.type(0)
 
-                    # Accumulate upper cube correlations
-                    beam_scratch[:] = fbeam[gl0, gm0, gc1, :]
-                    weight = (one - ld)*(one - md)*inv_nud
+    # Flatten the beam on correlation
+    fbeam = beam.reshape((beam_lw, beam_mh, beam_nud, ncorrs))
 
-                    for c in range(ncorrs):
-                        absc_sum[c] += weight * np.abs(beam_scratch[c])
-                        corr_sum[c] += weight * beam_scratch[c]
+    # Allocate output array with correlations flattened
+    fjones = np.empty((nsrc, ntime, nants, nchan, ncorrs),
+                      dtype=beam.dtype)
 
-                    beam_scratch[:] = fbeam[gl1, gm0, gc1, :]
-                    weight = ld*(one - md)*inv_nud
+    if plan is None:
+        lscale = lmaxf / (upper_l - lower_l)
+        mscale = mmaxf / (upper_m - lower_m)
 
-                    for c in range(ncorrs):
-                        absc_sum[c] += weight * np.abs(beam_scratch[c])
-                        corr_sum[c] += weight * beam_scratch[c]
+        # Compute frequency interpolation stuff
+        freq_data = freq_grid_interp(coords.frequency, beam_freq_map)
+    else:
+        # Reuse the precomputed sampling plan
+        lscale = plan.lm_scale[0]
+        mscale = plan.lm_scale[1]
+        freq_data = plan.freq_data
 
-                    beam_scratch[:] = fbeam[gl0, gm1, gc1, :]
-                    weight = (one - ld)*md*inv_nud
+        if freq_data.shape[0] != nchan:
+            raise ValueError("Number of plan and frequency "
+                             "channels differ")
 
-                    for c in range(ncorrs):
-                        absc_sum[c] += weight * np.abs(beam_scratch[c])
-                        corr_sum[c] += weight * beam_scratch[c]
+    cube = (lower_l, lower_m, lscale, mscale,
+            lmaxf, mmaxf, lmaxi, mmaxi, zero, one)
 
-                    beam_scratch[:] = fbeam[gl1, gm1, gc1, :]
-                    weight = ld*md*inv_nud
+    corr_sum = np.zeros((ncorrs,), dtype=beam.dtype)
+    absc_sum = np.zeros((ncorrs,), dtype=beam.real.dtype)
+    beam_scratch = np.zeros((ncorrs,), dtype=beam.dtype)
 
-                    for c in range(ncorrs):
-                        absc_sum[c] += weight * np.abs(beam_scratch[c])
-                        corr_sum[c] += weight * beam_scratch[c]
+    for s in range(nsrc):
+        for t in range(ntime):
+            for a in range(nants):
+                # Rotated lm coordinates, offset by pointing errors
+                l, m = coords.lm[s, t, a]
 
-                    for c in range(ncorrs):
-                        # Added all correlations, normalise
-                        div = np.abs(corr_sum[c])
+                for f in range(nchan):
+                    # Scale by antenna scaling and
+                    # any frequency scaling
+                    scale = coords.antenna_scaling[a, f] * freq_data[f, 0]
 
-                        if div == 0.0:
-                            # This case probably works out to a zero assign
-                            corr_sum[c] *= absc_sum[c]
-                        else:
-                            corr_sum[c] *= absc_sum[c] / div
+                    _interpolate_beam(fbeam, l*scale, m*scale,
+                                      np.int32(freq_data[f, 2]),
+                                      freq_data[f, 1], cube,
+                                      corr_sum, absc_sum, beam_scratch)
 
                     # Assign normalised values
-                    fjones[s, t, a, f, :] = corr_sum
+                    for c in range(ncorrs):
+                        fjones[s, t, a, f, c] = corr_sum[c]
 
     return fjones.reshape((nsrc, ntime, nants, nchan) + corrs)
 
 
+BeamSamplingPlan = namedtuple("BeamSamplingPlan", ["freq_data", "lm_scale"])
+
+
+def beam_sampling_plan(beam, beam_lm_extents, beam_freq_map, frequency):
+    """
+    Precomputes the frequency interpolation weights and grid
+    positions, as well as the lm scaling constants, used by
+    :func:`beam_cube_dde` to sample a beam cube.
+
+    The plan can be reused across :func:`beam_cube_dde` calls with
+    the same beam cube shape, ``beam_lm_extents``, ``beam_freq_map``
+    and ``frequency``.
+
+    Parameters
+    ----------
+    beam : :class:`numpy.ndarray`
+        Complex beam cube of
+        shape :code:`(beam_lw, beam_mh, beam_nud, corr, corr)`.
+    beam_lm_extents : :class:`numpy.ndarray`
+        lm extents of the beam cube of shape :code:`(2, 2)`.
+    beam_freq_map : :class:`numpy.ndarray`
+        Beam frequency map of shape :code:`(beam_nud,)`.
+    frequency : :class:`numpy.ndarray`
+        Frequencies of shape :code:`(chan,)`.
+
+    Returns
+    -------
+    plan : :class:`BeamSamplingPlan`
+        A namedtuple containing the :code:`(chan, 3)` frequency
+        interpolation data in ``freq_data`` and the l and m
+        grid scaling factors in ``lm_scale``.
+    """
+    beam_lw, beam_mh = beam.shape[:2]
+    dtype = beam_lm_extents.dtype
+    (lower_l, upper_l), (lower_m, upper_m) = beam_lm_extents
+
+    lm_scale = np.array([dtype.type(beam_lw - 1) / (upper_l - lower_l),
+                         dtype.type(beam_mh - 1) / (upper_m - lower_m)],
+                        dtype=dtype)
+
+    return BeamSamplingPlan(freq_grid_interp(frequency, beam_freq_map),
+                            lm_scale)
+
+
+class BeamAngleCache(object):
+    """
+    Least Recently Used cache of beam values produced by
+    :func:`cached_beam_cube_dde`, keyed on antenna,
+    quantised parallactic angle and pointing errors.
+
+    A cache should only be shared between calls with the same
+    beam cube, source coordinates, antenna scaling,
+    frequencies and angle tolerance. Changes to any
+    of these raise a :class:`ValueError`.
+
+    Parameters
+    ----------
+    maxbytes : int, optional
+        Maximum number of bytes of beam values held in the cache.
+        Each value holds :code:`(source, chan, corr_1, corr_2)`
+        beam values.
+        Defaults to 1GB.
+    """
+    def __init__(self, maxbytes=2**30):
+        if maxbytes < 1:
+            raise ValueError("maxbytes %d < 1" % maxbytes)
+
+        self.maxbytes = maxbytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._fingerprint = None
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def check(self, fingerprint):
+        """ Check that the cache is used with the same inputs """
+        with self._lock:
+            if self._fingerprint is None:
+                self._fingerprint = fingerprint
+            elif self._fingerprint != fingerprint:
+                raise ValueError("BeamAngleCache used with differing "
+                                 "beam inputs or angle tolerance")
+
+    def get(self, key):
+        """ Returns the value for ``key`` or None """
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                self.misses += 1
+                return None
+
+            # Mark as most recently used
+            self._data[key] = value
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """ Inserts ``value`` for ``key``, evicting old values """
+        with self._lock:
+            old = self._data.pop(key, None)
+
+            if old is not None:
+                self.nbytes -= old.nbytes
+
+            self._data[key] = value
+            self.nbytes += value.nbytes
+
+            # Values larger than maxbytes are not retained
+            while self.nbytes > self.maxbytes:
+                _, old = self._data.popitem(last=False)
+                self.nbytes -= old.nbytes
+
+
+def _array_digest(*arrays):
+    """ Digest of the shape, type and contents of ``arrays`` """
+    digest = hashlib.blake2b(digest_size=16)
+
+    for a in arrays:
+        a = np.ascontiguousarray(a)
+        digest.update(("%s%s" % (a.shape, a.dtype.str)).encode())
+        digest.update(a.reshape(-1).view(np.uint8))
+
+    return digest.digest()
+
+
+def cached_beam_cube_dde(beam, beam_lm_extents, beam_freq_map,
+                         lm, parallactic_angles, point_errors,
+                         antenna_scaling, frequency,
+                         angle_tolerance=np.deg2rad(0.1),
+                         interpolate=False, cache=None):
+    if angle_tolerance <= 0.0:
+        raise ValueError("angle_tolerance must be > 0")
+
+    if cache is None:
+        cache = BeamAngleCache()
+
+    nsrc = lm.shape[0]
+    ntime, nants = parallactic_angles.shape
+    nchan = frequency.shape[0]
+    corrs = beam.shape[3:]
+
+    cache.check((float(angle_tolerance),
+                 _array_digest(beam, beam_lm_extents, beam_freq_map, lm,
+                               antenna_scaling, frequency)))
+
+    # Key on a digest of each distinct pointing error,
+    # rather than on the pointing errors themselves
+    flat_errors = point_errors.reshape((ntime*nants,) +
+                                       point_errors.shape[2:])
+    unique_errors, error_index = np.unique(flat_errors, axis=0,
+                                           return_inverse=True)
+    error_keys = [_array_digest(e) for e in unique_errors]
+    error_index = error_index.reshape(ntime, nants)
+
+    # Parallactic angles in units of the quantisation grid
+    grid_angles = parallactic_angles / angle_tolerance
+
+    if interpolate:
+        # Linearly interpolate between neighbouring grid angles
+        lower = np.floor(grid_angles)
+        upper_weight = grid_angles - lower
+        grid = [(lower.astype(np.int64), 1.0 - upper_weight),
+                (lower.astype(np.int64) + 1, upper_weight)]
+    else:
+        # Snap to the nearest grid angle
+        grid = [(np.round(grid_angles).astype(np.int64),
+                 np.ones_like(grid_angles))]
+
+    values = {}
+    missing = [[] for _ in range(nants)]
+
+    # Find beam values for each (time, antenna),
+    # noting those that must be evaluated
+    keys = {}
+
+    for t in range(ntime):
+        for a in range(nants):
+            point_error = error_keys[error_index[t, a]]
+            keys[t, a] = ta_keys = []
+
+            for index, _ in grid:
+                key = (a, int(index[t, a]), point_error)
+                ta_keys.append(key)
+
+                if key in values:
+                    continue
+
+                value = cache.get(key)
+                values[key] = value
+
+                if value is None:
+                    missing[a].append((key, t))
+
+    plan = beam_sampling_plan(beam, beam_lm_extents,
+                              beam_freq_map, frequency)
+
+    # Evaluate missing values on each antenna's grid angles
+    for a, antenna_missing in enumerate(missing):
+        if len(antenna_missing) == 0:
+            continue
+
+        grid_pa = np.asarray([k[1] for k, _ in antenna_missing],
+                             dtype=parallactic_angles.dtype)
+        grid_pa = (grid_pa * angle_tolerance)[:, None]
+        grid_pe = np.stack([point_errors[t, a] for _, t in antenna_missing])
+
+        ddes = beam_cube_dde(beam, beam_lm_extents, beam_freq_map, lm,
+                             grid_pa, grid_pe[:, None],
+                             antenna_scaling[a:a + 1], frequency,
+                             plan)
+
+        for i, (key, _) in enumerate(antenna_missing):
+            # Copy so that the cache does not hold ddes
+            value = ddes[:, i, 0].copy()
+            values[key] = value
+            cache.put(key, value)
+
+    ddes = np.empty((nsrc, ntime, nants, nchan) + corrs, dtype=beam.dtype)
+
+    for t in range(ntime):
+        for a in range(nants):
+            if interpolate:
+                lower_weight = grid[0][1][t, a]
+                upper_weight = grid[1][1][t, a]
+                lower_key, upper_key = keys[t, a]
+                ddes[:, t, a] = (lower_weight*values[lower_key] +
+                                 upper_weight*values[upper_key])
+            else:
+                ddes[:, t, a] = values[keys[t, a][0]]
+
+    return ddes
+
+
 BEAM_CUBE_DOCS = DocstringTemplate(
     r"""
     Evaluates Direction Dependent Effects along a source's path
@@ -287,8 +690,170 @@ BEAM_CUBE_DOCS = DocstringTemplate(
     """)
 
 
+BEAM_CUBE_PLAN_ARGS = """
+    frequency : $(array_type)
+        Frequencies of shape :code:`(chan,)`.
+    plan : :class:`BeamSamplingPlan`, optional
+        Sampling plan produced by :func:`beam_sampling_plan`
+        for this beam and ``frequency``.
+        If None, the plan is computed on each call.
+    accumulate_dtype : {np.complex64, np.complex128}, optional
+        Complex dtype in which the eight interpolated beam
+        values are summed and normalised.
+        Beam values are read and weighted in the beam's precision
+        and the result is stored in the beam's dtype.
+        With a :code:`complex64` beam and :code:`np.complex128`,
+        the error of each value is bounded by roughly
+        :math:`2^{-24}` relative to the
+        sum of absolute beam values, due to the final rounding.
+        Defaults to the beam dtype.
+"""
+
+_BEAM_CUBE_FREQ_ARG = """
+    frequency : $(array_type)
+        Frequencies of shape :code:`(chan,)`.
+"""
+
+BEAM_CUBE_PLAN_DOCS = DocstringTemplate(mod_docs(
+                            BEAM_CUBE_DOCS.template,
+                            [(_BEAM_CUBE_FREQ_ARG, BEAM_CUBE_PLAN_ARGS)]))
+
 try:
-    beam_cube_dde.__doc__ = BEAM_CUBE_DOCS.substitute(
+    beam_cube_dde.__doc__ = BEAM_CUBE_PLAN_DOCS.substitute(
                                 array_type=":class:`numpy.ndarray`")
 except AttributeError:
     pass
+
+PARALLEL_BEAM_CUBE_NOTES = """
+       introduce linear scaling to the lm coordinates of a source.
+    3. Multi-threaded version of :func:`beam_cube_dde`.
+       Each thread interpolates a subset of the
+       :code:`(time, ant)` pairs with private scratch buffers.
+       The number of threads is controlled by numba's threading layer,
+       via :code:`NUMBA_NUM_THREADS` or :func:`numba.set_num_threads`.
+"""
+
+try:
+    parallel_beam_cube_dde.__doc__ = mod_docs(
+        BEAM_CUBE_PLAN_DOCS.substitute(array_type=":class:`numpy.ndarray`"),
+        [("\n       introduce linear scaling to the "
+          "lm coordinates of a source.\n",
+          PARALLEL_BEAM_CUBE_NOTES)])
+except AttributeError:
+    pass
+
+
+TRANSFORMED_BEAM_CUBE_DOCS = DocstringTemplate(
+    r"""
+    Evaluates Direction Dependent Effects by interpolating
+    the values of a complex beam cube at the compact source
+    coordinates produced by
+    :func:`~africanus.rime.compact_transform_sources`.
+
+    Notes
+    -----
+    1. Sources are clamped to the provided `beam_lm_extents`.
+    2. Frequencies outside the cube (i.e. outside beam_freq_map)
+       introduce linear scaling to the lm coordinates of a source.
+       In contrast to :func:`beam_cube_dde`, this scaling is applied
+       after the parallactic angle rotation and pointing errors.
+
+    Parameters
+    ----------
+    beam : $(array_type)
+        Complex beam cube of
+        shape :code:`(beam_lw, beam_mh, beam_nud, corr, corr)`.
+    beam_lm_extents : $(array_type)
+        lm extents of the beam cube of shape :code:`(2, 2)`.
+        ``[[lower_l, upper_l], [lower_m, upper_m]]``.
+    beam_freq_map : $(array_type)
+        Beam frequency map of shape :code:`(beam_nud,)`.
+    coords : :class:`~africanus.rime.SourceCoords`
+        Rotated source coordinates with pointing errors,
+        antenna scaling factors and frequencies.
+    plan : :class:`BeamSamplingPlan`, optional
+        Sampling plan produced by :func:`beam_sampling_plan`
+        for this beam and ``coords.frequency``.
+
+    Returns
+    -------
+    ddes : $(array_type)
+        Direction Dependent Effects of shape
+        :code:`(source, time, ant, chan, corr, corr)`
+    """)
+
+try:
+    transformed_beam_cube_dde.__doc__ = TRANSFORMED_BEAM_CUBE_DOCS.substitute(
+                                    array_type=":class:`numpy.ndarray`")
+except AttributeError:
+    pass
+
+
+CACHED_BEAM_CUBE_DOCS = DocstringTemplate(
+    r"""
+    Evaluates Direction Dependent Effects along a source's path
+    by interpolating the values of a complex beam cube
+    at the source location, reusing beam values computed
+    on a grid of parallactic angles.
+
+    Parallactic angles change slowly over an observation.
+    They are quantised to multiples of ``angle_tolerance`` and
+    :func:`beam_cube_dde` is only evaluated once for
+    each unique antenna, quantised angle and pointing error.
+    Values are held in a :class:`BeamAngleCache`, which may be
+    shared between calls on different time chunks.
+
+    Notes
+    -----
+    1. Parallactic angles are snapped to the nearest multiple of
+       ``angle_tolerance``, or linearly interpolated between
+       neighbouring multiples if ``interpolate`` is set.
+       This introduces an error of at most ``angle_tolerance / 2``
+       in the rotation angle when snapping.
+    2. Pointing errors are not quantised. Time varying pointing
+       errors therefore reduce the amount of reuse.
+    3. See :func:`beam_cube_dde` for the remaining notes.
+
+    Parameters
+    ----------
+    beam : $(array_type)
+        Complex beam cube of
+        shape :code:`(beam_lw, beam_mh, beam_nud, corr, corr)`.
+    beam_lm_extents : $(array_type)
+        lm extents of the beam cube of shape :code:`(2, 2)`.
+        ``[[lower_l, upper_l], [lower_m, upper_m]]``.
+    beam_freq_map : $(array_type)
+        Beam frequency map of shape :code:`(beam_nud,)`.
+    lm : $(array_type)
+        Source lm coordinates of shape :code:`(source, 2)`.
+    parallactic_angles : $(array_type)
+        Parallactic angles of shape :code:`(time, ant)`.
+    point_errors : $(array_type)
+        Pointing errors of shape :code:`(time, ant, chan, 2)`.
+    antenna_scaling : $(array_type)
+        Antenna scaling factors of shape :code:`(ant, chan, 2)`
+    frequency : $(array_type)
+        Frequencies of shape :code:`(chan,)`.
+    angle_tolerance : float, optional
+        Spacing of the parallactic angle grid in radians.
+        Defaults to 0.1 degrees.
+    interpolate : bool, optional
+        Linearly interpolate beam values between
+        neighbouring grid angles. Defaults to False.
+    cache : :class:`BeamAngleCache`, optional
+        Cache of beam values. If None, a new cache is used
+        for this call.
+
+    Returns
+    -------
+    ddes : $(array_type)
+        Direction Dependent Effects of shape
+        :code:`(source, time, ant, chan, corr, corr)`
+    """)
+
+
+try:
+    cached_beam_cube_dde.__doc__ = CACHED_BEAM_CUBE_DOCS.substitute(
+                                    array_type=":class:`numpy.ndarray`")
+except AttributeError:
+    pass
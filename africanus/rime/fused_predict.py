@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from africanus.constants import minus_two_pi_over_c
+from africanus.model.coherency.conversion import convert
+from africanus.model.spectral.spec_model import spectral_model
+from africanus.util.docs import DocstringTemplate
+from africanus.util.numba import jit
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def fused_predict_impl(lm, uvw, frequency, brightness, constant, dtype):
+    nsrc = lm.shape[0]
+    nrow = uvw.shape[0]
+    nchan = frequency.shape[0]
+    ncorr = brightness.shape[2]
+    one = lm.dtype.type(1)
+
+    vis = np.zeros((nrow, nchan, ncorr), dtype=dtype)
+
+    for s in range(nsrc):
+        l = lm[s, 0]  # noqa
+        m = lm[s, 1]
+        n = np.sqrt(one - l*l - m*m) - one
+
+        for r in range(nrow):
+            u = uvw[r, 0]
+            v = uvw[r, 1]
+            w = uvw[r, 2]
+
+            real_phase = constant*(l*u + m*v + n*w)
+
+            for f in range(nchan):
+                # The phase is purely imaginary,
+                # so elide exp and compute cos and sin
+                p = real_phase * frequency[f]
+                phasor = np.cos(p) + np.sin(p)*1j
+
+                for c in range(ncorr):
+                    vis[r, f, c] += phasor * brightness[s, f, c]
+
+    return vis
+
+
+def fused_predict(lm, uvw, frequency, stokes, spi, ref_freq,
+                  base=0, stokes_schema=("I", "Q", "U", "V"),
+                  corr_schema=(("XX", "XY"), ("YX", "YY")),
+                  convention='fourier'):
+    if convention == 'fourier':
+        constant = minus_two_pi_over_c
+    elif convention == 'casa':
+        constant = -minus_two_pi_over_c
+    else:
+        raise ValueError("convention not in ('fourier', 'casa')")
+
+    if stokes.ndim != 2:
+        raise ValueError("stokes must have shape (source, pol)")
+
+    # The spectral model and brightness matrix only
+    # vary over (source, chan) and are much smaller than
+    # the (source, row, chan) phase delay term
+    spectrum = spectral_model(stokes, spi, ref_freq, frequency, base)
+    brightness = convert(spectrum, list(stokes_schema), list(corr_schema))
+
+    corr_shape = brightness.shape[2:]
+    brightness = brightness.reshape(brightness.shape[:2] + (-1,))
+
+    dtype = np.result_type(np.complex64, lm.dtype, uvw.dtype,
+                           frequency.dtype, brightness.dtype)
+    constant = lm.dtype.type(constant)
+
+    vis = fused_predict_impl(lm, uvw, frequency, brightness, constant, dtype)
+    return vis.reshape(vis.shape[:2] + corr_shape)
+
+
+FUSED_PREDICT_DOCS = DocstringTemplate(r"""
+    Predict visibilities directly from source coordinates,
+    stokes parameters and spectral models.
+
+    Computes
+
+    .. math::
+
+        V_{pq\nu} = \sum_s K_{spq\nu} B_{s\nu}
+
+    where :math:`K` is the :func:`~africanus.rime.phase_delay` term and
+    :math:`B` is the brightness matrix obtained by applying
+    :func:`~africanus.model.spectral.spectral_model` to ``stokes``
+    and converting the result to correlations with
+    :func:`~africanus.model.coherency.convert`.
+
+    Notes
+    -----
+
+    Equivalent to multiplying the outputs of
+    :func:`~africanus.rime.phase_delay`, the spectral model and the
+    brightness conversion into ``source_coh`` and calling
+    :func:`~africanus.rime.predict_vis`. However, the phase
+    delay is computed on the fly and summed into the output,
+    so neither the :code:`(source, row, chan)` phase delay nor the
+    :code:`(source, row, chan, corr)` source coherencies are
+    ever held in memory.
+    Only the :code:`(source, chan, corr)` brightness
+    and the :code:`(row, chan, corr)` output are allocated.
+
+    Parameters
+    ----------
+    lm : $(array_type)
+        LM coordinates of shape :code:`(source, 2)` with
+        L and M components in the last dimension.
+    uvw : $(array_type)
+        UVW coordinates of shape :code:`(row, 3)` with
+        U, V and W components in the last dimension.
+    frequency : $(array_type)
+        Frequencies of shape :code:`(chan,)`
+    stokes : $(array_type)
+        Stokes parameters of shape :code:`(source, pol)`.
+    spi : $(array_type)
+        Spectral index of shape :code:`(source, spi-comps, pol)`.
+    ref_freq : $(array_type)
+        Reference frequencies of shape :code:`(source,)`
+    base : {"std", "log", "log10"} or {0, 1, 2} or list, optional
+        Polynomial base of the spectral model.
+        See :func:`~africanus.model.spectral.spectral_model`.
+        Defaults to 0.
+    stokes_schema : sequence of str, optional
+        Schema describing the ``pol`` dimension of ``stokes``.
+        Defaults to :code:`("I", "Q", "U", "V")`.
+    corr_schema : sequence of str, optional
+        Schema describing the correlations of the output.
+        Defaults to :code:`(("XX", "XY"), ("YX", "YY"))`.
+    convention : {'fourier', 'casa'}
+        Uses the :math:`e^{-2 \pi \mathit{i}}` sign convention
+        if ``fourier`` and :math:`e^{2 \pi \mathit{i}}` if
+        ``casa``.
+
+    Returns
+    -------
+    visibilities : $(array_type)
+        Complex visibilities of shape :code:`(row, chan, corr_1, corr_2)`,
+        where the correlation dimensions match ``corr_schema``.
+""")
+
+try:
+    fused_predict.__doc__ = FUSED_PREDICT_DOCS.substitute(
+                                array_type=":class:`numpy.ndarray`")
+except AttributeError:
+    pass
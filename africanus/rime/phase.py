@@ -4,18 +4,82 @@ import numpy as np
 
 from africanus.constants import minus_two_pi_over_c
 from africanus.util.docs import DocstringTemplate
-from africanus.util.numba import generated_jit
-from africanus.util.type_inference import infer_complex_dtype
+from africanus.util.numba import generated_jit, njit
+from africanus.util.type_inference import (infer_complex_dtype,
+                                           infer_dtype_arg)
+
+# Number of channels between exact phase evaluations
+# when the phasor recurrence is used
+RECURRENCE_ANCHOR_INTERVAL = 16
+
+# Maximum deviation of channel frequencies from a regular grid,
+# relative to the channel spacing
+REGULAR_GRID_RTOL = 1e-6
+
+
+@njit(nogil=True, cache=True)
+def regular_frequency_grid(frequency):
+    """
+    Returns True if ``frequency`` is regularly spaced
+    to within :data:`REGULAR_GRID_RTOL` of the channel spacing.
+    """
+    nchan = frequency.shape[0]
+
+    if nchan < 2:
+        return True
+
+    f0 = frequency[0]
+    df = (frequency[nchan - 1] - f0) / (nchan - 1)
+    tol = REGULAR_GRID_RTOL * abs(df)
+
+    for chan in range(1, nchan - 1):
+        if abs(frequency[chan] - (f0 + chan*df)) > tol:
+            return False
+
+    return True
+
+
+def cast_factory(dtype):
+    """
+    Factory function returning a function that casts
+    scalars to ``dtype``, or returns them unchanged if None
+    """
+    if dtype is None:
+        def cast(value):
+            return value
+    else:
+        dtype_type = dtype.type
+
+        def cast(value):
+            return dtype_type(value)
+
+    return njit(nogil=True, inline='always')(cast)
 
 
 @generated_jit(nopython=True, nogil=True, cache=True)
-def phase_delay(lm, uvw, frequency, convention='fourier'):
-    # Bake constants in with the correct type
-    one = lm.dtype(1.0)
-    neg_two_pi_over_c = lm.dtype(minus_two_pi_over_c)
+def phase_delay(lm, uvw, frequency, convention='fourier',
+                recurrence=False,
+                anchor_interval=RECURRENCE_ANCHOR_INTERVAL,
+                accumulate_dtype=None):
     out_dtype = infer_complex_dtype(lm, uvw, frequency)
-
-    def _phase_delay_impl(lm, uvw, frequency, convention='fourier'):
+    acc_dtype = infer_dtype_arg(accumulate_dtype)
+
+    if acc_dtype is None:
+        # Bake constants in with the correct type
+        one = lm.dtype(1.0)
+        neg_two_pi_over_c = lm.dtype(minus_two_pi_over_c)
+    else:
+        # Compute the phase in the real type of accumulate_dtype
+        acc_dtype = np.empty(0, dtype=acc_dtype).real.dtype
+        one = acc_dtype.type(1.0)
+        neg_two_pi_over_c = acc_dtype.type(minus_two_pi_over_c)
+
+    cast = cast_factory(acc_dtype)
+
+    def _phase_delay_impl(lm, uvw, frequency, convention='fourier',
+                          recurrence=False,
+                          anchor_interval=RECURRENCE_ANCHOR_INTERVAL,
+                          accumulate_dtype=None):
         if convention == 'fourier':
             constant = neg_two_pi_over_c
         elif convention == 'casa':
@@ -23,23 +87,64 @@ def phase_delay(lm, uvw, frequency, convention='fourier'):
         else:
             raise ValueError("convention not in ('fourier', 'casa')")
 
-        shape = (lm.shape[0], uvw.shape[0], frequency.shape[0])
+        if anchor_interval < 1:
+            raise ValueError("anchor_interval must be >= 1")
+
+        nchan = frequency.shape[0]
+        shape = (lm.shape[0], uvw.shape[0], nchan)
         complex_phase = np.zeros(shape, dtype=out_dtype)
 
+        # Only advance the phasor on regular frequency grids
+        if recurrence and nchan > 1 and regular_frequency_grid(frequency):
+            df = ((cast(frequency[nchan - 1]) - cast(frequency[0])) /
+                  (nchan - 1))
+
+            for source in range(lm.shape[0]):
+                l = cast(lm[source, 0])  # noqa
+                m = cast(lm[source, 1])
+                n = np.sqrt(one - l**2 - m**2) - one
+
+                for row in range(uvw.shape[0]):
+                    u = cast(uvw[row, 0])
+                    v = cast(uvw[row, 1])
+                    w = cast(uvw[row, 2])
+                    real_phase = constant * (l * u + m * v + n * w)
+
+                    # Phasor advancing the phase by one channel
+                    step = real_phase * df
+                    step_phasor = np.cos(step) + np.sin(step)*1j
+                    phasor = step_phasor
+
+                    for chan in range(nchan):
+                        # Periodically re-anchor on the exact phase
+                        # to bound the drift of the recurrence
+                        if chan % anchor_interval == 0:
+                            p = real_phase * cast(frequency[chan])
+                            phasor = np.cos(p) + np.sin(p)*1j
+                        else:
+                            phasor *= step_phasor
+
+                        complex_phase[source, row, chan] = phasor
+
+            return complex_phase
+
         # For each source
         for source in range(lm.shape[0]):
-            l, m = lm[source]
+            l = cast(lm[source, 0])  # noqa
+            m = cast(lm[source, 1])
             n = np.sqrt(one - l**2 - m**2) - one
 
             # For each uvw coordinate
             for row in range(uvw.shape[0]):
-                u, v, w = uvw[row]
+                u = cast(uvw[row, 0])
+                v = cast(uvw[row, 1])
+                w = cast(uvw[row, 2])
                 # e^(-2*pi*(l*u + m*v + n*w)/c)
                 real_phase = constant * (l * u + m * v + n * w)
 
                 # Multiple in frequency for each channel
                 for chan in range(frequency.shape[0]):
-                    p = real_phase * frequency[chan]
+                    p = real_phase * cast(frequency[chan])
 
                     # Our phase input is purely imaginary
                     # so we can can elide a call to exp
@@ -73,6 +178,15 @@ PHASE_DELAY_DOCS = DocstringTemplate(
     6a7e873d4d1fe538981dec5851418cbd371b8388/MeqNodes/src/PSVTensor.cc#L314_>`_
     uses the CASA sign convention.
 
+    When ``recurrence`` is enabled, the phasor of channel :math:`k`
+    is obtained by multiplying the phasor of channel :math:`k - 1`
+    with :math:`e^{i \theta \Delta \nu}`, where :math:`\theta`
+    is the phase per unit frequency and :math:`\Delta \nu`
+    the channel spacing.
+    The phasor is recomputed exactly every ``anchor_interval`` channels.
+    Rounding errors grow roughly linearly between anchors,
+    so this trades a small loss of accuracy for throughput.
+
     Parameters
     ----------
 
@@ -88,6 +202,29 @@ PHASE_DELAY_DOCS = DocstringTemplate(
         Uses the :math:`e^{-2 \pi \mathit{i}}` sign convention
         if ``fourier`` and :math:`e^{2 \pi \mathit{i}}` if
         ``casa``.
+    recurrence : bool, optional
+        If True and ``frequency`` is regularly spaced,
+        advance the phase by multiplying with the phasor of
+        a single channel step, rather than computing
+        a sine and cosine for each channel.
+        Irregular frequency grids fall back to the exact computation.
+        Defaults to False.
+    anchor_interval : int, optional
+        Number of channels between exact phase computations
+        when ``recurrence`` is enabled.
+        Smaller values bound the accumulated
+        numerical drift more tightly.
+        Defaults to 16.
+    accumulate_dtype : {np.float32, np.float64}, optional
+        Dtype in which the phase is computed, before the
+        complex phase is stored in the dtype inferred from the inputs.
+        For example, ``np.float64`` with single precision inputs
+        produces :code:`complex64` output, with phase errors
+        of roughly :math:`\epsilon_{32} = 2^{-24}`
+        due to the final rounding, rather than errors of
+        :math:`\epsilon_{32} | 2 \pi (ul + vm + wn) \nu / c |`
+        radians due to computing the phase in single precision.
+        Defaults to the precision of the inputs.
 
     Returns
     -------
@@ -1,16 +1,22 @@
 # -*- coding: utf-8 -*-
 
 
+import numba
 import numpy as np
 
 from africanus.util.docs import DocstringTemplate
 from africanus.util.numba import is_numba_type_none, generated_jit, njit
+from africanus.util.type_inference import infer_dtype_arg
 
 
 JONES_NOT_PRESENT = 0
 JONES_1_OR_2 = 1
 JONES_2X2 = 2
 
+# Default number of source chunks summed by parallel_predict_vis
+# when a deterministic result is requested
+DETERMINISTIC_SOURCE_CHUNKS = 8
+
 
 def _get_jones_types(name, numba_ndarray_type, corr_1_dims, corr_2_dims):
     """
@@ -426,11 +432,14 @@ def predict_checks(time_index, antenna1, antenna2,
             have_dies1, have_bvis, have_dies2)
 
 
-@generated_jit(nopython=True, nogil=True, cache=True)
-def predict_vis(time_index, antenna1, antenna2,
-                dde1_jones=None, source_coh=None, dde2_jones=None,
-                die1_jones=None, base_vis=None, die2_jones=None):
-
+def _predict_vis_types(time_index, antenna1, antenna2,
+                       dde1_jones, source_coh, dde2_jones,
+                       die1_jones, base_vis, die2_jones,
+                       accumulate_dtype):
+    """
+    Checks the numba types of the :func:`predict_vis` inputs, returning
+    the presence of each term, the Jones type and the output dtype
+    """
     tup = predict_checks(time_index, antenna1, antenna2,
                          dde1_jones, source_coh, dde2_jones,
                          die1_jones, base_vis, die2_jones,
@@ -446,6 +455,15 @@ def predict_vis(time_index, antenna1, antenna2,
                                  for a in dtype_arrays
                                  if not is_numba_type_none(a)))
 
+    # Accumulate in a higher precision, if requested
+    acc_dtype = infer_dtype_arg(accumulate_dtype)
+
+    if acc_dtype is not None:
+        if acc_dtype.kind != 'c':
+            raise TypeError("accumulate_dtype %s is not complex" % acc_dtype)
+
+        out_dtype = acc_dtype
+
     jones_types = [
         _get_jones_types("dde1_jones", dde1_jones, 5, 6),
         _get_jones_types("source_coh", source_coh, 4, 5),
@@ -467,6 +485,22 @@ def predict_vis(time_index, antenna1, antenna2,
     have_ddes = have_ddes1 and have_ddes2
     have_dies = have_dies1 and have_dies2
 
+    return have_ddes, have_coh, have_dies, have_bvis, jones_type, out_dtype
+
+
+@generated_jit(nopython=True, nogil=True, cache=True)
+def predict_vis(time_index, antenna1, antenna2,
+                dde1_jones=None, source_coh=None, dde2_jones=None,
+                die1_jones=None, base_vis=None, die2_jones=None,
+                accumulate_dtype=None):
+
+    tup = _predict_vis_types(time_index, antenna1, antenna2,
+                             dde1_jones, source_coh, dde2_jones,
+                             die1_jones, base_vis, die2_jones,
+                             accumulate_dtype)
+
+    have_ddes, have_coh, have_dies, have_bvis, jones_type, out_dtype = tup
+
     # Create functions that we will use inside our predict function
     out_fn = output_factory(have_ddes, have_coh,
                             have_dies, have_bvis, out_dtype)
@@ -476,7 +510,8 @@ def predict_vis(time_index, antenna1, antenna2,
 
     def _predict_vis_fn(time_index, antenna1, antenna2,
                         dde1_jones=None, source_coh=None, dde2_jones=None,
-                        die1_jones=None, base_vis=None, die2_jones=None):
+                        die1_jones=None, base_vis=None, die2_jones=None,
+                        accumulate_dtype=None):
 
         # Get the output shape
         out = out_fn(time_index, dde1_jones, source_coh, dde2_jones,
@@ -503,6 +538,128 @@ def predict_vis(time_index, antenna1, antenna2,
     return _predict_vis_fn
 
 
+def source_count_factory(have_ddes, have_coh):
+    """
+    Factory function returning a function that counts
+    the number of sources
+    """
+    if have_ddes:
+        def source_count(dde1_jones, source_coh):
+            return dde1_jones.shape[0]
+    elif have_coh:
+        def source_count(dde1_jones, source_coh):
+            return source_coh.shape[0]
+    else:
+        def source_count(dde1_jones, source_coh):
+            return 0
+
+    return njit(nogil=True, inline='always')(source_count)
+
+
+def source_slice_factory(present):
+    """
+    Factory function returning a function that slices
+    the source dimension of an optional array
+    """
+    if present:
+        def source_slice(array, start, end):
+            return array[start:end]
+    else:
+        def source_slice(array, start, end):
+            return None
+
+    return njit(nogil=True, inline='always')(source_slice)
+
+
+@generated_jit(nopython=True, nogil=True, cache=True, parallel=True)
+def _parallel_predict_vis(time_index, antenna1, antenna2,
+                          dde1_jones, source_coh, dde2_jones,
+                          die1_jones, base_vis, die2_jones,
+                          source_chunks, accumulate_dtype):
+
+    tup = _predict_vis_types(time_index, antenna1, antenna2,
+                             dde1_jones, source_coh, dde2_jones,
+                             die1_jones, base_vis, die2_jones,
+                             accumulate_dtype)
+
+    have_ddes, have_coh, have_dies, have_bvis, jones_type, out_dtype = tup
+
+    out_fn = output_factory(have_ddes, have_coh,
+                            have_dies, have_bvis, out_dtype)
+    sum_coh_fn = sum_coherencies_factory(have_ddes, have_coh, jones_type)
+    apply_dies_fn = apply_dies_factory(have_dies, have_bvis, jones_type)
+    add_coh_fn = add_coh_factory(have_bvis)
+    source_count_fn = source_count_factory(have_ddes, have_coh)
+    dde_slice_fn = source_slice_factory(have_ddes)
+    coh_slice_fn = source_slice_factory(have_coh)
+
+    def impl(time_index, antenna1, antenna2,
+             dde1_jones, source_coh, dde2_jones,
+             die1_jones, base_vis, die2_jones,
+             source_chunks, accumulate_dtype):
+
+        out = out_fn(time_index, dde1_jones, source_coh, dde2_jones,
+                     die1_jones, base_vis, die2_jones)
+
+        tmin = time_index.min()
+        nsrc = source_count_fn(dde1_jones, source_coh)
+        nchunks = max(min(source_chunks, nsrc), 1)
+
+        # The first chunk accumulates directly into the output,
+        # while the remaining chunks have private buffers
+        buffers = np.zeros((nchunks - 1,) + out.shape, dtype=out.dtype)
+
+        for c in numba.prange(nchunks):
+            start = (c * nsrc) // nchunks
+            end = ((c + 1) * nsrc) // nchunks
+            chunk_out = out if c == 0 else buffers[c - 1]
+
+            sum_coh_fn(time_index, antenna1, antenna2,
+                       dde_slice_fn(dde1_jones, start, end),
+                       coh_slice_fn(source_coh, start, end),
+                       dde_slice_fn(dde2_jones, start, end),
+                       tmin, chunk_out)
+
+        # Reduce the buffers in ascending chunk order
+        for r in numba.prange(out.shape[0]):
+            for c in range(1, nchunks):
+                out[r] += buffers[c - 1, r]
+
+        add_coh_fn(base_vis, out)
+
+        apply_dies_fn(time_index, antenna1, antenna2,
+                      die1_jones, die2_jones,
+                      tmin, out)
+
+        return out
+
+    return impl
+
+
+def parallel_predict_vis(time_index, antenna1, antenna2,
+                         dde1_jones=None, source_coh=None, dde2_jones=None,
+                         die1_jones=None, base_vis=None, die2_jones=None,
+                         source_chunks=None, deterministic=False,
+                         accumulate_dtype=None):
+    if source_chunks is None:
+        if deterministic:
+            source_chunks = DETERMINISTIC_SOURCE_CHUNKS
+        else:
+            try:
+                source_chunks = numba.get_num_threads()
+            except AttributeError:
+                # numba < 0.49
+                source_chunks = numba.config.NUMBA_NUM_THREADS
+
+    if source_chunks < 1:
+        raise ValueError("source_chunks %d < 1" % source_chunks)
+
+    return _parallel_predict_vis(time_index, antenna1, antenna2,
+                                 dde1_jones, source_coh, dde2_jones,
+                                 die1_jones, base_vis, die2_jones,
+                                 source_chunks, accumulate_dtype)
+
+
 @generated_jit(nopython=True, nogil=True, cache=True)
 def apply_gains(time_index, antenna1, antenna2,
                 die1_jones, corrupted_vis, die2_jones):
@@ -606,13 +763,72 @@ visibilities : $(array_type)
 """)
 
 
+ACCUMULATE_NOTES = """
+* Products of Jones terms are computed in the precision of the inputs,
+  but are accumulated in ``accumulate_dtype``, if provided.
+  For example, :code:`complex64` inputs with a :code:`np.complex128`
+  ``accumulate_dtype`` read and multiply single precision data,
+  while the summation over sources is performed in double precision.
+  The error of each output is then bounded by roughly
+  :math:`4 \\epsilon_{32} \\sum_{s} | E_{ps} X_{pqs} E_{qs}^H |`
+  where :math:`\\epsilon_{32} = 2^{-24}`, independently of the number
+  of sources, whereas single precision accumulation
+  introduces error growing with the number of sources.
+"""
+
+ACCUMULATE_ARGS = """
+accumulate_dtype : {np.complex64, np.complex128}, optional
+    Complex dtype in which source coherencies are accumulated.
+    This is also the dtype of the returned visibilities.
+    Defaults to the result type of the Jones inputs.
+"""
+
 try:
     predict_vis.__doc__ = PREDICT_DOCS.substitute(
                             array_type=":class:`numpy.ndarray`",
                             get_time_index=":code:`np.unique(time, "
                                            "return_inverse=True)[1]`",
-                            extra_args="",
-                            extra_notes="")
+                            extra_args=ACCUMULATE_ARGS,
+                            extra_notes=ACCUMULATE_NOTES)
+except AttributeError:
+    pass
+
+
+PARALLEL_PREDICT_NOTES = """
+* Multi-threaded version of :func:`predict_vis`.
+  The ``source`` dimension is split into ``source_chunks``
+  contiguous chunks, which are summed on separate threads.
+  The first chunk is summed into the output, while the remaining
+  chunks are summed into private buffers of shape
+  :code:`(row,chan,corr_1,corr_2)` that are then added to the output
+  in ascending chunk order.
+* As floating point addition is not associative, the result depends
+  on the number of source chunks. When ``deterministic`` is set,
+  a fixed number of source chunks is used by default, so that
+  results are bitwise reproducible irrespective of the number of threads.
+* The number of threads is controlled by numba's threading layer,
+  via :code:`NUMBA_NUM_THREADS` or :func:`numba.set_num_threads`.
+"""
+
+PARALLEL_PREDICT_ARGS = """
+source_chunks : int, optional
+    Number of source chunks summed in parallel.
+    Defaults to the number of numba threads, or to
+    :data:`DETERMINISTIC_SOURCE_CHUNKS` if ``deterministic`` is set.
+deterministic : bool, optional
+    Produce results independent of the number of threads.
+    Defaults to False.
+"""
+
+try:
+    parallel_predict_vis.__doc__ = PREDICT_DOCS.substitute(
+                            array_type=":class:`numpy.ndarray`",
+                            get_time_index=":code:`np.unique(time, "
+                                           "return_inverse=True)[1]`",
+                            extra_args=(PARALLEL_PREDICT_ARGS +
+                                        ACCUMULATE_ARGS),
+                            extra_notes=(PARALLEL_PREDICT_NOTES +
+                                         ACCUMULATE_NOTES))
 except AttributeError:
     pass
 
@@ -3,7 +3,12 @@ from numpy.testing import assert_array_equal, assert_array_almost_equal
 import pytest
 
 
-from africanus.rime.fast_beam_cubes import beam_cube_dde, freq_grid_interp
+from africanus.rime.fast_beam_cubes import (beam_cube_dde, freq_grid_interp,
+                                            parallel_beam_cube_dde,
+                                            beam_sampling_plan,
+                                            cached_beam_cube_dde,
+                                            transformed_beam_cube_dde,
+                                            BeamAngleCache)
 
 
 def rf(*a, **kw):
@@ -209,6 +214,242 @@ def test_dask_fast_beams(freqs, beam_freq_map):
     # Should be strictly equal
     assert_array_equal(da_ddes.compute(), ddes)
 
+    # Multi-threaded chunks should also be strictly equal
+    da_ddes = dask_beam_cube_dde(da_beam, da_extents, da_beam_freq_map,
+                                 da_lm, da_parangles, da_point_errors,
+                                 da_ant_scale, da_freqs, parallel=True)
+
+    assert_array_equal(da_ddes.compute(), ddes)
+
+    # Reuse a sampling plan for the full band in each chunk
+    plan = beam_sampling_plan(beam, beam_lm_extents, beam_freq_map, freqs)
+    da_ddes = dask_beam_cube_dde(da_beam, da_extents, da_beam_freq_map,
+                                 da_lm, da_parangles, da_point_errors,
+                                 da_ant_scale, da_freqs, plan=plan)
+
+    assert_array_equal(da_ddes.compute(), ddes)
+
+
+@pytest.mark.parametrize("corr_shape", [(1,), (2, 2)])
+def test_parallel_fast_beams(freqs, beam_freq_map, corr_shape):
+    src, time, ants, chans = 5, 7, 4, freqs.shape[0]
+
+    lm = (np.random.random(size=(src, 2)) - 0.5)*0.1
+    parangles = np.random.random(size=(time, ants))*np.pi
+    point_errors = np.random.random(size=(time, ants, chans, 2))*0.001
+    antenna_scaling = np.random.random(size=(ants, chans, 2))
+
+    beam = rc((10, 10, beam_freq_map.shape[0]) + corr_shape)
+    beam_lm_extents = np.asarray([[-1.0, 1.0], [-1.0, 1.0]])
+
+    args = (beam, beam_lm_extents, beam_freq_map,
+            lm, parangles, point_errors, antenna_scaling, freqs)
+
+    # Each (time, ant) is computed identically
+    assert_array_equal(parallel_beam_cube_dde(*args), beam_cube_dde(*args))
+
+
+def test_fast_beams_plan(freqs, beam_freq_map):
+    src, time, ants, chans = 5, 7, 4, freqs.shape[0]
+
+    lm = (np.random.random(size=(src, 2)) - 0.5)*0.1
+    parangles = np.random.random(size=(time, ants))*np.pi
+    point_errors = np.random.random(size=(time, ants, chans, 2))*0.001
+    antenna_scaling = np.random.random(size=(ants, chans, 2))
+
+    beam = rc((10, 12, beam_freq_map.shape[0], 2, 2))
+    beam_lm_extents = np.asarray([[-1.0, 1.0], [-0.5, 0.5]])
+
+    args = (beam, beam_lm_extents, beam_freq_map,
+            lm, parangles, point_errors, antenna_scaling, freqs)
+
+    plan = beam_sampling_plan(beam, beam_lm_extents, beam_freq_map, freqs)
+    assert_array_equal(plan.freq_data, freq_grid_interp(freqs, beam_freq_map))
+
+    ddes = beam_cube_dde(*args)
+    assert_array_equal(beam_cube_dde(*args, plan), ddes)
+    assert_array_equal(parallel_beam_cube_dde(*args, plan), ddes)
+
+    # Plans for other frequencies are rejected
+    plan = beam_sampling_plan(beam, beam_lm_extents, beam_freq_map,
+                              freqs[:-1])
+
+    with pytest.raises(ValueError, match="channels differ"):
+        beam_cube_dde(*args, plan)
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_fast_beams_accumulate(freqs, beam_freq_map, parallel):
+    fn = parallel_beam_cube_dde if parallel else beam_cube_dde
+    src, time, ants, chans = 5, 7, 4, freqs.shape[0]
+
+    lm = (np.random.random(size=(src, 2)) - 0.5)*0.1
+    parangles = np.random.random(size=(time, ants))*np.pi
+    point_errors = np.random.random(size=(time, ants, chans, 2))*0.001
+    antenna_scaling = np.random.random(size=(ants, chans, 2))
+
+    beam = rc((10, 10, beam_freq_map.shape[0], 2, 2))
+    beam_lm_extents = np.asarray([[-1.0, 1.0], [-1.0, 1.0]])
+
+    args = (beam, beam_lm_extents, beam_freq_map,
+            lm, parangles, point_errors, antenna_scaling, freqs)
+    args32 = tuple(a.astype(np.complex64 if np.iscomplexobj(a)
+                            else np.float32) for a in args)
+
+    exact = fn(*args)
+    mixed = fn(*args32, None, np.complex128)
+    assert mixed.dtype == np.complex64
+    assert_array_almost_equal(mixed, exact, decimal=5)
+
+    # Double precision accumulation doesn't change double precision beams
+    assert_array_equal(fn(*args, None, np.complex128), exact)
+
+
+def test_transformed_fast_beams(beam_freq_map):
+    from africanus.rime import compact_transform_sources
+
+    src, time, ants, chans = 10, 7, 4, 8
+    freqs = np.linspace(beam_freq_map[0], beam_freq_map[-1], chans)
+
+    lm = (np.random.random(size=(src, 2)) - 0.5)*0.5
+    beam = rc((10, 12, beam_freq_map.shape[0], 2, 2))
+    beam_lm_extents = np.asarray([[-1.0, 1.0], [-0.5, 0.5]])
+
+    # Without rotation, pointing errors and scaling,
+    # the compact coordinates are the source coordinates
+    coords = compact_transform_sources(lm, np.zeros((time, ants)),
+                                       np.zeros((time, ants, 2)),
+                                       np.ones((ants, chans)), freqs)
+
+    ddes = beam_cube_dde(beam, beam_lm_extents, beam_freq_map,
+                         lm, np.zeros((time, ants)),
+                         np.zeros((time, ants, chans, 2)),
+                         np.ones((ants, chans, 2)), freqs)
+
+    transformed = transformed_beam_cube_dde(beam, beam_lm_extents,
+                                            beam_freq_map, coords)
+    assert_array_equal(transformed, ddes)
+
+    plan = beam_sampling_plan(beam, beam_lm_extents, beam_freq_map, freqs)
+    assert_array_equal(transformed_beam_cube_dde(beam, beam_lm_extents,
+                                                 beam_freq_map, coords,
+                                                 plan), ddes)
+
+    # Compact coordinates are interpolated at their expanded values
+    parangles = np.random.random(size=(time, ants))*np.pi
+    point_errors = np.random.random(size=(time, ants, 2))*0.01
+    antenna_scaling = np.random.random(size=(ants, chans))
+    coords = compact_transform_sources(lm, parangles, point_errors,
+                                       antenna_scaling, freqs)
+    transformed = transformed_beam_cube_dde(beam, beam_lm_extents,
+                                            beam_freq_map, coords)
+
+    s, t, a, f = 3, 2, 1, 4
+    slm = coords.lm[s, t, a] * antenna_scaling[a, f]
+    ddes = beam_cube_dde(beam, beam_lm_extents, beam_freq_map,
+                         slm[None, :], np.zeros((1, 1)),
+                         np.zeros((1, 1, 1, 2)), np.ones((1, 1, 2)),
+                         freqs[f:f+1])
+    assert_array_almost_equal(transformed[s, t, a, f], ddes[0, 0, 0, 0])
+
+
+@pytest.mark.parametrize("interpolate", [False, True])
+def test_cached_fast_beams(freqs, beam_freq_map, interpolate):
+    beam_lw = 10
+    beam_mh = 10
+    beam_nud = beam_freq_map.shape[0]
+
+    src, time, ants, chans = 5, 100, 3, freqs.shape[0]
+    tol = np.deg2rad(0.5)
+
+    # Slowly varying parallactic angles over the track
+    lm = (np.random.random(size=(src, 2)) - 0.5)*0.1
+    parangles = np.linspace(-np.pi / 16, np.pi / 16, time)
+    parangles = np.repeat(parangles[:, None], ants, axis=1)
+    point_errors = np.zeros((time, ants, chans, 2))
+    antenna_scaling = np.ones((ants, chans, 2))
+
+    beam = rc((beam_lw, beam_mh, beam_nud, 2, 2))
+    beam_lm_extents = np.asarray([[-1.0, 1.0], [-1.0, 1.0]])
+
+    args = (beam, beam_lm_extents, beam_freq_map,
+            lm, parangles, point_errors, antenna_scaling, freqs)
+
+    cache = BeamAngleCache()
+    ddes = cached_beam_cube_dde(*args, angle_tolerance=tol,
+                                interpolate=interpolate, cache=cache)
+
+    # Fewer beam evaluations than (time, ant) pairs
+    assert 0 < cache.misses < time*ants
+    assert len(cache) == cache.misses
+
+    if interpolate:
+        exact = beam_cube_dde(*args)
+        assert_array_almost_equal(ddes, exact, decimal=2)
+    else:
+        # Snapping matches evaluation on the quantised angles
+        quantised = np.round(parangles / tol)*tol
+        exact = beam_cube_dde(beam, beam_lm_extents, beam_freq_map,
+                              lm, quantised, point_errors,
+                              antenna_scaling, freqs)
+        assert_array_almost_equal(ddes, exact)
+
+    # Second call is served entirely from the cache
+    misses = cache.misses
+    cached_ddes = cached_beam_cube_dde(*args, angle_tolerance=tol,
+                                       interpolate=interpolate, cache=cache)
+    assert cache.misses == misses
+    assert_array_equal(cached_ddes, ddes)
+
+    # Least recently used values are evicted
+    value_bytes = ddes[:, 0, 0].nbytes
+    small_cache = BeamAngleCache(maxbytes=2*value_bytes)
+    small_ddes = cached_beam_cube_dde(*args, angle_tolerance=tol,
+                                      interpolate=interpolate,
+                                      cache=small_cache)
+    assert len(small_cache) == 2
+    assert small_cache.nbytes == 2*value_bytes
+    assert_array_equal(small_ddes, ddes)
+
+    # Values larger than the cache are not retained
+    tiny_cache = BeamAngleCache(maxbytes=value_bytes - 1)
+    tiny_ddes = cached_beam_cube_dde(*args, angle_tolerance=tol,
+                                     interpolate=interpolate,
+                                     cache=tiny_cache)
+    assert len(tiny_cache) == 0 and tiny_cache.nbytes == 0
+    assert_array_equal(tiny_ddes, ddes)
+
+    # Caches can't be shared between differing inputs
+    with pytest.raises(ValueError, match="differing"):
+        cached_beam_cube_dde(beam, beam_lm_extents, beam_freq_map,
+                             lm*2, parangles, point_errors,
+                             antenna_scaling, freqs,
+                             angle_tolerance=tol, cache=cache)
+
+    # including differing beams of the same shape
+    with pytest.raises(ValueError, match="differing"):
+        cached_beam_cube_dde(beam*2, beam_lm_extents, beam_freq_map,
+                             lm, parangles, point_errors,
+                             antenna_scaling, freqs,
+                             angle_tolerance=tol, cache=cache)
+
+    # Distinct pointing errors are cached separately
+    point_errors = point_errors.copy()
+    point_errors[time // 2:] = 1e-3
+    misses = cache.misses
+    ddes = cached_beam_cube_dde(beam, beam_lm_extents, beam_freq_map,
+                                lm, parangles, point_errors,
+                                antenna_scaling, freqs,
+                                angle_tolerance=tol,
+                                interpolate=interpolate, cache=cache)
+    assert cache.misses > misses
+
+    if not interpolate:
+        exact = beam_cube_dde(beam, beam_lm_extents, beam_freq_map,
+                              lm, quantised, point_errors,
+                              antenna_scaling, freqs)
+        assert_array_almost_equal(ddes, exact)
+
 
 @pytest.mark.parametrize("dtype", [np.float32, np.float64])
 def test_fast_beams_vs_montblanc(freqs, beam_freq_map_montblanc, dtype):
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from numpy.testing import assert_array_almost_equal
+import pytest
+
+from africanus.model.coherency import convert
+from africanus.model.spectral import spectral_model
+from africanus.rime import phase_delay, predict_vis
+from africanus.rime.fused_predict import fused_predict
+
+
+@pytest.mark.parametrize("convention", ["fourier", "casa"])
+@pytest.mark.parametrize("corr_schema", [
+    (("XX", "XY"), ("YX", "YY")),
+    (("RR", "RL"), ("LR", "LL")),
+    ("XX", "YY")])
+def test_fused_predict(convention, corr_schema):
+    rs = np.random.RandomState(42)
+
+    src, row, chan, nspi = 5, 10, 8, 2
+
+    lm = rs.normal(size=(src, 2))*1e-5
+    uvw = rs.normal(size=(row, 3))
+    freq = np.linspace(.856e9, 2*.856e9, chan)
+    stokes = rs.random_sample((src, 4))
+    spi = rs.normal(size=(src, nspi, 4))*0.1
+    ref_freq = np.full(src, freq[chan // 2])
+
+    vis = fused_predict(lm, uvw, freq, stokes, spi, ref_freq,
+                        corr_schema=corr_schema, convention=convention)
+
+    # Compute it the unfused way
+    phase = phase_delay(lm, uvw, freq, convention=convention)
+    spectrum = spectral_model(stokes, spi, ref_freq, freq, base=0)
+    brightness = convert(spectrum, ["I", "Q", "U", "V"], list(corr_schema))
+    corr_shape = brightness.shape[2:]
+    brightness = brightness.reshape(brightness.shape[:2] + (-1,))
+    source_coh = phase[..., None] * brightness[:, None, :, :]
+    source_coh = source_coh.reshape(phase.shape + corr_shape)
+
+    time_index = np.zeros(row, dtype=np.int32)
+    ant1 = np.zeros(row, dtype=np.int32)
+    ant2 = np.ones(row, dtype=np.int32)
+    expected = predict_vis(time_index, ant1, ant2, source_coh=source_coh)
+
+    assert vis.shape == expected.shape
+    assert_array_almost_equal(vis, expected)
+
+
+def test_fused_predict_invalid_convention():
+    lm = np.zeros((1, 2))
+    uvw = np.zeros((1, 3))
+    freq = np.ones(1)
+    stokes = np.ones((1, 4))
+    spi = np.zeros((1, 1, 4))
+    ref_freq = np.ones(1)
+
+    with pytest.raises(ValueError, match="convention"):
+        fused_predict(lm, uvw, freq, stokes, spi, ref_freq,
+                      convention="foo")
+
+
+@pytest.mark.parametrize("corr_schema", [
+    (("XX", "XY"), ("YX", "YY")),
+    ("XX", "YY")])
+@pytest.mark.parametrize("chunks", [
+    {"source": (2, 3), "row": (4, 6), "chan": (3, 5)},
+    {"source": (5,), "row": (10,), "chan": (8,)},
+    {"source": (1, 1, 1, 1, 1), "row": (3, 3, 4), "chan": (8,)}])
+def test_dask_fused_predict(corr_schema, chunks):
+    da = pytest.importorskip("dask.array")
+
+    from africanus.rime.dask import fused_predict as dask_fused_predict
+
+    rs = np.random.RandomState(42)
+
+    src, row, chan = (sum(chunks[d]) for d in ("source", "row", "chan"))
+    nspi = 2
+
+    lm = rs.normal(size=(src, 2))*1e-5
+    uvw = rs.normal(size=(row, 3))
+    freq = np.linspace(.856e9, 2*.856e9, chan)
+    stokes = rs.random_sample((src, 4))
+    spi = rs.normal(size=(src, nspi, 4))*0.1
+    ref_freq = np.full(src, freq[chan // 2])
+
+    vis = fused_predict(lm, uvw, freq, stokes, spi, ref_freq,
+                        corr_schema=corr_schema)
+
+    da_lm = da.from_array(lm, chunks=(chunks["source"], 2))
+    da_uvw = da.from_array(uvw, chunks=(chunks["row"], 3))
+    da_freq = da.from_array(freq, chunks=chunks["chan"])
+    da_stokes = da.from_array(stokes, chunks=(chunks["source"], 4))
+    da_spi = da.from_array(spi, chunks=(chunks["source"], nspi, 4))
+    da_ref_freq = da.from_array(ref_freq, chunks=chunks["source"])
+
+    da_vis = dask_fused_predict(da_lm, da_uvw, da_freq, da_stokes,
+                                da_spi, da_ref_freq,
+                                corr_schema=corr_schema)
+
+    assert da_vis.chunks[:2] == (chunks["row"], chunks["chan"])
+    assert da_vis.dtype == vis.dtype
+    assert_array_almost_equal(da_vis.compute(), vis)
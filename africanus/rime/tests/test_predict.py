@@ -4,7 +4,7 @@
 """Tests for `codex-africanus` package."""
 
 import numpy as np
-from numpy.testing import assert_array_almost_equal
+from numpy.testing import assert_array_almost_equal, assert_array_equal
 
 import pytest
 
@@ -111,6 +111,100 @@ def test_predict_vis(corr_shape, idm, einsum_sig1, einsum_sig2,
     assert_array_almost_equal(v, model_vis)
 
 
+@corr_shape_parametrization
+@dde_presence_parametrization
+@die_presence_parametrization
+@pytest.mark.parametrize("source_chunks", [1, 3, 100])
+def test_parallel_predict_vis(corr_shape, idm, einsum_sig1, einsum_sig2,
+                              a1j, blj, a2j, g1j, bvis, g2j,
+                              source_chunks):
+    from africanus.rime.predict import (predict_vis,
+                                        parallel_predict_vis,
+                                        DETERMINISTIC_SOURCE_CHUNKS)
+
+    s, t, a, c, r = 21, 4, 4, 5, 10
+
+    a1_jones = rc((s, t, a, c) + corr_shape)
+    bl_jones = rc((s, r, c) + corr_shape)
+    a2_jones = rc((s, t, a, c) + corr_shape)
+    g1_jones = rc((t, a, c) + corr_shape)
+    base_vis = rc((r, c) + corr_shape)
+    g2_jones = rc((t, a, c) + corr_shape)
+
+    time_idx = np.asarray([0, 0, 1, 1, 2, 2, 2, 2, 3, 3])
+    ant1 = np.asarray([0, 0, 0, 0, 1, 1, 1, 2, 2, 3])
+    ant2 = np.asarray([0, 1, 2, 3, 1, 2, 3, 2, 3, 3])
+
+    args = (time_idx, ant1, ant2,
+            a1_jones if a1j else None,
+            bl_jones if blj else None,
+            a2_jones if a2j else None,
+            g1_jones if g1j else None,
+            base_vis if bvis else None,
+            g2_jones if g2j else None)
+
+    expected = predict_vis(*args)
+    model_vis = parallel_predict_vis(*args, source_chunks=source_chunks)
+    assert model_vis.shape == expected.shape
+    assert_array_almost_equal(model_vis, expected)
+
+    if source_chunks == 1:
+        # A single chunk sums sources in the same order as predict_vis
+        assert_array_equal(model_vis, expected)
+
+    # Deterministic results depend only on the number of source chunks
+    vis = parallel_predict_vis(*args, deterministic=True)
+    chunked_vis = parallel_predict_vis(
+        *args, source_chunks=DETERMINISTIC_SOURCE_CHUNKS)
+    assert_array_equal(vis, chunked_vis)
+
+    with pytest.raises(ValueError, match="source_chunks"):
+        parallel_predict_vis(*args, source_chunks=0)
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_predict_vis_accumulate(parallel):
+    from africanus.rime.predict import predict_vis, parallel_predict_vis
+
+    fn = parallel_predict_vis if parallel else predict_vis
+
+    s, t, a, c, r = 2000, 4, 4, 3, 10
+    corr_shape = (2, 2)
+
+    a1_jones = rc((s, t, a, c) + corr_shape)
+    bl_jones = rc((s, r, c) + corr_shape)
+    a2_jones = rc((s, t, a, c) + corr_shape)
+
+    time_idx = np.asarray([0, 0, 1, 1, 2, 2, 2, 2, 3, 3])
+    ant1 = np.asarray([0, 0, 0, 0, 1, 1, 1, 2, 2, 3])
+    ant2 = np.asarray([0, 1, 2, 3, 1, 2, 3, 2, 3, 3])
+
+    jones64 = (a1_jones, bl_jones, a2_jones)
+    jones32 = tuple(j.astype(np.complex64) for j in jones64)
+
+    exact = fn(time_idx, ant1, ant2, *jones64)
+    single = fn(time_idx, ant1, ant2, *jones32)
+    mixed = fn(time_idx, ant1, ant2, *jones32,
+               accumulate_dtype=np.complex128)
+
+    assert exact.dtype == np.complex128
+    assert single.dtype == np.complex64
+    assert mixed.dtype == np.complex128
+
+    # Bounded by the rounding of the single precision
+    # inputs and products, rather than growing with sources
+    abs_sum = np.einsum("srcij,srcjk,srclk->rcil",
+                        np.abs(a1_jones[:, time_idx, ant1]),
+                        np.abs(bl_jones),
+                        np.abs(a2_jones[:, time_idx, ant2]))
+    mixed_error = np.abs(mixed - exact)
+    assert np.all(mixed_error <= 8*np.finfo(np.float32).eps*abs_sum)
+    assert mixed_error.max() < np.abs(single - exact).max()
+
+    with pytest.raises(TypeError, match="not complex"):
+        fn(time_idx, ant1, ant2, *jones32, accumulate_dtype=np.float64)
+
+
 @corr_shape_parametrization
 @dde_presence_parametrization
 @die_presence_parametrization
@@ -183,9 +277,90 @@ def test_dask_predict_vis(corr_shape, idm, einsum_sig1, einsum_sig2,
 
     stream_model_vis = predict_vis(*args, streams=True)
     fan_model_vis = predict_vis(*args, streams=False)
+    tree_model_vis = [predict_vis(*args, split_every=se, max_inflight=mi)
+                      for se, mi in [(2, None), (3, 2), (2, 1), (4, 100)]]
 
-    stream_model_vis, fan_model_vis = dask.compute(stream_model_vis,
-                                                   fan_model_vis)
+    stream_model_vis, fan_model_vis, tree_model_vis = dask.compute(
+        stream_model_vis, fan_model_vis, tree_model_vis)
 
     assert_array_almost_equal(fan_model_vis, np_model_vis)
     assert_array_almost_equal(stream_model_vis, fan_model_vis)
+
+    for vis in tree_model_vis:
+        assert_array_almost_equal(vis, np_model_vis)
+
+
+@pytest.mark.parametrize("nblocks, split_every, max_inflight", [
+    (7, 2, 3), (8, 3, 2), (5, 2, 1), (4, 4, None)])
+def test_tree_reduction_graph(nblocks, split_every, max_inflight):
+    pytest.importorskip('dask.array')
+    from dask.core import get_dependencies
+
+    from africanus.rime.dask_predict import TreeReduction, _tree_leaf
+
+    tr = TreeReduction(np.add, ("row",), [("x", ("source", "row"))],
+                       numblocks={"x": (nblocks, 2)}, axis="source",
+                       split_every=split_every, max_inflight=max_inflight)
+    dsk = dict(tr._dict)
+    inflight = max_inflight or nblocks
+
+    # Add the input keys
+    dsk.update({("x", b, r): None for b in range(nblocks) for r in range(2)})
+
+    def ancestors(key):
+        """ key and its transitive dependencies """
+        stack, seen = [key], {key}
+
+        while stack:
+            for dep in get_dependencies(dsk, stack.pop()):
+                if dep not in seen:
+                    seen.add(dep)
+                    stack.append(dep)
+
+        return seen
+
+    # Leaf tasks, keyed on (output row, block)
+    leaves = {(k[2], k[1]): k for k, v in dsk.items()
+              if isinstance(v, tuple) and v[0] is _tree_leaf}
+    assert len(leaves) == 2*nblocks
+
+    for (r, b), key in leaves.items():
+        group = b // inflight
+        barrier = dsk[key][1]
+
+        if group == 0:
+            assert barrier is None
+        else:
+            # Leaves of group g depend on the sum of group g - 1
+            barrier_leaves = {k for k in ancestors(barrier) if k in
+                              leaves.values()}
+            assert barrier_leaves == {leaves[r, pb] for pb in
+                                      range(group*inflight)}
+
+    # Execute the graph with unbounded parallelism, checking that
+    # at most max_inflight leaves of an output row are ready at once
+    # and at most max_inflight results and the previous group's sum
+    # are held in memory at once
+    dependents = {k: set() for k in dsk}
+
+    for k in dsk:
+        for dep in get_dependencies(dsk, k):
+            dependents[dep].add(k)
+
+    done = set()
+
+    while len(done) < len(dsk):
+        ready = {k for k in dsk if k not in done and
+                 get_dependencies(dsk, k).issubset(done)}
+        assert len(ready) > 0
+        done.update(ready)
+
+        for r in range(2):
+            row_leaves = {leaves[r, b] for b in range(nblocks)}
+            assert len(ready & row_leaves) <= inflight
+
+            held = {k for k in done if k[0] != "x" and k[-1] == r and
+                    not dependents[k].issubset(done)}
+            assert len(held) <= inflight + 1
+
+    assert (tr.name, 0) in done and (tr.name, 1) in done
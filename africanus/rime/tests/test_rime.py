@@ -50,6 +50,95 @@ def test_phase_delay(convention, sign):
     assert np.all(np.exp(1j*phase) == complex_phase[lm_i, uvw_i, freq_i])
 
 
+@pytest.mark.parametrize("convention", ['fourier', 'casa'])
+@pytest.mark.parametrize("anchor_interval", [1, 7, 16, 1024])
+def test_phase_delay_recurrence(convention, anchor_interval):
+    from africanus.rime import phase_delay
+
+    uvw = np.random.random(size=(100, 3))*1e4
+    lm = np.random.random(size=(10, 2))*1e-2
+    frequency = np.linspace(.856e9, .856e9*2, 64, endpoint=True)
+
+    exact = phase_delay(lm, uvw, frequency, convention=convention)
+    fast = phase_delay(lm, uvw, frequency, convention=convention,
+                       recurrence=True, anchor_interval=anchor_interval)
+
+    assert fast.dtype == exact.dtype
+    assert np.allclose(fast, exact, rtol=0, atol=1e-8)
+
+    # Anchored channels are exact
+    anchors = slice(None, None, anchor_interval)
+    assert np.all(fast[:, :, anchors] == exact[:, :, anchors])
+
+    # Irregular grids fall back to the exact computation
+    frequency[5] += 1e3
+    exact = phase_delay(lm, uvw, frequency, convention=convention)
+    fast = phase_delay(lm, uvw, frequency, convention=convention,
+                       recurrence=True, anchor_interval=anchor_interval)
+    assert np.all(fast == exact)
+
+    with pytest.raises(ValueError, match="anchor_interval"):
+        phase_delay(lm, uvw, frequency, recurrence=True, anchor_interval=0)
+
+
+def test_phase_delay_accumulate():
+    from africanus.rime import phase_delay
+
+    uvw = (np.random.random(size=(100, 3)) - 0.5)*1e4
+    lm = (np.random.random(size=(10, 2)) - 0.5)*1e-2
+    frequency = np.linspace(.856e9, .856e9*2, 64, endpoint=True)
+
+    args32 = (lm.astype(np.float32), uvw.astype(np.float32),
+              frequency.astype(np.float32))
+
+    single = phase_delay(*args32)
+    mixed = phase_delay(*args32, accumulate_dtype=np.float64)
+    exact = phase_delay(*(a.astype(np.float64) for a in args32))
+
+    assert single.dtype == mixed.dtype == np.complex64
+
+    # Only the final rounding to single precision remains
+    assert np.abs(mixed - exact).max() < 1e-6
+    assert np.abs(mixed - exact).max() < np.abs(single - exact).max()
+
+    # Doubles are unaffected by double precision accumulation
+    assert np.all(phase_delay(*(a.astype(np.float64) for a in args32),
+                              accumulate_dtype=np.float64) == exact)
+
+    with pytest.raises(TypeError, match="is not a dtype"):
+        phase_delay(*args32, accumulate_dtype=1.0)
+
+
+def test_compact_transform_sources():
+    from africanus.rime import (transform_sources,
+                                compact_transform_sources)
+
+    src, time, ants, chans = 10, 5, 4, 8
+
+    lm = (np.random.random(size=(src, 2)) - 0.5)*0.1
+    parangles = np.random.random(size=(time, ants))*np.pi
+    point_errors = np.random.random(size=(time, ants, 2))*0.001
+    antenna_scaling = np.random.random(size=(ants, chans))
+    frequency = np.linspace(.856e9, .856e9*2, chans)
+
+    args = (lm, parangles, point_errors, antenna_scaling, frequency)
+    coords = transform_sources(*args)
+    compact = compact_transform_sources(*args)
+
+    assert compact.lm.shape == (src, time, ants, 2)
+    assert compact.antenna_scaling.shape == (ants, chans)
+    assert compact.frequency.shape == (chans,)
+
+    # Expand the compact coordinates over channels
+    scaling = compact.antenna_scaling[None, None, :, :]
+    assert np.all(compact.lm[..., 0, None]*scaling == coords[0])
+    assert np.all(compact.lm[..., 1, None]*scaling == coords[1])
+    assert np.all(compact.frequency == coords[2])
+
+    compact = compact_transform_sources(*args, dtype=np.float32)
+    assert all(a.dtype == np.float32 for a in compact)
+
+
 def test_feed_rotation():
     import numpy as np
     from africanus.rime import feed_rotation
@@ -56,6 +56,64 @@ def test_wsclean_predict(chunks):
     assert_almost_equal(np_vis, vis)
 
 
+@pytest.mark.parametrize("row_chunks", [1, 3, 100])
+@pytest.mark.parametrize("codes", [False, True])
+def test_parallel_wsclean_predict(row_chunks, codes):
+    from africanus.rime.wsclean_predict import (parallel_wsclean_predict,
+                                                source_type_codes,
+                                                POINT_TYPE, GAUSSIAN_TYPE)
+
+    row, src, chan = 20, 31, 7
+
+    rs = np.random.RandomState(42)
+    source_sel = rs.randint(0, 2, src).astype(np.bool)
+    source_type = np.where(source_sel, "POINT", "GAUSSIAN")
+
+    gauss_shape = rs.normal(size=(src, 3))
+    uvw = rs.normal(size=(row, 3))
+    lm = rs.normal(size=(src, 2))*1e-5
+    flux = rs.normal(size=src)
+    coeffs = rs.normal(size=(src, 2))
+    log_poly = rs.randint(0, 2, src, dtype=np.bool)
+    flux[log_poly] = np.abs(flux[log_poly])
+    coeffs[log_poly] = np.abs(coeffs[log_poly])
+    freq = np.linspace(.856e9, 2*.856e9, chan)
+    ref_freq = np.full(src, freq[freq.shape[0] // 2])
+
+    vis = wsclean_predict(uvw, lm, source_type, flux, coeffs,
+                          log_poly, ref_freq, gauss_shape, freq)
+
+    type_codes = source_type_codes(source_type)
+    assert np.all(type_codes[source_sel] == POINT_TYPE)
+    assert np.all(type_codes[~source_sel] == GAUSSIAN_TYPE)
+
+    par_vis = parallel_wsclean_predict(uvw, lm,
+                                       type_codes if codes else source_type,
+                                       flux, coeffs, log_poly, ref_freq,
+                                       gauss_shape, freq,
+                                       row_chunks=row_chunks)
+
+    assert par_vis.dtype == vis.dtype
+    assert_almost_equal(par_vis, vis)
+
+    # Each row is summed identically, irrespective of row chunks
+    assert np.all(par_vis == parallel_wsclean_predict(
+                                uvw, lm, source_type, flux, coeffs,
+                                log_poly, ref_freq, gauss_shape, freq,
+                                row_chunks=2))
+
+    source_type[0] = "DISK"
+
+    with pytest.raises(ValueError, match="POINT or GAUSSIAN"):
+        parallel_wsclean_predict(uvw, lm, source_type, flux, coeffs,
+                                 log_poly, ref_freq, gauss_shape, freq)
+
+    with pytest.raises(ValueError, match="row_chunks"):
+        parallel_wsclean_predict(uvw, lm, type_codes, flux, coeffs,
+                                 log_poly, ref_freq, gauss_shape, freq,
+                                 row_chunks=0)
+
+
 @chunk_parametrization
 def test_dask_wsclean_predict(chunks):
     da = pytest.importorskip("dask.array")
@@ -251,6 +251,92 @@ def test_dask_zernike(coeff_xx, noll_index_xx):
     assert np.all(vals == dask_vals.compute())
 
 
+def test_zernike_table():
+    """ Tests the radial coefficient table of known polynomials """
+    from africanus.rime import zernike_table
+    from africanus.rime.zernike import noll_to_nm
+
+    table = zernike_table(10)
+    assert table.radial.shape == (11, table.n.max() + 1)
+    assert zernike_table(10) is table
+
+    # Piston, tilts and defocus
+    assert [noll_to_nm(j) for j in range(4)] == [(0, 0), (1, 1),
+                                                 (1, -1), (2, 0)]
+    assert np.all(table.radial[0] == [1, 0, 0, 0, 0])
+    assert np.all(table.radial[1] == [0, 1, 0, 0, 0])
+    assert np.all(table.radial[3] == [-1, 0, 2, 0, 0])
+
+    # R_4^0 = 6 rho^4 - 6 rho^2 + 1
+    j = [noll_to_nm(j) for j in range(11)].index((4, 0))
+    assert np.all(table.radial[j] == [1, 0, -6, 0, 6])
+
+    with pytest.raises(ValueError, match="max_noll"):
+        zernike_table(-1)
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_zernike_table_dde(parallel):
+    """ Tests table evaluation against per-term zernike evaluation """
+    from africanus.rime import zernike_dde
+    from africanus.rime.zernike import nb_zernike_dde
+
+    nsrc, ntime, na, nchan, ncorr, npoly = 50, 3, 2, 4, 4, 36
+
+    coords = np.empty((3, nsrc, ntime, na, nchan), dtype=np.float64)
+    coords[:2] = (np.random.random(coords[:2].shape) - 0.5) * 1.6
+    coords[2] = 0
+
+    # Origin and out of bounds coordinates
+    coords[:2, 0] = 0
+    coords[:2, 1] = 0.8
+
+    coeffs = (np.random.random((na, nchan, ncorr, npoly)) +
+              np.random.random((na, nchan, ncorr, npoly))*1j)
+    noll_index = np.empty((na, nchan, ncorr, npoly))
+    noll_index[:] = np.random.permutation(npoly)
+
+    expected = np.empty((nsrc, ntime, na, nchan, ncorr), coeffs.dtype)
+    expected = nb_zernike_dde(coords, coeffs, noll_index, expected)
+
+    ddes = zernike_dde(coords, coeffs, noll_index, parallel=parallel)
+    assert np.allclose(ddes, expected, rtol=1e-10, atol=1e-10)
+    assert np.all(ddes[1] == 0)
+
+    with pytest.raises(ValueError, match="Negative noll"):
+        zernike_dde(coords, coeffs, -noll_index - 1)
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_zernike_compact_coords(coeff_xx, noll_index_xx, parallel):
+    """ Tests zernike_dde with compact source coordinates """
+    from africanus.rime import (zernike_dde,
+                                transform_sources,
+                                compact_transform_sources)
+
+    src, time, ants, chans, npoly = 20, 3, 4, 5, 17
+
+    lm = (np.random.random(size=(src, 2)) - 0.5)
+    parangles = np.random.random(size=(time, ants))*np.pi
+    point_errors = np.random.random(size=(time, ants, 2))*0.01
+    antenna_scaling = np.random.random(size=(ants, chans))
+    frequency = np.linspace(.856e9, .856e9*2, chans)
+
+    args = (lm, parangles, point_errors, antenna_scaling, frequency)
+
+    coeffs = np.empty((ants, chans, 2, npoly), dtype=np.complex128)
+    noll_indices = np.empty((ants, chans, 2, npoly))
+    coeffs[:] = coeff_xx[:npoly]
+    noll_indices[:] = noll_index_xx[:npoly]
+
+    expected = zernike_dde(transform_sources(*args), coeffs, noll_indices)
+    ddes = zernike_dde(compact_transform_sources(*args),
+                       coeffs, noll_indices, parallel=parallel)
+
+    assert ddes.shape == (src, time, ants, chans, 2)
+    assert np.all(ddes == expected)
+
+
 @pytest.fixture
 def coeff_xx():
     return np.array([-1.75402394e-01-0.14477493j,  9.97613164e-02+0.0965587j,
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import numba
 import numpy as np
 
 from africanus.constants import two_pi_over_c, c as lightspeed
@@ -12,6 +13,66 @@ fwhm = 2.0 * np.sqrt(2.0 * np.log(2.0))
 fwhminv = 1.0 / fwhm
 gauss_scale = fwhminv * np.sqrt(2.0) * np.pi / lightspeed
 
+# Integer source type codes
+POINT_TYPE = 0
+GAUSSIAN_TYPE = 1
+
+SOURCE_TYPE_CODES = {"POINT": POINT_TYPE, "GAUSSIAN": GAUSSIAN_TYPE}
+
+
+def source_type_codes(source_type):
+    """
+    Converts ``"POINT"`` and ``"GAUSSIAN"`` source type strings
+    to :data:`POINT_TYPE` and :data:`GAUSSIAN_TYPE` integer codes.
+    Integer arrays are returned unchanged.
+
+    Parameters
+    ----------
+    source_type : :class:`numpy.ndarray`
+        Source types of shape :code:`(source,)`.
+
+    Returns
+    -------
+    codes : :class:`numpy.ndarray`
+        Integer source type codes of shape :code:`(source,)`.
+    """
+    source_type = np.asarray(source_type)
+
+    if source_type.dtype.kind in "iu":
+        codes = source_type
+    else:
+        codes = np.full(source_type.shape, -1, dtype=np.int8)
+
+        for name, code in SOURCE_TYPE_CODES.items():
+            codes[source_type == name] = code
+
+    if not np.all((codes == POINT_TYPE) | (codes == GAUSSIAN_TYPE)):
+        raise ValueError("source_type must be "
+                         "POINT or GAUSSIAN")
+
+    return codes
+
+
+def source_type_buckets(source_type):
+    """
+    Partitions sources into point and gaussian buckets.
+
+    Parameters
+    ----------
+    source_type : :class:`numpy.ndarray`
+        Source type strings or integer codes of shape :code:`(source,)`.
+
+    Returns
+    -------
+    point_index : :class:`numpy.ndarray`
+        Indices of point sources.
+    gauss_index : :class:`numpy.ndarray`
+        Indices of gaussian sources.
+    """
+    codes = source_type_codes(source_type)
+    return (np.flatnonzero(codes == POINT_TYPE),
+            np.flatnonzero(codes == GAUSSIAN_TYPE))
+
 
 @jit(nopython=True, nogil=True, cache=True)
 def wsclean_predict_impl(uvw, lm, source_type, gauss_shape,
@@ -102,6 +163,136 @@ def wsclean_predict(uvw, lm, source_type, flux, coeffs,
     return impl
 
 
+@jit(nopython=True, nogil=True, cache=True, parallel=True)
+def parallel_wsclean_predict_impl(uvw, lm, point_index, gauss_index,
+                                  gauss_shape, frequency, spectrum,
+                                  row_chunks, dtype):
+    nrow = uvw.shape[0]
+    nchan = frequency.shape[0]
+    ncorr = 1
+
+    npoint = point_index.shape[0]
+    ngauss = gauss_index.shape[0]
+    n1 = lm.dtype.type(1)
+
+    scaled_freq = frequency * frequency.dtype.type(gauss_scale)
+
+    # Gather the lmn coordinates and spectra of each bucket
+    point_lmn = np.empty((npoint, 3), dtype=lm.dtype)
+    point_spectrum = np.empty((npoint, nchan), dtype=spectrum.dtype)
+
+    for i in range(npoint):
+        s = point_index[i]
+        l = lm[s, 0]  # noqa
+        m = lm[s, 1]
+        point_lmn[i, 0] = l
+        point_lmn[i, 1] = m
+        point_lmn[i, 2] = np.sqrt(n1 - l*l - m*m) - n1
+        point_spectrum[i, :] = spectrum[s, :]
+
+    gauss_lmn = np.empty((ngauss, 3), dtype=lm.dtype)
+    gauss_params = np.empty((ngauss, 3), dtype=gauss_shape.dtype)
+    gauss_spectrum = np.empty((ngauss, nchan), dtype=spectrum.dtype)
+
+    for i in range(ngauss):
+        s = gauss_index[i]
+        l = lm[s, 0]  # noqa
+        m = lm[s, 1]
+        gauss_lmn[i, 0] = l
+        gauss_lmn[i, 1] = m
+        gauss_lmn[i, 2] = np.sqrt(n1 - l*l - m*m) - n1
+        gauss_spectrum[i, :] = spectrum[s, :]
+
+        emaj, emin, angle = gauss_shape[s]
+
+        # Convert to l-projection, m-projection, ratio
+        gauss_params[i, 0] = emaj * np.sin(angle)
+        gauss_params[i, 1] = emaj * np.cos(angle)
+        gauss_params[i, 2] = emin / (1.0 if emaj == 0.0 else emaj)
+
+    vis = np.zeros((nrow, nchan, ncorr), dtype=dtype)
+    nchunks = max(min(row_chunks, nrow), 1)
+
+    # Each thread owns the rows of a chunk
+    for c in numba.prange(nchunks):
+        start = (c * nrow) // nchunks
+        end = ((c + 1) * nrow) // nchunks
+
+        for r in range(start, end):
+            u = uvw[r, 0]
+            v = uvw[r, 1]
+            w = uvw[r, 2]
+
+            for i in range(npoint):
+                l = point_lmn[i, 0]  # noqa
+                m = point_lmn[i, 1]
+                n = point_lmn[i, 2]
+
+                # The phase is shared by all channels
+                real_phase = two_pi_over_c*(u*l + v*m + w*n)
+
+                for f in range(nchan):
+                    p = real_phase * frequency[f]
+                    re = np.cos(p) * point_spectrum[i, f]
+                    im = np.sin(p) * point_spectrum[i, f]
+
+                    vis[r, f, 0] += re + im*1j
+
+            for i in range(ngauss):
+                l = gauss_lmn[i, 0]  # noqa
+                m = gauss_lmn[i, 1]
+                n = gauss_lmn[i, 2]
+                el = gauss_params[i, 0]
+                em = gauss_params[i, 1]
+                er = gauss_params[i, 2]
+
+                # The phase and shape terms are shared by all channels
+                real_phase = two_pi_over_c*(u*l + v*m + w*n)
+                u1 = (u*em - v*el)*er
+                v1 = u*el + v*em
+
+                for f in range(nchan):
+                    p = real_phase * frequency[f]
+                    re = np.cos(p) * gauss_spectrum[i, f]
+                    im = np.sin(p) * gauss_spectrum[i, f]
+
+                    # Calculate gaussian shape component and multiply in
+                    fu1 = u1 * scaled_freq[f]
+                    fv1 = v1 * scaled_freq[f]
+                    shape = np.exp(-(fu1 * fu1 + fv1 * fv1))
+                    re *= shape
+                    im *= shape
+
+                    vis[r, f, 0] += re + im*1j
+
+    return vis
+
+
+def parallel_wsclean_predict(uvw, lm, source_type, flux, coeffs,
+                             log_poly, ref_freq, gauss_shape, frequency,
+                             row_chunks=None):
+    if row_chunks is None:
+        try:
+            row_chunks = numba.get_num_threads()
+        except AttributeError:
+            # numba < 0.49
+            row_chunks = numba.config.NUMBA_NUM_THREADS
+
+    if row_chunks < 1:
+        raise ValueError("row_chunks %d < 1" % row_chunks)
+
+    point_index, gauss_index = source_type_buckets(source_type)
+
+    dtype = np.result_type(np.complex64, *(a.dtype for a in
+                                           (uvw, lm, flux, coeffs,
+                                            ref_freq, frequency)))
+
+    spectrum = spectra(flux, coeffs, log_poly, ref_freq, frequency)
+    return parallel_wsclean_predict_impl(uvw, lm, point_index, gauss_index,
+                                         gauss_shape, frequency, spectrum,
+                                         row_chunks, dtype)
+
+
 WSCLEAN_PREDICT_DOCS = DocstringTemplate("""
     Predict visibilities from a `WSClean sky model
     <https://sourceforge.net/p/wsclean/wiki/ComponentList/>`_.
@@ -138,7 +329,7 @@ WSCLEAN_PREDICT_DOCS = DocstringTemplate("""
         and ``Orientation`` fields, respectively.
     frequency : $(array_type)
         Frequency of shape :code:`(chan,)`.
-
+$(extra_args)
     Returns
     -------
     visibilities : $(array_type)
@@ -146,4 +337,22 @@ WSCLEAN_PREDICT_DOCS = DocstringTemplate("""
 """)
 
 wsclean_predict.__doc__ = WSCLEAN_PREDICT_DOCS.substitute(
-                            array_type=":class:`numpy.ndarray`")
+                            array_type=":class:`numpy.ndarray`",
+                            extra_args="")
+
+PARALLEL_WSCLEAN_PREDICT_ARGS = """
+    row_chunks : int, optional
+        Number of row chunks predicted in parallel.
+        Each thread predicts all sources for the rows of a chunk,
+        so that no reduction over threads is required.
+        Point and gaussian sources are gathered into separate buckets
+        beforehand and the phase of each (row, source) is shared
+        by all channels.
+        Source type strings may be replaced by
+        :data:`POINT_TYPE` and :data:`GAUSSIAN_TYPE` integer codes.
+        Defaults to the number of numba threads.
+"""
+
+parallel_wsclean_predict.__doc__ = WSCLEAN_PREDICT_DOCS.substitute(
+                            array_type=":class:`numpy.ndarray`",
+                            extra_args=PARALLEL_WSCLEAN_PREDICT_ARGS)
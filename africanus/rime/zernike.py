@@ -1,7 +1,13 @@
+from collections import namedtuple
+from functools import lru_cache
+from math import factorial
+
+import numba
 import numpy as np
 
 
-from africanus.util.numba import jit
+from africanus.rime.transform import SourceCoords
+from africanus.util.numba import jit, njit
 
 
 @jit(nogil=True, nopython=True, cache=True)
@@ -82,9 +88,211 @@ def nb_zernike_dde(coords, coeffs, noll_index, out):
     return out
 
 
-def zernike_dde(coords, coeffs, noll_index):
-    """ Wrapper for :func:`nb_zernike_dde` """
-    _, sources, times, ants, chans = coords.shape
+ZernikeTable = namedtuple("ZernikeTable", ["n", "m", "radial"])
+
+
+def noll_to_nm(j):
+    """
+    Returns the radial order ``n`` and signed azimuthal
+    frequency ``m`` of the zero-based noll index ``j``,
+    using the same ordering as :func:`zernike`.
+    """
+    j += 1
+    n = 0
+    j1 = j - 1
+
+    while j1 > n:
+        n += 1
+        j1 -= n
+
+    m = (-1)**j * ((n % 2) + 2 * ((j1 + ((n + 1) % 2)) // 2))
+    return n, m
+
+
+@lru_cache(maxsize=16)
+def zernike_table(max_noll):
+    """
+    Precomputes the radial polynomial coefficients of
+    the zernike polynomials with zero-based noll indices
+    in :code:`[0, max_noll]`.
+
+    Parameters
+    ----------
+    max_noll : int
+        Maximum noll index
+
+    Returns
+    -------
+    table : :class:`ZernikeTable`
+        ``n`` and ``m`` of shape :code:`(max_noll + 1,)` hold
+        the radial order and signed azimuthal frequency
+        of each noll index.
+        ``radial`` of shape :code:`(max_noll + 1, max(n) + 1)` holds
+        the coefficient of each power of :math:`\\rho`
+        in the radial polynomial of each noll index.
+    """
+    if max_noll < 0:
+        raise ValueError("max_noll must be >= 0")
+
+    nm = [noll_to_nm(j) for j in range(max_noll + 1)]
+    n = np.asarray([n for n, _ in nm], dtype=np.int64)
+    m = np.asarray([m for _, m in nm], dtype=np.int64)
+    radial = np.zeros((max_noll + 1, n.max() + 1), dtype=np.float64)
+
+    for j, (nj, mj) in enumerate(nm):
+        mj = abs(mj)
+
+        for k in range((nj - mj) // 2 + 1):
+            # Exact integer factorials, in contrast to pre_fac
+            num = (-1)**k * factorial(nj - k)
+            den = (factorial(k) *
+                   factorial((nj + mj) // 2 - k) *
+                   factorial((nj - mj) // 2 - k))
+            radial[j, nj - 2*k] = num / den
+
+    # Cached tables are shared
+    for a in (n, m, radial):
+        a.flags.writeable = False
+
+    return ZernikeTable(n, m, radial)
+
+
+@njit(nogil=True, inline='always')
+def _source_lm(coords, s, t, a, c):
+    """
+    Reads the l and m coordinates of a (source, time, antenna, channel)
+    from a :code:`(3, source, time, ant, chan)` array
+    """
+    return coords[0, s, t, a, c], coords[1, s, t, a, c]
+
+
+@njit(nogil=True, inline='always')
+def _compact_source_lm(coords, s, t, a, c):
+    """
+    Reads the l and m coordinates of a (source, time, antenna, channel)
+    from a :class:`~africanus.rime.transform.SourceCoords`
+    """
+    scale = coords.antenna_scaling[a, c]
+    return (coords.lm[s, t, a, 0] * scale,
+            coords.lm[s, t, a, 1] * scale)
+
+
+def zernike_table_dde_factory(parallel, compact=False):
+    """
+    Factory function returning a zernike evaluation function
+    using a :class:`ZernikeTable`.
+    If ``parallel`` is True, the source and time
+    dimensions are split across threads.
+    If ``compact`` is True, coordinates are read from a
+    :class:`~africanus.rime.transform.SourceCoords`.
+    """
+    @njit(nogil=True, cache=True, parallel=parallel)
+    def impl(coords, coeffs, noll_index, table, out):
+        sources, times, ants, chans, corrs = out.shape
+        npoly = coeffs.shape[-1]
+        nnoll, npow = table.radial.shape
+        nfreq = max(table.m.max(), -table.m.min()) + 1
+
+        # The closure holds only the parallel and compact flags,
+        # so each variant has a distinct and stable numba cache key
+        if not parallel:
+            # Scratch buffers shared by all (source, time)
+            rho_pow = np.empty(npow, dtype=out.real.dtype)
+            cos_m = np.empty(nfreq, dtype=out.real.dtype)
+            sin_m = np.empty(nfreq, dtype=out.real.dtype)
+            zernikes = np.empty(nnoll, dtype=out.real.dtype)
+
+        for st in numba.prange(sources*times):
+            s = st // times
+            t = st - s*times
+
+            if parallel:
+                # Scratch buffers private to each (source, time)
+                rho_pow = np.empty(npow, dtype=out.real.dtype)
+                cos_m = np.empty(nfreq, dtype=out.real.dtype)
+                sin_m = np.empty(nfreq, dtype=out.real.dtype)
+                zernikes = np.empty(nnoll, dtype=out.real.dtype)
+
+            for a in range(ants):
+                for c in range(chans):
+                    if compact:
+                        l, m = _compact_source_lm(  # noqa: E741
+                            coords, s, t, a, c)
+                    else:
+                        l, m = _source_lm(coords, s, t, a, c)  # noqa: E741
+                    rho = np.sqrt(l**2 + m**2)
+
+                    if rho > 1:
+                        out[s, t, a, c, :] = 0
+                        continue
+
+                    # Powers of rho
+                    rho_pow[0] = 1
+
+                    for k in range(1, npow):
+                        rho_pow[k] = rho_pow[k - 1] * rho
+
+                    # cos(k*phi) and sin(k*phi), phi = arctan2(l, m)
+                    # by Chebyshev recurrence
+                    cos_m[0] = 1
+                    sin_m[0] = 0
+
+                    if nfreq > 1:
+                        cos_m[1] = m / rho if rho > 0 else 1
+                        sin_m[1] = l / rho if rho > 0 else 0
+
+                    for k in range(2, nfreq):
+                        cos_m[k] = 2*cos_m[1]*cos_m[k - 1] - cos_m[k - 2]
+                        sin_m[k] = 2*cos_m[1]*sin_m[k - 1] - sin_m[k - 2]
+
+                    # Evaluate all noll indices in the table
+                    for j in range(nnoll):
+                        n = table.n[j]
+                        zm = table.m[j]
+                        am = abs(zm)
+                        radial = 0.0
+
+                        for k in range(am, n + 1, 2):
+                            radial += table.radial[j, k] * rho_pow[k]
+
+                        if zm > 0:
+                            zernikes[j] = radial * cos_m[am]
+                        elif zm < 0:
+                            zernikes[j] = radial * sin_m[am]
+                        else:
+                            zernikes[j] = radial
+
+                    for co in range(corrs):
+                        zernike_sum = coeffs.dtype.type(0)
+
+                        for p in range(npoly):
+                            zc = coeffs[a, c, co, p]
+                            zn = int(noll_index[a, c, co, p])
+                            zernike_sum += zc * zernikes[zn]
+
+                        out[s, t, a, c, co] = zernike_sum
+
+        return out
+
+    return impl
+
+
+nb_zernike_table_dde = zernike_table_dde_factory(False)
+nb_parallel_zernike_table_dde = zernike_table_dde_factory(True)
+nb_compact_zernike_table_dde = zernike_table_dde_factory(False, True)
+nb_parallel_compact_zernike_table_dde = zernike_table_dde_factory(True, True)
+
+
+def zernike_dde(coords, coeffs, noll_index, parallel=False):
+    """ Wrapper for :func:`nb_zernike_table_dde` """
+    compact = isinstance(coords, SourceCoords)
+
+    if compact:
+        sources, times, ants = coords.lm.shape[:3]
+        chans = coords.frequency.shape[0]
+    else:
+        _, sources, times, ants, chans = coords.shape
+
     # ant, chan, corr_1, ..., corr_n, poly
     corr_shape = coeffs.shape[2:-1]
     npoly = coeffs.shape[-1]
@@ -96,7 +304,20 @@ def zernike_dde(coords, coeffs, noll_index):
     coeffs = coeffs.reshape((ants, chans, fcorrs, npoly))
     noll_index = noll_index.reshape((ants, chans, fcorrs, npoly))
 
-    result = nb_zernike_dde(coords, coeffs, noll_index, ddes)
+    if noll_index.size > 0 and noll_index.min() < 0:
+        raise ValueError("Negative noll indices")
+
+    max_noll = int(noll_index.max()) if noll_index.size > 0 else 0
+    table = zernike_table(max_noll)
+
+    if compact:
+        fn = (nb_parallel_compact_zernike_table_dde if parallel
+              else nb_compact_zernike_table_dde)
+    else:
+        fn = (nb_parallel_zernike_table_dde if parallel
+              else nb_zernike_table_dde)
+
+    result = fn(coords, coeffs, noll_index, table, ddes)
 
     # Reshape to full correlation size
     return result.reshape((sources, times, ants, chans) + corr_shape)
@@ -119,11 +340,14 @@ use of the eidos_ package.
 
 Parameters
 ---------------
-coords : :class:`numpy.ndarray`
+coords : :class:`numpy.ndarray` or :class:`~africanus.rime.SourceCoords`
    Float coordinates at which to evaluate the zernike polynomials.
    Has shape :code:`(3, source, time, ant, chan)`. The three components in
    the first dimension represent
    l, m and frequency coordinates, respectively.
+   The compact coordinates produced by
+   :func:`~africanus.rime.compact_transform_sources`
+   are also accepted.
 coeffs : :class:`numpy.ndarray`
   complex Zernicke polynomial coefficients.
   Has shape :code:`(ant, chan, corr_1, ..., corr_n, poly)`
@@ -133,6 +357,18 @@ coeffs : :class:`numpy.ndarray`
 noll_index : :class:`numpy.ndarray`
   Noll index associated with each polynomial coefficient.
   Has shape :code:`(ant, chan, corr_1, ..., corr_n, poly)`.
+parallel : bool, optional
+  If True, split the source and time dimensions across threads.
+  Defaults to False.
+
+Notes
+-----
+The radial polynomial coefficients of noll indices up to the maximum
+in ``noll_index`` are precomputed once by :func:`zernike_table`.
+At each coordinate, powers of :math:`\\rho` and the
+:math:`\\cos(m \\phi)`, :math:`\\sin(m \\phi)` terms are
+obtained by recurrence and shared by all noll indices,
+rather than evaluating factorials for each polynomial term.
 
 Returns
 ----------
@@ -10,6 +10,7 @@ from africanus import __version__
 _dirs = AppDirs("codex-africanus", "radio-astronomer", __version__)
 
 user_data_dir = _dirs.user_data_dir
+user_cache_dir = _dirs.user_cache_dir
 downloads_dir = pjoin(user_data_dir, "downloads")
 include_dir = pjoin(user_data_dir, "include")
 
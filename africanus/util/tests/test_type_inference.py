@@ -4,9 +4,12 @@
 """Tests for `codex-africanus` package."""
 
 
+import numba
 import numpy as np
+import pytest
 
-from africanus.util.type_inference import infer_complex_dtype
+from africanus.util.type_inference import (infer_complex_dtype,
+                                           infer_dtype_arg)
 
 
 def test_type_inference():
@@ -19,3 +22,16 @@ def test_type_inference():
     assert infer_complex_dtype(f32, f32) == np.complex64
     assert infer_complex_dtype(i32, f32) == np.complex128
     assert infer_complex_dtype(i64, f32) == np.complex128
+
+
+def test_infer_dtype_arg():
+    typeof = numba.typeof
+
+    assert infer_dtype_arg(typeof(None)) is None
+    assert infer_dtype_arg(numba.types.Omitted(None)) is None
+    assert infer_dtype_arg(typeof(np.float64)) == np.float64
+    assert infer_dtype_arg(typeof(np.complex128)) == np.complex128
+    assert infer_dtype_arg(typeof(np.dtype(np.complex64))) == np.complex64
+
+    with pytest.raises(TypeError, match="is not a dtype"):
+        infer_dtype_arg(typeof(1.0))
@@ -25,3 +25,21 @@ def _numpy_dtype(arg):
 def infer_complex_dtype(*args):
     """ Infer complex datatype from arg inputs """
     return np.result_type(np.complex64, *(_numpy_dtype(a) for a in args))
+
+
+def infer_dtype_arg(arg):
+    """
+    Infer a numpy dtype from the numba type of a dtype argument,
+    such as :code:`np.complex128` or :code:`np.dtype(np.float64)`.
+    Returns None if the argument is None or omitted.
+    """
+    if isinstance(arg, numba.types.NoneType):
+        return None
+    elif isinstance(arg, numba.types.Omitted):
+        return None if arg.value is None else np.dtype(arg.value)
+    elif isinstance(arg, numba.types.NumberClass):
+        return np.dtype(arg.instance_type.name)
+    elif isinstance(arg, numba.types.DType):
+        return np.dtype(arg.dtype.name)
+    else:
+        raise TypeError("%s is not a dtype" % arg)